@@ -4,12 +4,15 @@ Provides programmatic interface to 123Pan API
 """
 
 from .pan_api import PanAPI
+from .pool import ClientPool
+from .scheduler import RequestScheduler
 from .exceptions import (
     PanAPIException,
     TokenExpiredError,
     TokenNotFoundError,
     APIError,
     NetworkError,
+    CircuitOpenError,
     InvalidParameterError,
     CredentialsError,
     FileNotFoundError,
@@ -17,11 +20,14 @@ from .exceptions import (
 
 __all__ = [
     "PanAPI",
+    "ClientPool",
+    "RequestScheduler",
     "PanAPIException",
     "TokenExpiredError",
     "TokenNotFoundError",
     "APIError",
     "NetworkError",
+    "CircuitOpenError",
     "InvalidParameterError",
     "CredentialsError",
     "FileNotFoundError",
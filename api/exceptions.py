@@ -43,7 +43,7 @@ class TokenNotFoundError(PanAPIException):
 class APIError(PanAPIException):
     """Raised when API request fails"""
 
-    def __init__(self, message, code=None, status_code=None, response_data=None):
+    def __init__(self, message, code=None, status_code=None, response_data=None, original_error=None):
         """
         Initialize APIError
 
@@ -52,10 +52,11 @@ class APIError(PanAPIException):
             code: API error code
             status_code: HTTP status code
             response_data: Full API response data
+            original_error: Original exception (if wrapped)
         """
         self.status_code = status_code
         self.response_data = response_data
-        super().__init__(message, code=code)
+        super().__init__(message, code=code, original_error=original_error)
 
     def __str__(self):
         result = super().__str__()
@@ -78,6 +79,22 @@ class NetworkError(PanAPIException):
         super().__init__(message, code="NETWORK_ERROR", original_error=original_error)
 
 
+class CircuitOpenError(NetworkError):
+    """Raised without sending a request while an endpoint group's circuit is open"""
+
+    def __init__(self, group, retry_after):
+        """
+        Initialize CircuitOpenError
+
+        Args:
+            group: Endpoint group whose circuit is open
+            retry_after: Seconds until a trial request is allowed
+        """
+        self.group = group
+        self.retry_after = retry_after
+        super().__init__(f"{group} 接口熔断中，{retry_after:.1f} 秒后重试")
+
+
 class InvalidParameterError(PanAPIException):
     """Raised when invalid parameters are provided"""
 
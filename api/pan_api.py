@@ -4,17 +4,21 @@ Provides programmatic interface to 123Pan API
 """
 
 import json
+import logging
 import os
+import threading
 import time
-import requests
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Tuple, List, Dict, Any
+from functools import partial
+from typing import TYPE_CHECKING, Optional, Tuple, List, Dict, Any, Callable, Iterable, Iterator, Union
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import (
     ENDPOINTS,
+    build_endpoints,
     PLATFORM_HEADER,
     TOKEN_FILE_PATH,
     TOKEN_TIME_FORMAT,
@@ -22,21 +26,78 @@ from config import (
     SUCCESS_CODE,
     DEFAULT_PAGE_LIMIT,
     DEFAULT_TIMEOUT,
+    FILE_TYPE_FOLDER,
+    FILE_DETAIL_CONCURRENCY,
+    CLIENT_MAP_CONCURRENCY,
+    CLIENT_EXECUTOR_WORKERS,
+    ROOT_DIRECTORY_ID,
+    REQUEST_LOG_LEVEL,
+    CIRCUIT_BREAKER_ENABLED,
+    HTTP_TRANSPORT,
 )
+from .transport import Transport, create_transport
 from .exceptions import (
     APIError,
     NetworkError,
+    CircuitOpenError,
+    InvalidParameterError,
     TokenExpiredError,
     TokenNotFoundError,
     CredentialsError,
+    FileNotFoundError as PanFileNotFoundError,
 )
+from utils.batching import bounded_map
+from utils.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from utils.file_entry import FileEntry
+from utils.json_codec import get_decoder
+from utils.lazy import lazy_import
 from utils.logger import setup_logger
+from utils.metrics import MetricsRegistry
+from utils.path_cache import PathTrie, split_path
+from utils.tracing import (
+    KIND_TOKEN_REFRESH,
+    RequestContext,
+    RequestHook,
+    current_attempt,
+    params_size,
+    run_hooks,
+)
+
+# requests pulls in urllib3, ssl and http.client; load it on the first request
+requests = lazy_import("requests")
+
+if TYPE_CHECKING:
+    from utils.cassette import Cassette
 
 logger = setup_logger(__name__)
 
+# 秒数，或 (连接超时, 读取超时)
+Timeout = Union[float, Tuple[float, float]]
+
+# map/submit 的调用目标：方法名（如 "get_file_detail"）或可调用对象
+Method = Union[str, Callable[..., Any]]
+
+# 不能通过 map/submit 调用的公共方法
+_NOT_SUBMITTABLE = frozenset({"map", "submit", "close"})
+
 
 class PanAPI:
-    def __init__(self, client_id: Optional[str] = None, client_secret: Optional[str] = None, token_file: str = TOKEN_FILE_PATH) -> None:
+    def __init__(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        token_file: str = TOKEN_FILE_PATH,
+        json_decoder: Optional[str] = None,
+        request_log_level: int = REQUEST_LOG_LEVEL,
+        metrics: Optional[MetricsRegistry] = None,
+        hooks: Optional[List[RequestHook]] = None,
+        base_url: Optional[str] = None,
+        cassette: Optional["Cassette"] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        path_cache: Optional[Union[PathTrie, bool]] = None,
+        transport: Optional[Union[str, Transport]] = None,
+        max_workers: int = CLIENT_EXECUTOR_WORKERS,
+    ) -> None:
         """
         初始化123云盘API客户端
 
@@ -44,6 +105,22 @@ class PanAPI:
             client_id: 客户端ID，如果为None则从token_file中读取
             client_secret: 客户端密钥，如果为None则从token_file中读取
             token_file: 凭证存储文件路径
+            json_decoder: JSON 解码器（"orjson"/"ujson"/"json"），默认自动选择已安装的最快实现
+            request_log_level: 每次请求成功日志（如每页文件列表）的日志级别，大规模遍历时可设为 logging.DEBUG
+            metrics: 可选的 MetricsRegistry，记录每个端点的请求数、错误数、流量和延迟；为None时不做任何统计
+            hooks: 可选的请求钩子列表（RequestHook），在每次请求和令牌刷新前后调用，可用于追踪
+            base_url: API 根地址，默认使用 config.API_BASE_URL（可指向本地测试服务器）
+            cassette: 可选的 Cassette，录制真实请求或离线回放；回放时不获取 access_token
+            circuit_breakers: 按端点分组的熔断器，为None时按 config.CIRCUIT_BREAKER_ENABLED 创建默认熔断器；
+                多个客户端可共享同一个实例
+            path_cache: 路径缓存（PathTrie），供 resolve_path/path_of 使用，为None时创建新的缓存；
+                为False时不缓存（大规模遍历不再为每页更新路径树），每次路径查找只使用临时缓存
+            transport: HTTP 传输，"requests"/"http1"/"http2" 或 api.transport.Transport 实例，
+                为None时使用 config.HTTP_TRANSPORT；"http2" 在少量连接上复用并发请求（需要 httpx[http2]）
+            max_workers: submit/submit_<方法名> 使用的线程数，线程池在第一次提交时创建
+
+        客户端可在多个线程间共享：令牌的检查和刷新由锁保护（并发请求只触发一次刷新），
+        每个线程复用自己的请求头，路径缓存、指标和熔断器均为线程安全
 
         Raises:
             CredentialsError: 如果无法获取客户端凭证
@@ -53,13 +130,41 @@ class PanAPI:
         self.client_secret = client_secret
         self.access_token = None
         self.expired_at = None
-
-        # 尝试加载已有的access_token
-        self.load_access_token()
+        # 令牌的检查和刷新由 _token_lock 串行化，同一时刻只有一个线程请求新令牌
+        self._token_lock = threading.Lock()
+        # 每个线程的请求头缓存（令牌变化时重建）
+        self._local = threading.local()
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._decode = get_decoder(json_decoder)
+        self.request_log_level = request_log_level
+        self.metrics = metrics
+        self.hooks: List[RequestHook] = list(hooks or [])
+        self.endpoints = build_endpoints(base_url) if base_url else ENDPOINTS
+        self.cassette = cassette
+        if circuit_breakers is None and CIRCUIT_BREAKER_ENABLED:
+            circuit_breakers = CircuitBreakerRegistry()
+        self.circuit_breakers = circuit_breakers
+        if path_cache is False:
+            path_cache = None
+        elif path_cache is None:
+            path_cache = PathTrie()
+        self.paths: Optional[PathTrie] = path_cache
+        # 按名称创建的传输由本客户端关闭，传入的实例可能与其他客户端共享
+        self._owns_transport = not isinstance(transport, Transport)
+        if self._owns_transport:
+            transport = create_transport(transport or HTTP_TRANSPORT)
+        self.transport: Optional[Transport] = transport
+
+        # 凭证文件只读取一次，同时提供 access_token 和客户端凭证；
+        # 令牌在第一次实际请求时才获取，构造时不访问网络
+        data = self._read_token_file()
+        self.load_access_token(data)
 
         # 如果没有提供client_id和client_secret，尝试从token_file加载
         if not self.client_id or not self.client_secret:
-            self._load_credentials()
+            self._load_credentials(data)
 
         # 验证凭证
         if not self.client_id or not self.client_secret:
@@ -67,48 +172,62 @@ class PanAPI:
                 "无法获取客户端凭证。请检查 access.json 文件或直接传入凭证"
             )
 
-    def _load_credentials(self) -> None:
-        """从token_file加载client_id和client_secret"""
-        if os.path.exists(self.token_file):
-            try:
-                with open(self.token_file, 'r') as f:
-                    data = json.load(f)
-                    if "client_id" in data and "client_secret" in data:
-                        self.client_id = data["client_id"]
-                        self.client_secret = data["client_secret"]
-                        logger.debug("凭证已从文件加载")
-            except json.JSONDecodeError as e:
-                logger.error(f"凭证文件格式错误: {e}")
-            except (IOError, OSError) as e:
-                logger.error(f"读取凭证文件失败: {e}")
-
-    def load_access_token(self) -> Optional[str]:
+    def _read_token_file(self) -> Dict[str, Any]:
+        """读取凭证文件，文件不存在或无法解析时返回空字典"""
+        if not os.path.exists(self.token_file):
+            logger.debug("未找到凭证文件: %s", self.token_file)
+            return {}
+        try:
+            with open(self.token_file, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            logger.error("凭证文件格式错误: %s", e)
+            return {}
+        except (IOError, OSError) as e:
+            logger.error("读取凭证文件失败: %s", e)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _load_credentials(self, data: Optional[Dict[str, Any]] = None) -> None:
         """
-        检查access_token文件的有效性，返回有效的token或None
+        从token_file加载client_id和client_secret
+
+        参数:
+            data: 已读取的凭证文件内容，为None时重新读取文件
         """
-        if os.path.exists(self.token_file):
-            try:
-                with open(self.token_file, 'r') as f:
-                    data = json.load(f)
-                    access_token = data.get('access_token')
-                    expired_at = data.get('expired_at')
-
-                    if access_token and expired_at:
-                        # 检查token是否过期
-                        if time.time() < time.mktime(time.strptime(expired_at, TOKEN_TIME_FORMAT)):
-                            self.access_token = access_token
-                            self.expired_at = expired_at
-                            logger.debug("已加载有效的 Access Token")
-                            return access_token
-                        else:
-                            logger.info("Access Token 已过期，需要重新获取")
-                    else:
-                        logger.warning("Access Token 数据不完整，需要重新获取")
-            except json.JSONDecodeError as e:
-                logger.error(f"Token 文件格式错误: {e}")
-            except (IOError, OSError) as e:
-                logger.debug(f"未找到 Access Token 文件: {e}")
+        if data is None:
+            data = self._read_token_file()
+        if "client_id" in data and "client_secret" in data:
+            self.client_id = data["client_id"]
+            self.client_secret = data["client_secret"]
+            logger.debug("凭证已从文件加载")
+
+    def load_access_token(self, data: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        检查access_token文件的有效性，返回有效的token或None
 
+        参数:
+            data: 已读取的凭证文件内容，为None时重新读取文件
+        """
+        if data is None:
+            data = self._read_token_file()
+        if not data:
+            return None
+
+        access_token = data.get('access_token')
+        expired_at = data.get('expired_at')
+        if not (access_token and expired_at):
+            logger.warning("Access Token 数据不完整，需要重新获取")
+            return None
+
+        # 检查token是否过期
+        if time.time() < time.mktime(time.strptime(expired_at, TOKEN_TIME_FORMAT)):
+            self.access_token = access_token
+            self.expired_at = expired_at
+            logger.debug("已加载有效的 Access Token")
+            return access_token
+
+        logger.info("Access Token 已过期，需要重新获取")
         return None
 
     def save_access_token(self, access_token: str, expired_at: str) -> None:
@@ -143,7 +262,7 @@ class PanAPI:
                 json.dump(data, f)
             logger.debug("Access Token 已保存")
         except (IOError, OSError) as e:
-            logger.error(f"保存 Access Token 失败: {e}")
+            logger.error("保存 Access Token 失败: %s", e)
 
     def get_access_token(self) -> Optional[str]:
         """
@@ -157,74 +276,116 @@ class PanAPI:
             APIError: API 响应错误
         """
         # 如果已有有效token，直接返回
-        if self.access_token and self.expired_at:
-            if time.time() < time.mktime(time.strptime(self.expired_at, TOKEN_TIME_FORMAT)):
+        if self._token_valid():
+            return self.access_token
+
+        with self._token_lock:
+            # 等锁期间其他线程可能已经刷新了令牌
+            if self._token_valid():
                 return self.access_token
+            return self._refresh_with_hooks()
+
+    def _token_valid(self) -> bool:
+        """当前令牌是否存在且未过期"""
+        access_token, expired_at = self.access_token, self.expired_at
+        if not (access_token and expired_at):
+            return False
+        return time.time() < time.mktime(time.strptime(expired_at, TOKEN_TIME_FORMAT))
+
+    def _refresh_with_hooks(self) -> str:
+        """刷新令牌，有钩子时记录刷新耗时（调用方持有 _token_lock）"""
+        hooks = self.hooks
+        if not hooks:
+            return self._refresh_access_token()
+
+        ctx = RequestContext("access_token", "POST", kind=KIND_TOKEN_REFRESH)
+        run_hooks(hooks, "before_token_refresh", ctx)
+        started = time.perf_counter()
+        try:
+            access_token = self._refresh_access_token()
+            ctx.status_code = 200
+            return access_token
+        except (NetworkError, APIError) as e:
+            ctx.error = e
+            ctx.error_code = e.code
+            ctx.status_code = getattr(e, "status_code", None)
+            raise
+        finally:
+            ctx.elapsed = time.perf_counter() - started
+            run_hooks(hooks, "after_token_refresh", ctx)
+
+    def _refresh_access_token(self) -> str:
+        """
+        向服务器请求新的access_token并保存
 
-        # 重新获取token
-        url = ENDPOINTS["access_token"]
-        headers = {
-            "Platform": PLATFORM_HEADER
-        }
+        返回:
+            str: 新的access_token
+
+        Raises:
+            NetworkError: 网络请求失败
+            APIError: API 响应错误
+        """
         body = {
             "clientID": self.client_id,
             "clientSecret": self.client_secret
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=body)
+        data = self._request(
+            "access_token", "POST", '获取 Access Token 失败', body=body, auth=False
+        )
+        access_token = data['data'].get("accessToken")
+        expired_at = data['data'].get("expiredAt")
 
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                except json.JSONDecodeError as e:
-                    raise APIError("API 响应格式错误", original_error=e)
-
-                if data.get("code") == SUCCESS_CODE:
-                    access_token = data['data'].get("accessToken")
-                    expired_at = data['data'].get("expiredAt")
-
-                    # 格式化过期时间
-                    expired_at_formatted_temo_1 = datetime.strptime(expired_at, TOKEN_ISO_FORMAT)
-                    expired_at_timestamp = expired_at_formatted_temo_1.timestamp()
-                    expired_at_formatted = time.strftime(TOKEN_TIME_FORMAT, time.localtime(expired_at_timestamp))
-
-                    logger.info("成功获取 Access Token")
-                    logger.debug(f"Access Token: {access_token}")
-
-                    # 保存token
-                    self.access_token = access_token
-                    self.expired_at = expired_at_formatted
-                    self.save_access_token(access_token, expired_at_formatted)
-
-                    return access_token
-                else:
-                    raise APIError(
-                        data.get('message', '获取 Access Token 失败'),
-                        code=data.get('code'),
-                        status_code=response.status_code,
-                        response_data=data
-                    )
-            else:
-                raise APIError(
-                    f"请求失败，状态码: {response.status_code}",
-                    status_code=response.status_code
-                )
+        # 格式化过期时间
+        expired_at_formatted_temo_1 = datetime.strptime(expired_at, TOKEN_ISO_FORMAT)
+        expired_at_timestamp = expired_at_formatted_temo_1.timestamp()
+        expired_at_formatted = time.strftime(TOKEN_TIME_FORMAT, time.localtime(expired_at_timestamp))
+
+        logger.info("成功获取 Access Token")
+        logger.debug("Access Token: %s", access_token)
+
+        # 保存token（先换令牌：其他线程无锁读取时，新令牌配旧过期时间只会多进一次锁，
+        # 反过来则会把已过期的旧令牌当作有效）
+        self.access_token = access_token
+        self.expired_at = expired_at_formatted
+        self.save_access_token(access_token, expired_at_formatted)
 
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
+        return access_token
+
+    def close(self) -> None:
+        """
+        等待已提交的 submit 任务完成并关闭线程池，再关闭本客户端创建的 HTTP 传输及其连接
+        （传入的共享传输由调用方关闭）
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if self.transport is not None and self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self) -> "PanAPI":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def add_hook(self, hook: RequestHook) -> None:
+        """
+        注册请求钩子
+
+        参数:
+            hook: RequestHook 实例（如 OpenTelemetryHook）
+        """
+        self.hooks.append(hook)
 
     def ensure_token(self) -> Optional[str]:
         """确保有有效的access_token，如果没有则获取新的"""
         if not self.access_token:
             try:
-                self.access_token = self.get_access_token()
+                return self.get_access_token()
             except (NetworkError, APIError) as e:
-                logger.error(f"获取 Access Token 失败: {e}")
+                logger.error("获取 Access Token 失败: %s", e)
                 return None
         return self.access_token
 
@@ -241,6 +402,267 @@ class PanAPI:
         else:
             raise APIError(f"未知错误: {exception}", original_error=exception)
 
+    def _parse_response(self, response: Any, error_message: str) -> Dict[str, Any]:
+        """
+        检查HTTP状态码并解码响应体，返回 code 为成功的响应数据
+
+        参数:
+            response: HTTP 响应对象
+            error_message: 响应中没有 message 时使用的错误信息
+
+        Raises:
+            APIError: HTTP 状态码或 API 返回码表示失败
+            json.JSONDecodeError: 响应体不是合法 JSON
+        """
+        if response.status_code != 200:
+            raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
+
+        data = self._decode(response.content)
+
+        if data.get("code") != SUCCESS_CODE:
+            raise APIError(
+                data.get('message', error_message),
+                code=data.get('code'),
+                status_code=response.status_code,
+                response_data=data
+            )
+        return data
+
+    def _request(
+        self,
+        endpoint: str,
+        method: str,
+        error_message: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        auth: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        向指定端点发送请求，返回成功的响应数据
+
+        所有API方法都经由此方法发出请求，统一处理令牌、请求头、响应解析、异常转换、熔断和指标统计；
+        传给请求钩子的尝试次数（RequestContext.attempt）由重试调用方用 utils.tracing.retry_attempt 设置
+
+        参数:
+            endpoint: 端点名称（config.ENDPOINTS 的键）
+            method: HTTP 方法（"GET"/"POST"）
+            error_message: 响应中没有 message 时使用的错误信息
+            params: URL 查询参数
+            body: JSON 请求体
+            timeout: 请求超时（秒），或 (连接超时, 读取超时)，默认 config.DEFAULT_TIMEOUT
+            auth: 是否携带 access_token
+
+        返回:
+            dict: 完整的响应数据
+
+        Raises:
+            TokenExpiredError: 访问令牌过期
+            CircuitOpenError: 端点所在分组已熔断，请求未发出
+            NetworkError: 网络连接失败
+            APIError: API 请求失败
+        """
+        access_token = None
+        cassette = self.cassette
+        if auth and not (cassette is not None and cassette.replaying):
+            access_token = self.ensure_token()
+            if not access_token:
+                raise TokenExpiredError("无法获取访问令牌")
+        headers = self._headers(access_token)
+
+        # 熔断期间直接失败，不占用连接和线程
+        breaker = None
+        if self.circuit_breakers is not None:
+            breaker = self.circuit_breakers.for_endpoint(endpoint)
+            if not breaker.allow():
+                raise CircuitOpenError(breaker.name, breaker.retry_after())
+
+        metrics = self.metrics
+        hooks = self.hooks
+        ctx = None
+        if hooks:
+            ctx = RequestContext(endpoint, method, params_size(params, body), current_attempt())
+            run_hooks(hooks, "before_request", ctx)
+
+        observed = metrics is not None or ctx is not None
+        started = time.perf_counter() if observed else 0.0
+        response = None
+        error = None
+        error_code = None
+        try:
+            if cassette is not None:
+                response = cassette.request(
+                    endpoint, method, self.endpoints[endpoint], headers=headers, params=params, body=body,
+                    timeout=timeout, transport=self.transport
+                )
+            elif self.transport is not None:
+                response = self.transport.request(
+                    method, self.endpoints[endpoint], headers=headers, params=params, json=body, timeout=timeout
+                )
+            else:
+                response = requests.request(
+                    method, self.endpoints[endpoint], headers=headers, params=params, json=body, timeout=timeout
+                )
+            return self._parse_response(response, error_message)
+        except APIError as e:
+            error = e
+            error_code = e.code if e.code is not None else f"HTTP_{e.status_code}"
+            raise
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            error_code = "INVALID_RESPONSE" if isinstance(e, json.JSONDecodeError) else "NETWORK_ERROR"
+            try:
+                self._handle_request_exceptions(e)
+            except (NetworkError, APIError) as mapped:
+                error = mapped
+                raise
+        finally:
+            if breaker is not None:
+                self._record_circuit(breaker, response, error)
+            if observed:
+                elapsed = time.perf_counter() - started
+                if metrics is not None:
+                    self._record_metrics(metrics, endpoint, elapsed, response, error_code)
+                if ctx is not None:
+                    ctx.elapsed = elapsed
+                    ctx.status_code = response.status_code if response is not None else None
+                    ctx.error = error
+                    ctx.error_code = error_code
+                    run_hooks(hooks, "after_request", ctx)
+
+    def _headers(self, access_token: Optional[str]) -> Dict[str, str]:
+        """
+        当前线程复用的请求头字典
+
+        令牌变化时换成新字典而不是原地修改，已交给传输层的字典不会被其他线程改动
+        """
+        local = self._local
+        if access_token is None:
+            headers = getattr(local, "plain_headers", None)
+            if headers is None:
+                headers = local.plain_headers = {"Platform": PLATFORM_HEADER}
+            return headers
+        headers = getattr(local, "auth_headers", None)
+        if headers is None or headers["Authorization"] != access_token:
+            headers = local.auth_headers = {"Platform": PLATFORM_HEADER, "Authorization": access_token}
+        return headers
+
+    @staticmethod
+    def _record_circuit(breaker: CircuitBreaker, response: Any, error: Optional[Exception]) -> None:
+        """网络错误和 5xx 计为熔断器失败，收到其他响应计为成功"""
+        if isinstance(error, NetworkError) or (isinstance(error, APIError) and (error.status_code or 0) >= 500):
+            breaker.record_failure()
+        elif response is not None:
+            breaker.record_success()
+        else:
+            breaker.release()
+
+    @staticmethod
+    def _record_metrics(
+        metrics: MetricsRegistry,
+        endpoint: str,
+        latency: float,
+        response: Any,
+        error_code: Optional[Any],
+    ) -> None:
+        """将一次请求的结果记录到指标中"""
+        if response is None:
+            metrics.observe(endpoint, latency, error_code=error_code)
+            return
+        request = getattr(response, "request", None)
+        # requests 的 PreparedRequest 为 body，httpx 的 Request 为 content
+        request_body = getattr(request, "body", None) or getattr(request, "content", None)
+        metrics.observe(
+            endpoint,
+            latency,
+            status_code=response.status_code,
+            error_code=error_code,
+            bytes_in=len(response.content or b""),
+            bytes_out=len(request_body) if isinstance(request_body, (bytes, str)) else 0,
+        )
+
+    # 并发调用
+    def _resolve_method(self, method: Method) -> Callable[..., Any]:
+        """把方法名解析为本客户端的绑定方法，可调用对象原样返回"""
+        if callable(method):
+            return method
+        if isinstance(method, str) and not method.startswith("_") and method not in _NOT_SUBMITTABLE:
+            func = getattr(self, method, None)
+            if callable(func):
+                return func
+        raise InvalidParameterError("method", f"不是可调用的 PanAPI 方法: {method!r}")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        executor = self._executor
+        if executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="PanAPI")
+                executor = self._executor
+        return executor
+
+    def submit(self, method: Method, *args: Any, **kwargs: Any) -> Future:
+        """
+        在客户端的共享线程池中调用一个方法，立即返回 Future
+
+        也可以写成 submit_<方法名>(...)，例如 api.submit_get_file_detail(file_id)
+
+        参数:
+            method: 方法名（如 "move_files"）或可调用对象
+            *args, **kwargs: 传给该方法的参数
+
+        返回:
+            Future: result() 返回方法的返回值，或抛出方法的异常（APIError、NetworkError 等）
+
+        Raises:
+            InvalidParameterError: 方法名无效
+        """
+        return self._get_executor().submit(self._resolve_method(method), *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # 只在正常属性查找失败时调用：submit_get_file_detail -> partial(submit, "get_file_detail")
+        if name.startswith("submit_"):
+            target = name[len("submit_"):]
+            if not target.startswith("_") and target not in _NOT_SUBMITTABLE and callable(getattr(type(self), target, None)):
+                return partial(self.submit, target)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def map(
+        self,
+        method: Method,
+        items: Iterable[Any],
+        concurrency: int = CLIENT_MAP_CONCURRENCY,
+        ordered: bool = False,
+        unpack: bool = False,
+    ) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+        """
+        对每个元素并发调用一个方法，边完成边产出结果
+
+        元素按需读取，同时进行的调用不超过 concurrency 个；单个元素失败不影响其他元素，
+        异常随该元素一起产出。提前停止迭代时会等待已发出的调用结束
+
+        参数:
+            method: 方法名（如 "get_direct_link"）或可调用对象
+            items: 参数序列（可以是任意可迭代对象，包括生成器）
+            concurrency: 最大并发调用数
+            ordered: 按输入顺序产出（较慢的调用会推迟其后的结果），默认按完成顺序
+            unpack: 元素是参数元组，以 method(*item) 调用（如 [(file_id, new_name), ...]）
+
+        返回:
+            迭代器，每项为 (元素, 返回值, 异常)；成功时异常为None，失败时返回值为None
+
+        Raises:
+            InvalidParameterError: 方法名无效或 concurrency 不是正整数
+
+        示例:
+            for file_id, link, error in api.map("get_direct_link", file_ids, concurrency=16):
+                ...
+        """
+        func = self._resolve_method(method)
+        if concurrency < 1:
+            raise InvalidParameterError("concurrency", "必须为正整数")
+        call = (lambda item: func(*item)) if unpack else func
+        return bounded_map(call, items, concurrency, ordered=ordered)
+
     # 直链相关API
     def enable_direct_link(self, file_id: int) -> bool:
         """
@@ -257,43 +679,13 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["direct_link_enable"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "fileID": file_id
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=body)
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("code") == SUCCESS_CODE:
-                    logger.info(f"直链空间已成功启用，文件名称: {data.get('filename')}")
-                    return True
-                else:
-                    raise APIError(
-                        data.get('message', '启用直链失败'),
-                        code=data.get('code')
-                    )
-            else:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        data = self._request("direct_link_enable", "POST", '启用直链失败', body=body)
+        logger.info("直链空间已成功启用，文件名称: %s", data.get('filename'))
+        return True
 
     def disable_direct_link(self, file_id: int) -> bool:
         """
@@ -310,43 +702,13 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["direct_link_disable"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "fileID": file_id
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=body)
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("code") == SUCCESS_CODE:
-                    logger.info(f"直链空间已成功禁用，文件名称: {data.get('filename')}")
-                    return True
-                else:
-                    raise APIError(
-                        data.get('message', '禁用直链失败'),
-                        code=data.get('code')
-                    )
-            else:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        data = self._request("direct_link_disable", "POST", '禁用直链失败', body=body)
+        logger.info("直链空间已成功禁用，文件名称: %s", data.get('filename'))
+        return True
 
     def get_direct_link(self, file_id: int) -> str:
         """
@@ -363,44 +725,14 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["direct_link_get"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         params = {
             "fileID": file_id
         }
 
-        try:
-            response = requests.get(url, headers=headers, params=params)
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("code") == SUCCESS_CODE:
-                    direct_link = data['data'].get("url")
-                    logger.info(f"成功获取直链: {direct_link}")
-                    return direct_link
-                else:
-                    raise APIError(
-                        data.get('message', '获取直链失败'),
-                        code=data.get('code')
-                    )
-            else:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        data = self._request("direct_link_get", "GET", '获取直链失败', params=params)
+        direct_link = data['data'].get("url")
+        logger.log(self.request_log_level, "成功获取直链: %s", direct_link)
+        return direct_link
 
     # 文件管理相关API
     def get_file_list(
@@ -409,8 +741,9 @@ class PanAPI:
         limit: int = DEFAULT_PAGE_LIMIT,
         search_data: Optional[str] = None,
         search_mode: Optional[str] = None,
-        last_file_id: Optional[int] = None
-    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        last_file_id: Optional[int] = None,
+        compact: bool = False
+    ) -> Tuple[List[Any], Optional[int]]:
         """
         获取文件列表
 
@@ -420,6 +753,7 @@ class PanAPI:
             search_data: 搜索关键词
             search_mode: 搜索模式
             last_file_id: 上一页最后一个文件ID，用于分页
+            compact: 为True时直接返回 FileEntry 对象列表，解码后的字典不再保留
 
         返回:
             tuple: (file_list, last_file_id) 文件列表和最后一个文件ID
@@ -429,16 +763,6 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["file_list"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
-
         params = {
             "parentFileID": parent_file_id,
             "limit": limit
@@ -453,38 +777,105 @@ class PanAPI:
         if last_file_id is not None:
             params["lastFileID"] = last_file_id
 
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
+        data = self._request("file_list", "GET", '获取文件列表失败', params=params)
 
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
+        page = data.get('data') or {}
+        file_list = page.get('fileList') or []
+        next_file_id = page.get('lastFileID')
 
-            data = response.json()
+        # 列表响应同时填充路径缓存（搜索结果不是完整的文件夹内容）
+        if search_data is None and self.paths is not None:
+            self.paths.add_page(parent_file_id, file_list, last_file_id, next_file_id)
 
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '获取文件列表失败'),
-                    code=data.get('code')
-                )
+        # Debug: Log the raw file list to identify field names
+        if file_list and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sample file data: %s", json.dumps(file_list[0], ensure_ascii=False))
+
+        if compact:
+            from_dict = FileEntry.from_dict
+            file_list = [from_dict(item) for item in file_list]
 
-            file_list = data.get('data', {}).get('fileList', [])
-            last_file_id = data.get('data', {}).get('lastFileID')
+        logger.log(self.request_log_level, "获取文件列表成功: %d 个文件", len(file_list))
+        return file_list, next_file_id
 
-            # Debug: Log the raw file list to identify field names
-            if file_list:
-                logger.debug(f"Sample file data: {json.dumps(file_list[0], ensure_ascii=False)}")
+    def resolve_path(self, path: str) -> int:
+        """
+        将路径（如 "/projects/2026/raw"）解析为文件ID
 
-            logger.info(f"获取文件列表成功: {len(file_list)} 个文件")
-            return file_list, last_file_id
+        已缓存的路径直接返回，不发出请求；只有未缓存的层级才分页列出该文件夹，找到名称即停止。
+        缓存随本客户端的重命名、移动和删除更新，其他客户端的修改需调用 api.paths.clear() 后重新解析
 
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        参数:
+            path: 以 "/" 分隔的路径，"/" 表示根目录
+
+        返回:
+            int: 文件或文件夹ID
+
+        Raises:
+            FileNotFoundError: 路径不存在（api.exceptions.FileNotFoundError）
+            TokenExpiredError: 访问令牌过期
+            NetworkError: 网络连接失败
+            APIError: API 请求失败
+        """
+        paths = self._lookup_paths()
+        parts = split_path(path)
+        file_id = ROOT_DIRECTORY_ID
+        for depth, name in enumerate(parts, 1):
+            if paths.is_folder(file_id) is False:
+                raise PanFileNotFoundError(message=f"不是文件夹: /{'/'.join(parts[:depth - 1])}")
+            child_id, known = paths.child(file_id, name)
+            if child_id is None and not known:
+                child_id = self._find_child(paths, file_id, name)
+            if child_id is None:
+                raise PanFileNotFoundError(message=f"路径不存在: /{'/'.join(parts[:depth])}")
+            file_id = child_id
+        return file_id
+
+    def _lookup_paths(self) -> PathTrie:
+        """路径查找使用的缓存：客户端的路径缓存，禁用时为只在本次查找中使用的临时缓存"""
+        return self.paths if self.paths is not None else PathTrie()
+
+    def _find_child(self, paths: PathTrie, folder_id: int, name: str) -> Optional[int]:
+        """分页列出文件夹直到找到名称，列出的内容写入 paths（客户端缓存由 get_file_list 写入）"""
+        last_file_id = None
+        while True:
+            file_list, next_file_id = self.get_file_list(
+                parent_file_id=folder_id, limit=DEFAULT_PAGE_LIMIT, last_file_id=last_file_id
+            )
+            if paths is not self.paths:
+                paths.add_page(folder_id, file_list, last_file_id, next_file_id)
+            child_id, _ = paths.child(folder_id, name)
+            if child_id is not None:
+                return child_id
+            if not file_list or next_file_id is None or next_file_id == -1:
+                return None
+            last_file_id = next_file_id
+
+    def path_of(self, file_id: int) -> str:
+        """
+        获取文件或文件夹的完整路径
+
+        缓存中没有的祖先通过 get_file_detail 逐级向上查询并写入缓存
+
+        参数:
+            file_id: 文件ID
+
+        返回:
+            str: 以 "/" 开头的路径
+
+        Raises:
+            TokenExpiredError: 访问令牌过期
+            NetworkError: 网络连接失败
+            APIError: API 请求失败
+        """
+        paths = self._lookup_paths()
+        current = file_id
+        while paths.path_of(current) is None:
+            file_info = self.get_file_detail(current)
+            parent_id = file_info.get('parentFileId', ROOT_DIRECTORY_ID)
+            paths.add(current, parent_id, file_info.get('filename'), file_info.get('type') == FILE_TYPE_FOLDER)
+            current = parent_id
+        return paths.path_of(file_id)
 
     def get_file_detail(self, file_id: int) -> Dict[str, Any]:
         """
@@ -501,45 +892,39 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["file_info"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         params = {
             "fileID": file_id
         }
 
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
+        data = self._request("file_info", "GET", '获取文件详情失败', params=params)
 
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
+        file_info = data.get('data')
+        logger.log(self.request_log_level, "成功获取文件详情: %s", file_info.get('filename', 'Unknown'))
+        return file_info
 
-            data = response.json()
+    def get_file_details(
+        self, file_ids: Iterable[int], concurrency: int = FILE_DETAIL_CONCURRENCY
+    ) -> Dict[int, Any]:
+        """
+        批量获取文件详情
 
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '获取文件详情失败'),
-                    code=data.get('code')
-                )
+        开放平台没有批量详情接口，因此去重后以最多 concurrency 个并发请求逐个获取；
+        单个ID失败不影响其他ID
 
-            file_info = data.get('data')
-            logger.info(f"成功获取文件详情: {file_info.get('filename', 'Unknown')}")
-            return file_info
+        参数:
+            file_ids: 文件ID（可重复，可以是任意可迭代对象）
+            concurrency: 最大并发请求数
 
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        返回:
+            dict: fileId -> 文件详情字典；获取失败的ID对应其异常对象（如 APIError、NetworkError）
+        """
+        details: Dict[int, Any] = dict.fromkeys(file_ids)
+        if not details:
+            return {}
+        concurrency = max(1, min(concurrency, len(details)))
+        for file_id, detail, error in self.map(self.get_file_detail, list(details), concurrency):
+            details[file_id] = error if error is not None else detail
+        return details
 
     def print_file_detail(self, file_id):
         """
@@ -578,45 +963,16 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["file_move"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "fileIDs": file_ids,
             "parentFileID": target_parent_id
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=body, timeout=DEFAULT_TIMEOUT)
-
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-            data = response.json()
-
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '文件移动失败'),
-                    code=data.get('code')
-                )
-
-            logger.info("文件移动成功")
-            return True
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        self._request("file_move", "POST", '文件移动失败', body=body)
+        if self.paths is not None:
+            self.paths.move(file_ids, target_parent_id)
+        logger.info("文件移动成功")
+        return True
 
     def rename_files(self, file_id: int, new_name: str) -> bool:
         """
@@ -634,45 +990,75 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["file_rename"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "fileID": file_id,
             "filename": new_name
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=body, timeout=DEFAULT_TIMEOUT)
+        self._request("file_rename", "POST", '文件重命名失败', body=body)
+        if self.paths is not None:
+            self.paths.rename(file_id, new_name)
+        logger.info("文件重命名成功")
+        return True
 
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
+    def create_folder(self, name: str, parent_id: int = ROOT_DIRECTORY_ID) -> int:
+        """
+        创建文件夹
 
-            data = response.json()
+        参数:
+            name: 文件夹名称
+            parent_id: 父文件夹ID，默认为根目录
 
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '文件重命名失败'),
-                    code=data.get('code')
-                )
+        返回:
+            int: 新文件夹ID
 
-            logger.info("文件重命名成功")
-            return True
+        Raises:
+            TokenExpiredError: 访问令牌过期
+            NetworkError: 网络连接失败
+            APIError: API 请求失败（如同名文件夹已存在）
+        """
+        body = {
+            "name": name,
+            "parentID": parent_id
+        }
 
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        data = self._request("file_mkdir", "POST", '创建文件夹失败', body=body)
+        folder_id = data['data']['dirID']
+        if self.paths is not None:
+            self.paths.add(folder_id, parent_id, name, True)
+        logger.info("文件夹创建成功: %s", name)
+        return folder_id
+
+    def make_folders(self, path: str) -> int:
+        """
+        按路径逐级创建文件夹（已存在的层级直接复用，类似 mkdir -p）
+
+        参数:
+            path: 以 "/" 分隔的文件夹路径
+
+        返回:
+            int: 最后一级文件夹ID
+
+        Raises:
+            FileNotFoundError: 路径中的某一级是文件而不是文件夹
+            TokenExpiredError: 访问令牌过期
+            NetworkError: 网络连接失败
+            APIError: API 请求失败
+        """
+        paths = self._lookup_paths()
+        parts = split_path(path)
+        folder_id = ROOT_DIRECTORY_ID
+        for depth, name in enumerate(parts, 1):
+            child_id, known = paths.child(folder_id, name)
+            if child_id is None and not known:
+                child_id = self._find_child(paths, folder_id, name)
+            if child_id is None:
+                child_id = self.create_folder(name, folder_id)
+                paths.add(child_id, folder_id, name, True)
+            elif paths.is_folder(child_id) is False:
+                raise PanFileNotFoundError(message=f"不是文件夹: /{'/'.join(parts[:depth])}")
+            folder_id = child_id
+        return folder_id
 
     def trash_files(self, file_ids: List[int]) -> bool:
         """
@@ -689,44 +1075,15 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["file_trash"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "fileIDs": file_ids
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=body, timeout=DEFAULT_TIMEOUT)
-
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-            data = response.json()
-
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '文件移至回收站失败'),
-                    code=data.get('code')
-                )
-
-            logger.info("文件已移至回收站")
-            return True
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        self._request("file_trash", "POST", '文件移至回收站失败', body=body)
+        if self.paths is not None:
+            self.paths.remove(file_ids)
+        logger.info("文件已移至回收站")
+        return True
 
     def delete_files(self, file_ids: List[int]) -> bool:
         """
@@ -743,35 +1100,29 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
         # 检查每个文件是否在回收站
         files_to_trash = []
         files_to_delete = []
 
-        for file_id in file_ids:
-            try:
-                file_info = self.get_file_detail(file_id)
-                if file_info.get('trashed') == 0:
-                    # 文件不在回收站，需要先移至回收站
-                    files_to_trash.append(file_id)
-                else:
-                    # 文件已在回收站，可以直接删除
-                    files_to_delete.append(file_id)
-            except Exception as e:
-                logger.warning(f"无法获取文件 {file_id} 的详情: {e}，将尝试先移至回收站再删除")
+        for file_id, file_info in self.get_file_details(file_ids).items():
+            if isinstance(file_info, Exception):
+                logger.warning("无法获取文件 %s 的详情: %s，将尝试先移至回收站再删除", file_id, file_info)
+                files_to_trash.append(file_id)
+            elif file_info.get('trashed') == 0:
+                # 文件不在回收站，需要先移至回收站
                 files_to_trash.append(file_id)
+            else:
+                # 文件已在回收站，可以直接删除
+                files_to_delete.append(file_id)
 
         # 先将需要移至回收站的文件移至回收站
         if files_to_trash:
-            logger.info(f"将 {len(files_to_trash)} 个文件移至回收站")
+            logger.info("将 %d 个文件移至回收站", len(files_to_trash))
             try:
                 self.trash_files(files_to_trash)
-                logger.info(f"成功将 {len(files_to_trash)} 个文件移至回收站")
+                logger.info("成功将 %d 个文件移至回收站", len(files_to_trash))
             except Exception as e:
-                logger.warning(f"移至回收站失败: {e}，将继续尝试永久删除")
+                logger.warning("移至回收站失败: %s，将继续尝试永久删除", e)
 
         # 再删除所有文件（包括刚刚移至回收站的和已在回收站的）
         all_files_to_delete = files_to_trash + files_to_delete
@@ -779,40 +1130,15 @@ class PanAPI:
             logger.info("没有需要删除的文件")
             return True
 
-        url = ENDPOINTS["file_delete"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "fileIDs": all_files_to_delete
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=body, timeout=DEFAULT_TIMEOUT)
-
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-            data = response.json()
-
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '文件永久删除失败'),
-                    code=data.get('code')
-                )
-
-            logger.info("文件已永久删除")
-            return True
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        self._request("file_delete", "POST", '文件永久删除失败', body=body)
+        if self.paths is not None:
+            self.paths.remove(all_files_to_delete)
+        logger.info("文件已永久删除")
+        return True
 
     def recover_files(self, file_ids: List[int]) -> bool:
         """
@@ -829,44 +1155,16 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["file_recover"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "fileIDs": file_ids
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=body, timeout=DEFAULT_TIMEOUT)
-
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-            data = response.json()
-
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '文件恢复失败'),
-                    code=data.get('code')
-                )
-
-            logger.info("文件已从回收站恢复")
-            return True
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        self._request("file_recover", "POST", '文件恢复失败', body=body)
+        # 恢复的文件回到原文件夹，已缓存的文件夹列表不再完整
+        if self.paths is not None:
+            self.paths.invalidate_listings()
+        logger.info("文件已从回收站恢复")
+        return True
 
     # 分享相关API
     def get_share_list(self, limit: int = DEFAULT_PAGE_LIMIT, last_share_id: Optional[int] = None) -> Dict[str, Any]:
@@ -885,15 +1183,6 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["share_list"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         params = {
             "limit": limit
         }
@@ -901,31 +1190,9 @@ class PanAPI:
         if last_share_id:
             params["lastShareId"] = last_share_id
 
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
-
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-            data = response.json()
-
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '获取分享列表失败'),
-                    code=data.get('code')
-                )
-
-            logger.info("获取分享链接列表成功")
-            return data['data']
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        data = self._request("share_list", "GET", '获取分享列表失败', params=params)
+        logger.log(self.request_log_level, "获取分享链接列表成功")
+        return data['data']
 
     def update_share_info(
         self,
@@ -951,15 +1218,6 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["share_update"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "shareIDs": share_id_list,
             "trafficSwitch": traffic_switch
@@ -971,31 +1229,9 @@ class PanAPI:
             if traffic_limit_switch == 2 and traffic_limit is not None:
                 body["trafficLimit"] = traffic_limit
 
-        try:
-            response = requests.post(url, headers=headers, json=body, timeout=DEFAULT_TIMEOUT)
-
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
-
-            data = response.json()
-
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '分享信息更新失败'),
-                    code=data.get('code')
-                )
-
-            logger.info("分享信息更新成功")
-            return True
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        self._request("share_update", "POST", '分享信息更新失败', body=body)
+        logger.info("分享信息更新成功")
+        return True
 
     def create_share_link(
         self,
@@ -1027,15 +1263,6 @@ class PanAPI:
             NetworkError: 网络连接失败
             APIError: API 请求失败
         """
-        access_token = self.ensure_token()
-        if not access_token:
-            raise TokenExpiredError("无法获取访问令牌")
-
-        url = ENDPOINTS["share_create"]
-        headers = {
-            "Authorization": access_token,
-            "Platform": PLATFORM_HEADER
-        }
         body = {
             "fileIDs": file_id_list,
             "shareName": share_name,
@@ -1052,32 +1279,11 @@ class PanAPI:
             if traffic_limit_switch == 2 and traffic_limit is not None:
                 body["trafficLimit"] = traffic_limit
 
-        try:
-            response = requests.post(url, headers=headers, json=body, timeout=DEFAULT_TIMEOUT)
-
-            if response.status_code != 200:
-                raise APIError(f"HTTP {response.status_code}", status_code=response.status_code)
+        data = self._request("share_create", "POST", '创建分享链接失败', body=body)
 
-            data = response.json()
-
-            if data.get("code") != SUCCESS_CODE:
-                raise APIError(
-                    data.get('message', '创建分享链接失败'),
-                    code=data.get('code')
-                )
-
-            share_info = data.get('data')
-            logger.info("分享创建成功")
-            logger.info(f"分享ID: {share_info.get('shareID')}")
-            logger.info(f"分享链接: {share_info.get('shareUrl')}")
-            logger.info(f"分享密码: {share_info.get('sharePwd') or '无'}")
-            return share_info
-
-        except requests.exceptions.ConnectionError as e:
-            raise NetworkError(f"网络连接失败: {e}", original_error=e)
-        except requests.exceptions.Timeout as e:
-            raise NetworkError(f"请求超时: {e}", original_error=e)
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"请求失败: {e}", original_error=e)
-        except json.JSONDecodeError as e:
-            raise APIError("响应格式错误", original_error=e)
+        share_info = data.get('data')
+        logger.info("分享创建成功")
+        logger.info("分享ID: %s", share_info.get('shareID'))
+        logger.info("分享链接: %s", share_info.get('shareUrl'))
+        logger.info("分享密码: %s", share_info.get('sharePwd') or '无')
+        return share_info
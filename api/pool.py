@@ -0,0 +1,261 @@
+"""
+Pool of PanAPI clients for several developer accounts
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import RATE_LIMITED_CODE
+from utils.logger import setup_logger
+from utils.tracing import retry_attempt
+from .exceptions import APIError, NetworkError
+from .pan_api import PanAPI
+
+logger = setup_logger(__name__)
+
+# Read-only methods that any account in the pool may serve
+READ_METHODS = ("get_file_list", "get_file_detail", "get_direct_link")
+
+
+class PoolMember:
+    """One account in a ClientPool, with its routing statistics"""
+
+    def __init__(self, name: str, api: PanAPI, qps: Optional[float], now: float):
+        """
+        Initialize PoolMember
+
+        Args:
+            name: Account name used to pin writes
+            api: Client bound to this account's credentials
+            qps: Requests per second this account may make (None: unlimited)
+            now: Current time of the pool clock
+        """
+        self.name = name
+        self.api = api
+        self.qps = qps
+        self.in_flight = 0
+        self.latency = 0.0  # EWMA of successful request latency, seconds
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.cooldown_until = 0.0
+        self._tokens = qps or 0.0
+        self._refilled = now
+
+    def ready_at(self, now: float) -> float:
+        """Earliest time this member can take a request (<= now if it can right away)"""
+        if self.qps is None:
+            return self.cooldown_until
+        tokens = min(self.qps, self._tokens + (now - self._refilled) * self.qps)
+        quota_at = now if tokens >= 1 else now + (1 - tokens) / self.qps
+        return max(self.cooldown_until, quota_at)
+
+    def take(self, now: float) -> None:
+        """Account for one request starting now"""
+        if self.qps is not None:
+            self._tokens = min(self.qps, self._tokens + (now - self._refilled) * self.qps) - 1
+            self._refilled = now
+        self.in_flight += 1
+        self.requests += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "in_flight": self.in_flight,
+            "latency": self.latency,
+            "cooldown_until": self.cooldown_until,
+        }
+
+
+class PoolReader:
+    """
+    PanAPI look-alike that routes READ_METHODS through a ClientPool
+
+    Pass it wherever a PanAPI is used for reading, e.g., TreeCrawler(pool.reader()).
+    """
+
+    def __init__(self, pool: "ClientPool"):
+        self._pool = pool
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name not in READ_METHODS:
+            raise AttributeError(f"{name} 不是只读方法，请通过 ClientPool.client(name) 调用")
+        return lambda *args, **kwargs: self._pool.call(name, *args, **kwargs)
+
+
+class ClientPool:
+    """
+    Spread read traffic over several accounts and pin writes to one
+
+    Each read goes to the account that can start it soonest: accounts out of
+    QPS quota or cooling down after a rate-limit/network error are skipped,
+    and among the rest the one with the lowest (in-flight + 1) x latency wins.
+    A read that hits a rate limit or network error is retried, on another
+    account if there is one. Writes must go through ``client(name)``, the account that owns
+    the files.
+
+    Usage:
+        pool = ClientPool.from_accounts([
+            {"name": "a", "client_id": "...", "client_secret": "...", "token_file": "a.json"},
+            {"name": "b", "client_id": "...", "client_secret": "...", "token_file": "b.json"},
+        ], qps=5)
+        files = list(TreeCrawler(pool.reader()))
+        pool.client("a").move_files(ids, target)
+    """
+
+    def __init__(
+        self,
+        clients: Optional[Dict[str, PanAPI]] = None,
+        qps: Optional[float] = None,
+        cooldown: float = 5.0,
+        retries: int = 3,
+        latency_weight: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize ClientPool
+
+        Args:
+            clients: Account name -> PanAPI
+            qps: Default per-account request rate (None: unlimited)
+            cooldown: Seconds an account is skipped after a rate-limit or network error
+            retries: How many times a read is retried after such errors
+            latency_weight: Weight of the newest sample in the latency average
+            clock: Monotonic time source
+            sleep: Used to wait when every account is out of quota
+        """
+        self.qps = qps
+        self.cooldown = cooldown
+        self.retries = retries
+        self.latency_weight = latency_weight
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._members: Dict[str, PoolMember] = {}
+        for name, api in (clients or {}).items():
+            self.add(name, api)
+
+    @classmethod
+    def from_accounts(cls, accounts: Iterable[Dict[str, Any]], **options: Any) -> "ClientPool":
+        """
+        Build a pool from credential dicts
+
+        Args:
+            accounts: Dicts with name, client_id, client_secret and token_file,
+                plus optional qps and any other PanAPI keyword argument
+            **options: ClientPool keyword arguments
+        """
+        pool = cls(**options)
+        for account in accounts:
+            account = dict(account)
+            name = account.pop("name")
+            qps = account.pop("qps", None)
+            pool.add(name, PanAPI(**account), qps=qps)
+        return pool
+
+    def add(self, name: str, api: PanAPI, qps: Optional[float] = None) -> None:
+        """Add an account; qps overrides the pool default"""
+        with self._lock:
+            if name in self._members:
+                raise ValueError(f"账号已存在: {name}")
+            self._members[name] = PoolMember(name, api, qps if qps is not None else self.qps, self.clock())
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._members)
+
+    def client(self, name: str) -> PanAPI:
+        """The client of one account, for writes and account-scoped reads (e.g., shares)"""
+        try:
+            return self._members[name].api
+        except KeyError:
+            raise KeyError(f"未知账号: {name}") from None
+
+    def reader(self) -> PoolReader:
+        return PoolReader(self)
+
+    def _acquire(self, exclude: set) -> PoolMember:
+        """Pick the best member not in exclude (any member once all were tried), waiting if needed"""
+        while True:
+            with self._lock:
+                now = self.clock()
+                candidates = [m for m in self._members.values() if m.name not in exclude] or list(
+                    self._members.values()
+                )
+                if not candidates:
+                    raise ValueError("客户端池为空")
+                ready = [m for m in candidates if m.ready_at(now) <= now]
+                if ready:
+                    member = min(ready, key=lambda m: (m.in_flight + 1) * m.latency)
+                    member.take(now)
+                    return member
+                wait = min(m.ready_at(now) for m in candidates) - now
+            self.sleep(max(wait, 0.001))
+
+    def _release(self, member: PoolMember, started: float, error: Optional[BaseException]) -> None:
+        with self._lock:
+            now = self.clock()
+            member.in_flight -= 1
+            if error is None:
+                elapsed = now - started
+                weight = self.latency_weight if member.latency else 1.0
+                member.latency += weight * (elapsed - member.latency)
+                return
+            member.errors += 1
+            if isinstance(error, APIError) and error.code == RATE_LIMITED_CODE:
+                member.rate_limited += 1
+            # An open circuit knows when it will let requests through again
+            member.cooldown_until = now + max(self.cooldown, getattr(error, "retry_after", 0.0))
+
+    @staticmethod
+    def _is_transient(error: BaseException) -> bool:
+        """Errors caused by the account or connection rather than the request"""
+        return isinstance(error, NetworkError) or (
+            isinstance(error, APIError) and (error.code == RATE_LIMITED_CODE or (error.status_code or 0) >= 500)
+        )
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a read method on the best available account
+
+        Args:
+            method: One of READ_METHODS
+            *args, **kwargs: Passed to the PanAPI method
+
+        Raises:
+            ValueError: If method is not a read method
+            The last error once retries are used up; errors that are not
+            rate-limit, network or server errors are raised immediately
+        """
+        if method not in READ_METHODS:
+            raise ValueError(f"{method} 不是只读方法")
+        tried: set = set()
+        attempt = 0
+        while True:
+            member = self._acquire(tried)
+            started = self.clock()
+            try:
+                with retry_attempt(attempt + 1):
+                    result = getattr(member.api, method)(*args, **kwargs)
+            except Exception as e:
+                transient = self._is_transient(e)
+                self._release(member, started, e if transient else None)
+                if not transient or attempt >= self.retries:
+                    raise
+                attempt += 1
+                tried.add(member.name)
+                if len(tried) >= len(self._members):
+                    tried.clear()
+                logger.info("账号 %s 请求失败 (%s)，重试", member.name, e)
+                continue
+            self._release(member, started, None)
+            return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-account routing statistics"""
+        with self._lock:
+            return {name: member.snapshot() for name, member in self._members.items()}
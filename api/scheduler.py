@@ -0,0 +1,255 @@
+"""
+Priority scheduler for requests that share one account's quota
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from config import SCHEDULER_CLASS_LIMITS, SCHEDULER_CONCURRENCY, SCHEDULER_WEIGHTS
+from .pan_api import PanAPI
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BULK)
+
+# Class of a PanAPI method when the caller does not choose one
+METHOD_PRIORITIES = {
+    "get_direct_link": PRIORITY_INTERACTIVE,
+    "get_file_detail": PRIORITY_INTERACTIVE,
+    "get_file_list": PRIORITY_BULK,
+}
+
+# PanAPI methods that send exactly one request. Composite methods (delete_files,
+# get_file_details, map, resolve_path, make_folders, path_of) would hold one
+# slot while fanning out into many requests, past the concurrency and QPS caps
+SCHEDULED_METHODS = (
+    "get_direct_link", "enable_direct_link", "disable_direct_link",
+    "get_file_list", "get_file_detail",
+    "move_files", "rename_files", "create_folder", "trash_files", "recover_files",
+    "get_share_list", "create_share_link", "update_share_info",
+)
+
+
+class _Ticket:
+    """One queued call, granted a slot by the scheduler"""
+
+    __slots__ = ("priority", "enqueued", "granted", "start_at")
+
+    def __init__(self, priority: str, enqueued: float):
+        self.priority = priority
+        self.enqueued = enqueued
+        self.granted = threading.Event()
+        self.start_at = 0.0
+
+
+class _PriorityClass:
+    """Queue and counters of one priority class"""
+
+    def __init__(self, name: str, weight: float, limit: int):
+        self.name = name
+        self.weight = weight
+        self.limit = limit
+        self.queue: Deque[_Ticket] = deque()
+        self.in_flight = 0
+        self.passed = 0.0  # stride-scheduling virtual time
+        self.dispatched = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self.queue),
+            "in_flight": self.in_flight,
+            "dispatched": self.dispatched,
+            "wait_avg": self.wait_total / self.dispatched if self.dispatched else 0.0,
+            "wait_max": self.wait_max,
+        }
+
+
+class RequestScheduler:
+    """
+    Share a client's concurrency (and optionally QPS) between priority classes
+
+    At most ``concurrency`` calls run at once, and at most ``limits[class]`` of
+    them from one class. When a slot frees up, the waiting classes are served
+    in proportion to their weights (stride scheduling: each dispatch advances
+    the class's virtual time by 1/weight and the class that would finish its
+    next call earliest in virtual time goes next), so interactive calls overtake bulk listing pages without starving
+    them. Within a class calls run first come, first served.
+
+    Calls run in the caller's thread; the scheduler only decides when.
+
+    Usage:
+        scheduler = RequestScheduler(api, concurrency=8, qps=10)
+        url = scheduler.call("get_direct_link", file_id)     # interactive by default
+        files = list(TreeCrawler(scheduler.client(PRIORITY_BULK)))
+    """
+
+    def __init__(
+        self,
+        api: PanAPI,
+        concurrency: int = SCHEDULER_CONCURRENCY,
+        weights: Optional[Dict[str, float]] = None,
+        limits: Optional[Dict[str, int]] = None,
+        qps: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize RequestScheduler
+
+        Args:
+            api: Client whose calls are scheduled
+            concurrency: Calls running at once over all classes
+            weights: Share of dispatches per class (default: config.SCHEDULER_WEIGHTS)
+            limits: Calls running at once per class (default: config.SCHEDULER_CLASS_LIMITS)
+            qps: Calls started per second over all classes (None: unlimited)
+            clock: Monotonic time source
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        weights = {**SCHEDULER_WEIGHTS, **(weights or {})}
+        limits = {**SCHEDULER_CLASS_LIMITS, **(limits or {})}
+        self.api = api
+        self.concurrency = concurrency
+        self.qps = qps
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._classes = {name: _PriorityClass(name, weights[name], limits[name]) for name in PRIORITIES}
+        self._in_flight = 0
+        self._next_start = 0.0
+
+    def _pick(self) -> Optional[_PriorityClass]:
+        """Class to dispatch next, or None if no slot or no eligible call (caller holds _lock)"""
+        if self._in_flight >= self.concurrency:
+            return None
+        eligible = [c for c in self._classes.values() if c.queue and c.in_flight < c.limit]
+        if not eligible:
+            return None
+        # Smallest virtual finish time; PRIORITIES order breaks ties in favour of the more urgent class
+        return min(eligible, key=lambda c: c.passed + 1.0 / c.weight)
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting calls (caller holds _lock)"""
+        while True:
+            cls = self._pick()
+            if cls is None:
+                return
+            ticket = cls.queue.popleft()
+            now = self.clock()
+            cls.passed += 1.0 / cls.weight
+            cls.in_flight += 1
+            cls.dispatched += 1
+            self._in_flight += 1
+            if self.qps:
+                # Quota is handed out in dispatch order, so urgent calls get it first
+                ticket.start_at = max(now, self._next_start)
+                self._next_start = ticket.start_at + 1.0 / self.qps
+            waited = now - ticket.enqueued
+            cls.wait_total += waited
+            cls.wait_max = max(cls.wait_max, waited)
+            ticket.granted.set()
+
+    def _enqueue(self, priority: str) -> _Ticket:
+        if priority not in self._classes:
+            raise ValueError(f"未知优先级: {priority}")
+        with self._lock:
+            cls = self._classes[priority]
+            if not cls.queue and cls.in_flight == 0:
+                # A class returning from idle does not get credit for the time it was away
+                busy = [c.passed for c in self._classes.values() if c is not cls and (c.queue or c.in_flight)]
+                if busy:
+                    cls.passed = max(cls.passed, min(busy))
+            ticket = _Ticket(priority, self.clock())
+            cls.queue.append(ticket)
+            self._dispatch()
+        return ticket
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._lock:
+            self._classes[ticket.priority].in_flight -= 1
+            self._in_flight -= 1
+            self._dispatch()
+
+    def _cancel(self, ticket: _Ticket) -> None:
+        """Withdraw a call interrupted while waiting (it may have been granted meanwhile)"""
+        with self._lock:
+            queue = self._classes[ticket.priority].queue
+            if ticket in queue:
+                queue.remove(ticket)
+                return
+        self._release(ticket)
+
+    def run(self, priority: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run func once the scheduler grants a slot to this priority class
+
+        Args:
+            priority: One of PRIORITIES
+            func: Callable to run (usually a PanAPI method)
+            *args, **kwargs: Passed to func
+        """
+        ticket = self._enqueue(priority)
+        try:
+            ticket.granted.wait()
+        except BaseException:
+            self._cancel(ticket)
+            raise
+        try:
+            delay = ticket.start_at - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+            return func(*args, **kwargs)
+        finally:
+            self._release(ticket)
+
+    def call(self, method: str, *args: Any, priority: Optional[str] = None, **kwargs: Any) -> Any:
+        """
+        Run a PanAPI method through the scheduler
+
+        Args:
+            method: One of SCHEDULED_METHODS
+            priority: Priority class (default: METHOD_PRIORITIES, else normal)
+            *args, **kwargs: Passed to the method
+
+        Raises:
+            ValueError: If method sends more than one request
+        """
+        if method not in SCHEDULED_METHODS:
+            raise ValueError(f"{method} 会发出多个请求，不能作为一次调用调度")
+        if priority is None:
+            priority = METHOD_PRIORITIES.get(method, PRIORITY_NORMAL)
+        return self.run(priority, getattr(self.api, method), *args, **kwargs)
+
+    def client(self, priority: Optional[str] = None) -> "ScheduledClient":
+        """PanAPI look-alike whose calls go through the scheduler with one priority"""
+        return ScheduledClient(self, priority)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-class queue lengths, dispatch counts and queueing delay (seconds)"""
+        with self._lock:
+            return {name: cls.snapshot() for name, cls in self._classes.items()}
+
+
+class ScheduledClient:
+    """
+    PanAPI look-alike that runs SCHEDULED_METHODS through a RequestScheduler
+
+    Pass it wherever a PanAPI is used, e.g., TreeCrawler(scheduler.client(PRIORITY_BULK)).
+    Other public methods send several requests and are not available; call
+    them on the scheduler's api, or schedule the requests they are made of.
+    """
+
+    def __init__(self, scheduler: RequestScheduler, priority: Optional[str] = None):
+        self._scheduler = scheduler
+        self._priority = priority
+
+    def __getattr__(self, name: str) -> Any:
+        if name in SCHEDULED_METHODS:
+            return lambda *args, **kwargs: self._scheduler.call(name, *args, priority=self._priority, **kwargs)
+        attr = getattr(self._scheduler.api, name)
+        if callable(attr) and not name.startswith("_"):
+            raise AttributeError(f"{name} 会发出多个请求，不能通过 ScheduledClient 调用")
+        return attr
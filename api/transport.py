@@ -0,0 +1,191 @@
+"""
+HTTP transports for PanAPI
+
+By default PanAPI calls ``requests.request`` for every request, which opens
+a new connection each time. A transport replaces that call:
+
+    HTTP1Transport  shared requests.Session; keep-alive HTTP/1.1 connections,
+                    but still one connection per request in flight
+    HTTP2Transport  httpx client; concurrent requests are multiplexed as
+                    streams over a few HTTP/2 connections (optional dependency:
+                    pip install "httpx[http2]")
+
+Transports return response objects with ``status_code`` and ``content`` and
+raise requests exceptions, so PanAPI maps errors the same way whichever one
+is used. A transport is thread-safe and may be shared by several clients.
+
+Usage:
+    api = PanAPI(transport="http2")             # or config.HTTP_TRANSPORT
+    api = PanAPI(transport=HTTP2Transport(max_connections=1))
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+from config import HTTP1_POOL_SIZE, HTTP2_MAX_CONNECTIONS
+from utils.lazy import lazy_import
+
+requests = lazy_import("requests")
+httpx = lazy_import("httpx", optional=True)
+# Only HTTP2Transport needs an event loop
+asyncio = lazy_import("asyncio")
+
+TRANSPORT_REQUESTS = "requests"
+TRANSPORT_HTTP1 = "http1"
+TRANSPORT_HTTP2 = "http2"
+TRANSPORTS = (TRANSPORT_REQUESTS, TRANSPORT_HTTP1, TRANSPORT_HTTP2)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class Transport:
+    """Interface of PanAPI transports"""
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> Any:
+        """
+        Send one request
+
+        Args:
+            method, url, headers, params, json, timeout: As for requests.request
+
+        Raises:
+            requests.exceptions.RequestException: On connection errors and timeouts
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Close the pooled connections"""
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class HTTP1Transport(Transport):
+    """Keep-alive HTTP/1.1 connection pool (requests.Session)"""
+
+    def __init__(self, pool_size: int = HTTP1_POOL_SIZE):
+        """
+        Initialize HTTP1Transport
+
+        Args:
+            pool_size: Idle connections kept per host; size it to the number
+                of requests in flight, or extra connections are opened and
+                dropped after use
+        """
+        self.pool_size = pool_size
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def request(self, method, url, headers=None, params=None, json=None, timeout=None):
+        return self._session.request(method, url, headers=headers, params=params, json=json, timeout=timeout)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def __repr__(self) -> str:
+        return f"HTTP1Transport(pool_size={self.pool_size})"
+
+
+class HTTP2Transport(Transport):
+    """
+    HTTP/2 transport (httpx) that multiplexes concurrent requests over few connections
+
+    Requests run on an httpx.AsyncClient driven by a private event loop
+    thread; calling threads block on their own request only. httpx's sync
+    HTTP/2 connection is not safe to share between threads (concurrent
+    requests can send their stream IDs out of order, which servers reject),
+    while on one event loop streams are opened strictly in order.
+    """
+
+    def __init__(self, max_connections: int = HTTP2_MAX_CONNECTIONS, prior_knowledge: bool = False):
+        """
+        Initialize HTTP2Transport
+
+        Args:
+            max_connections: Connections per host; each carries as many
+                concurrent streams as the server allows
+            prior_knowledge: Speak HTTP/2 without negotiation. Needed for
+                cleartext "http://" servers (such as the benchmark stand-in);
+                over "https://" HTTP/2 is negotiated via ALPN and a server
+                without it is served over HTTP/1.1
+
+        Raises:
+            ImportError: If httpx or its HTTP/2 support (h2) is not installed
+        """
+        if httpx is None:
+            raise ImportError('HTTP/2 传输需要 httpx: pip install "httpx[http2]"')
+        self.max_connections = max_connections
+        self.prior_knowledge = prior_knowledge
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        # httpx raises ImportError here if the h2 package is missing
+        self._client = httpx.AsyncClient(http1=not prior_knowledge, http2=True, limits=limits)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http2-transport", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _timeout(timeout: Optional[Timeout]) -> Any:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    def request(self, method, url, headers=None, params=None, json=None, timeout=None):
+        call = self._client.request(
+            method, url, headers=headers, params=params, json=json, timeout=self._timeout(timeout)
+        )
+        try:
+            return asyncio.run_coroutine_threadsafe(call, self._loop).result()
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(str(e)) from e
+        except httpx.TimeoutException as e:
+            # Read, write and pool timeouts
+            raise requests.exceptions.Timeout(str(e)) from e
+        except (httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __repr__(self) -> str:
+        return f"HTTP2Transport(max_connections={self.max_connections})"
+
+
+def create_transport(name: str) -> Optional[Transport]:
+    """
+    Transport for a config.HTTP_TRANSPORT name
+
+    Returns:
+        None for "requests" (PanAPI then calls requests.request directly)
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: For "http2" without httpx[http2] installed
+    """
+    if name == TRANSPORT_REQUESTS:
+        return None
+    if name == TRANSPORT_HTTP1:
+        return HTTP1Transport()
+    if name == TRANSPORT_HTTP2:
+        return HTTP2Transport()
+    raise ValueError(f"未知的 HTTP 传输: {name}，可选 {', '.join(TRANSPORTS)}")
@@ -0,0 +1,3 @@
+"""
+Benchmarks for 123Pan API wrapper, run against a local stand-in server
+"""
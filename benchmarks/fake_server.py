@@ -0,0 +1,495 @@
+"""
+Local stand-in for the 123Pan open API
+
+Implements every endpoint in config.ENDPOINT_PATHS against an in-memory file
+tree, with configurable latency, page size cap, error injection and rate
+limiting. Used by the benchmark scenarios and by integration tests.
+"""
+
+import bisect
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config import ENDPOINT_PATHS, FILE_TYPE_FILE, FILE_TYPE_FOLDER, RATE_LIMITED_CODE
+
+API_PREFIX = "/api"
+FAKE_TOKEN = "fake-access-token"
+FAKE_TOKEN_EXPIRY = "2099-01-01T00:00:00+08:00"
+
+CODE_OK = 0
+CODE_RATE_LIMITED = RATE_LIMITED_CODE
+CODE_NOT_FOUND = 5066
+CODE_BAD_REQUEST = 400
+CODE_UNAUTHORIZED = 401
+
+
+class FakePanState:
+    """In-memory file tree and shares"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files: Dict[int, Dict[str, Any]] = {}
+        # parent ID -> sorted child IDs (sorted order makes lastFileID cursors cheap)
+        self.children: Dict[int, List[int]] = {0: []}
+        self.shares: List[Dict[str, Any]] = []
+        self.direct_link_enabled: set = set()
+        self._next_file_id = 1
+        self._next_share_id = 1
+
+    def add_file(self, parent_id: int, filename: str, is_folder: bool = False, size: int = 0) -> int:
+        """Create a file or folder and return its ID"""
+        file_id = self._next_file_id
+        self._next_file_id += 1
+        stamp = "2026-01-01 00:00:00"
+        self.files[file_id] = {
+            "fileId": file_id,
+            "filename": filename,
+            "type": FILE_TYPE_FOLDER if is_folder else FILE_TYPE_FILE,
+            "size": size,
+            "etag": "" if is_folder else f"{file_id:032x}",
+            "status": 0,
+            "parentFileId": parent_id,
+            "category": 0,
+            "trashed": 0,
+            "createAt": stamp,
+            "updateAt": stamp,
+        }
+        self.children.setdefault(parent_id, []).append(file_id)
+        if is_folder:
+            self.children[file_id] = []
+        return file_id
+
+    def add_share(self, file_ids: List[int], name: str, pwd: str = "", expire_days: int = 7) -> Dict[str, Any]:
+        """Create a share and return its record"""
+        share_id = self._next_share_id
+        self._next_share_id += 1
+        share = {
+            "shareId": share_id,
+            "shareKey": f"key{share_id}",
+            "shareName": name,
+            "expiration": "2099-01-01 00:00:00" if expire_days == 0 else "2026-12-31 00:00:00",
+            "expired": 0,
+            "sharePwd": pwd,
+            "trafficSwitch": 1,
+            "trafficLimitSwitch": 1,
+            "trafficLimit": 0,
+            "bytesCharge": 0,
+            "fileIdList": ",".join(str(file_id) for file_id in file_ids),
+        }
+        self.shares.append(share)
+        return share
+
+    def move(self, file_id: int, parent_id: int) -> None:
+        file_info = self.files[file_id]
+        self.children[file_info["parentFileId"]].remove(file_id)
+        bisect.insort(self.children.setdefault(parent_id, []), file_id)
+        file_info["parentFileId"] = parent_id
+
+    @classmethod
+    def generate_tree(
+        cls,
+        depth: int = 3,
+        folders_per_folder: int = 4,
+        files_per_folder: int = 50,
+        shares: int = 0,
+        seed: int = 0,
+    ) -> "FakePanState":
+        """
+        Build a regular tree for benchmarks
+
+        Args:
+            depth: Number of folder levels below the root
+            folders_per_folder: Sub-folders per folder
+            files_per_folder: Plain files per folder
+            shares: Number of shares to create over random files
+            seed: Random seed for file sizes and share picks
+        """
+        rng = random.Random(seed)
+        state = cls()
+        level = [0]
+        for current_depth in range(depth + 1):
+            next_level = []
+            for parent_id in level:
+                for index in range(files_per_folder):
+                    state.add_file(parent_id, f"file_{parent_id}_{index}.dat", size=rng.randint(1, 1 << 30))
+                if current_depth < depth:
+                    for index in range(folders_per_folder):
+                        next_level.append(state.add_file(parent_id, f"dir_{parent_id}_{index}", is_folder=True))
+            level = next_level
+        file_ids = [file_id for file_id, info in state.files.items() if info["type"] == FILE_TYPE_FILE]
+        for index in range(shares):
+            state.add_share([rng.choice(file_ids)], f"share_{index}")
+        return state
+
+
+class FakePanApp:
+    """
+    Protocol-independent request handling for the fake API
+
+    ``handle`` maps (method, path, query, body) to (HTTP status, JSON payload),
+    so the same behaviour can be served over any HTTP front end.
+    """
+
+    def __init__(
+        self,
+        state: Optional[FakePanState] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        max_page_size: int = 100,
+        error_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        seed: int = 0,
+    ):
+        """
+        Initialize FakePanApp
+
+        Args:
+            state: File tree to serve (default: empty root)
+            latency: Fixed delay added to every request, in seconds
+            jitter: Extra uniformly distributed delay, in seconds
+            max_page_size: Cap applied to the limit of list requests
+            error_rate: Probability of answering a request with HTTP 503
+            rate_limit: Requests per second allowed per access token (i.e., per
+                account) before code 429 is returned
+            seed: Random seed for jitter and error injection
+        """
+        self.state = state or FakePanState()
+        self.latency = latency
+        self.jitter = jitter
+        self.max_page_size = max_page_size
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        # access token -> (tokens, last refill time)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self.request_counts: Dict[str, int] = {}
+        self._routes = {
+            f"{API_PREFIX}{path}": (name, getattr(self, f"_handle_{name}"))
+            for name, path in ENDPOINT_PATHS.items()
+        }
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        body: bytes,
+        token: Optional[str] = None,
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Handle one request and return (HTTP status, JSON payload); token selects the rate limit bucket"""
+        route = self._routes.get(path)
+        if route is None:
+            return 404, {"code": 404, "message": "not found"}
+        name, handler = route
+
+        with self._rng_lock:
+            self.request_counts[name] = self.request_counts.get(name, 0) + 1
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            inject_error = self.error_rate and self._rng.random() < self.error_rate
+            # Token requests are not counted against the account's budget
+            limited = self.rate_limit is not None and token is not None and not self._take_token(token)
+
+        if delay:
+            time.sleep(delay)
+        if inject_error:
+            return 503, {"code": 503, "message": "injected error"}
+        if limited:
+            return 200, {"code": CODE_RATE_LIMITED, "message": "操作频繁，请稍后再试"}
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"code": CODE_BAD_REQUEST, "message": "invalid json"}
+
+        with self.state.lock:
+            code, data, message = handler(query, payload)
+        return 200, {"code": code, "message": message, "data": data}
+
+    def _take_token(self, key: str) -> bool:
+        """Token bucket check for one account (caller holds _rng_lock)"""
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (self.rate_limit, now))
+        tokens = min(self.rate_limit, tokens + (now - last) * self.rate_limit)
+        allowed = tokens >= 1
+        self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    # Endpoint handlers return (code, data, message)
+
+    def _handle_access_token(self, query, body):
+        if not body.get("clientID") or not body.get("clientSecret"):
+            return CODE_UNAUTHORIZED, None, "invalid credentials"
+        # One token per client ID, so rate limits apply per account
+        token = f"{FAKE_TOKEN}-{body['clientID']}"
+        return CODE_OK, {"accessToken": token, "expiredAt": FAKE_TOKEN_EXPIRY}, "ok"
+
+    def _handle_direct_link_enable(self, query, body):
+        file_info = self.state.files.get(int(body.get("fileID", -1)))
+        if file_info is None:
+            return CODE_NOT_FOUND, None, "file not found"
+        self.state.direct_link_enabled.add(file_info["fileId"])
+        return CODE_OK, {"filename": file_info["filename"]}, "ok"
+
+    def _handle_direct_link_disable(self, query, body):
+        file_info = self.state.files.get(int(body.get("fileID", -1)))
+        if file_info is None:
+            return CODE_NOT_FOUND, None, "file not found"
+        self.state.direct_link_enabled.discard(file_info["fileId"])
+        return CODE_OK, {"filename": file_info["filename"]}, "ok"
+
+    def _handle_direct_link_get(self, query, body):
+        file_id = int(query.get("fileID", -1))
+        if file_id not in self.state.files:
+            return CODE_NOT_FOUND, None, "file not found"
+        return CODE_OK, {"url": f"https://fake.123pan.local/direct/{file_id}"}, "ok"
+
+    def _handle_file_list(self, query, body):
+        parent_id = int(query.get("parentFileID", 0))
+        limit = max(1, min(int(query.get("limit", 100)), self.max_page_size))
+        children = self.state.children.get(parent_id)
+        if children is None:
+            return CODE_NOT_FOUND, None, "folder not found"
+        start = 0
+        if "lastFileID" in query:
+            start = bisect.bisect_right(children, int(query["lastFileID"]))
+        page_ids = children[start:start + limit]
+        last_file_id = page_ids[-1] if start + limit < len(children) else -1
+        return CODE_OK, {
+            "lastFileID": last_file_id,
+            "fileList": [dict(self.state.files[file_id]) for file_id in page_ids],
+        }, "ok"
+
+    def _handle_file_info(self, query, body):
+        file_info = self.state.files.get(int(query.get("fileID", -1)))
+        if file_info is None:
+            return CODE_NOT_FOUND, None, "file not found"
+        return CODE_OK, dict(file_info), "ok"
+
+    def _handle_file_move(self, query, body):
+        parent_id = int(body.get("parentFileID", 0))
+        file_ids = body.get("fileIDs") or []
+        if parent_id not in self.state.children or len(file_ids) > 100:
+            return CODE_BAD_REQUEST, None, "invalid move"
+        for file_id in file_ids:
+            if file_id in self.state.files:
+                self.state.move(file_id, parent_id)
+        return CODE_OK, None, "ok"
+
+    def _handle_file_rename(self, query, body):
+        file_info = self.state.files.get(int(body.get("fileID", -1)))
+        if file_info is None:
+            return CODE_NOT_FOUND, None, "file not found"
+        file_info["filename"] = body.get("filename", file_info["filename"])
+        return CODE_OK, None, "ok"
+
+    def _handle_file_mkdir(self, query, body):
+        parent_id = int(body.get("parentID", 0))
+        name = body.get("name")
+        if parent_id not in self.state.children or not name:
+            return CODE_BAD_REQUEST, None, "invalid folder"
+        for child_id in self.state.children[parent_id]:
+            child = self.state.files[child_id]
+            if child["filename"] == name and not child["trashed"]:
+                return CODE_BAD_REQUEST, None, "folder already exists"
+        return CODE_OK, {"dirID": self.state.add_file(parent_id, name, is_folder=True)}, "ok"
+
+    def _set_trashed(self, body, trashed):
+        file_ids = body.get("fileIDs") or []
+        if len(file_ids) > 100:
+            return CODE_BAD_REQUEST, None, "too many files"
+        for file_id in file_ids:
+            if file_id in self.state.files:
+                self.state.files[file_id]["trashed"] = trashed
+        return CODE_OK, None, "ok"
+
+    def _handle_file_trash(self, query, body):
+        return self._set_trashed(body, 1)
+
+    def _handle_file_recover(self, query, body):
+        return self._set_trashed(body, 0)
+
+    def _handle_file_delete(self, query, body):
+        file_ids = body.get("fileIDs") or []
+        for file_id in file_ids:
+            file_info = self.state.files.get(file_id)
+            if file_info is None or not file_info["trashed"]:
+                return CODE_BAD_REQUEST, None, "file is not in trash"
+        for file_id in file_ids:
+            file_info = self.state.files.pop(file_id)
+            self.state.children[file_info["parentFileId"]].remove(file_id)
+        return CODE_OK, None, "ok"
+
+    def _handle_share_list(self, query, body):
+        limit = max(1, min(int(query.get("limit", 100)), self.max_page_size))
+        shares = self.state.shares
+        start = 0
+        if "lastShareId" in query:
+            start = bisect.bisect_right([share["shareId"] for share in shares], int(query["lastShareId"]))
+        page = shares[start:start + limit]
+        last_share_id = page[-1]["shareId"] if start + limit < len(shares) else -1
+        return CODE_OK, {"lastShareId": last_share_id, "shareList": [dict(share) for share in page]}, "ok"
+
+    def _handle_share_update(self, query, body):
+        ids = set(body.get("shareIDs") or [])
+        for share in self.state.shares:
+            if share["shareId"] in ids:
+                for key in ("trafficSwitch", "trafficLimitSwitch", "trafficLimit"):
+                    if key in body:
+                        share[key] = body[key]
+        return CODE_OK, None, "ok"
+
+    def _handle_share_create(self, query, body):
+        file_ids = body.get("fileIDs") or []
+        if not file_ids or not body.get("shareName"):
+            return CODE_BAD_REQUEST, None, "invalid share"
+        share = self.state.add_share(
+            file_ids, body["shareName"], body.get("sharePwd", ""), body.get("shareExpire", 7)
+        )
+        return CODE_OK, {
+            "shareID": share["shareId"],
+            "shareKey": share["shareKey"],
+            "shareUrl": f"https://www.123pan.com/s/{share['shareKey']}",
+            "sharePwd": share["sharePwd"],
+        }, "ok"
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The socketserver default of 5 drops SYNs under concurrent benchmarks,
+    # which shows up as one-second retransmit spikes in client latency
+    request_queue_size = 128
+
+
+def respond(app: FakePanApp, method: str, target: str, body: bytes, token: Optional[str]) -> Tuple[int, bytes]:
+    """Answer one HTTP request for any front end: (status, JSON body); target is path plus query string"""
+    parts = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+    if parts.path != f"{API_PREFIX}{ENDPOINT_PATHS['access_token']}" and not token:
+        status, payload = 401, {"code": CODE_UNAUTHORIZED, "message": "missing token"}
+    else:
+        status, payload = app.handle(method, parts.path, query, body, token)
+    return status, json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with Nagle on, keep-alive
+    # clients wait out the peer's delayed ACK (~40 ms) on every response
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, data = respond(self.server.app, self.command, self.path, body, self.headers.get("Authorization"))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakePanServer:
+    """
+    Threaded HTTP/1.1 server exposing a FakePanApp on localhost
+
+    Usage:
+        with FakePanServer(FakePanApp(state)) as server:
+            api = PanAPI(client_id="x", client_secret="y", base_url=server.base_url)
+    """
+
+    def __init__(self, app: Optional[FakePanApp] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize FakePanServer
+
+        Args:
+            app: Application to serve (default: empty FakePanApp)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.app = app or FakePanApp()
+        self._server = _HTTPServer((host, port), _RequestHandler)
+        self._server.app = self.app
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "FakePanServer":
+        # Short poll interval so stop() returns quickly in tests
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakePanServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def serve_in_process(conn: Any, tree: Dict[str, Any], app_options: Dict[str, Any], http2: bool = False) -> None:
+    """
+    multiprocessing target: build a tree, serve it and report the base URL
+
+    Runs until the parent closes its end of the pipe. With http2 the tree is
+    served by the cleartext HTTP/2 stand-in (benchmarks.h2_server).
+    """
+    state = FakePanState.generate_tree(**tree)
+    server_class = FakePanServer
+    if http2:
+        from benchmarks.h2_server import FakePanH2Server as server_class
+    with server_class(FakePanApp(state, **app_options)) as server:
+        conn.send(server.base_url)
+        try:
+            conn.recv()
+        except EOFError:
+            pass
+
+
+def main() -> None:
+    """Run the fake server from the command line"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local 123Pan API stand-in")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--folders", type=int, default=4, help="sub-folders per folder")
+    parser.add_argument("--files", type=int, default=50, help="files per folder")
+    parser.add_argument("--shares", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    args = parser.parse_args()
+
+    state = FakePanState.generate_tree(args.depth, args.folders, args.files, args.shares)
+    app = FakePanApp(state, latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit)
+    server = FakePanServer(app, port=args.port)
+    print(f"Serving {len(state.files)} files at {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Cleartext HTTP/2 (h2c, prior knowledge) front end for FakePanApp
+
+Serves the same FakePanApp as FakePanServer, so HTTP/1.1 and HTTP/2 client
+transports can be benchmarked against identical behaviour. Each connection
+has a reader thread; completed requests are handled on a shared worker pool,
+so the streams of one connection are answered concurrently and out of
+order, as a real HTTP/2 server would. Needs the h2 package (installed with
+httpx[http2]).
+"""
+
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+
+from benchmarks.fake_server import API_PREFIX, FakePanApp, respond
+
+
+class _H2Connection:
+    """One client connection: h2 state machine plus per-stream buffers"""
+
+    def __init__(self, sock: socket.socket, app: FakePanApp, workers: ThreadPoolExecutor):
+        self.sock = sock
+        self.app = app
+        self.workers = workers
+        self.conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        # Guards conn and socket writes; the reader thread and workers share both
+        self.lock = threading.Lock()
+        self.requests: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        # stream ID -> response bytes waiting for flow control window
+        self.pending: Dict[int, bytes] = {}
+
+    def run(self) -> None:
+        try:
+            with self.lock:
+                self.conn.initiate_connection()
+                self._send()
+            while True:
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                with self.lock:
+                    events = self.conn.receive_data(data)
+                if not self._handle(events):
+                    break
+        except (OSError, h2.exceptions.ProtocolError):
+            # Client went away or broke the protocol; drop the connection
+            pass
+        finally:
+            self.sock.close()
+
+    def _handle(self, events: List[h2.events.Event]) -> bool:
+        """Process received events; False once the client ends the connection"""
+        for event in events:
+            if isinstance(event, h2.events.RequestReceived):
+                self.requests[event.stream_id] = (dict(event.headers), bytearray())
+            elif isinstance(event, h2.events.DataReceived):
+                self.requests[event.stream_id][1].extend(event.data)
+                with self.lock:
+                    self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+            elif isinstance(event, h2.events.StreamEnded):
+                headers, body = self.requests.pop(event.stream_id)
+                self.workers.submit(self._respond, event.stream_id, headers, bytes(body))
+            elif isinstance(event, h2.events.WindowUpdated):
+                with self.lock:
+                    self._flush()
+            elif isinstance(event, h2.events.StreamReset):
+                self.requests.pop(event.stream_id, None)
+                with self.lock:
+                    self.pending.pop(event.stream_id, None)
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                return False
+        with self.lock:
+            self._send()
+        return True
+
+    def _respond(self, stream_id: int, headers: Dict[str, str], body: bytes) -> None:
+        status, data = respond(self.app, headers[":method"], headers[":path"], body, headers.get("authorization"))
+        with self.lock:
+            try:
+                self.conn.send_headers(stream_id, [
+                    (":status", str(status)),
+                    ("content-type", "application/json"),
+                    ("content-length", str(len(data))),
+                ])
+            except h2.exceptions.StreamClosedError:
+                return
+            self.pending[stream_id] = data
+            self._flush()
+            try:
+                self._send()
+            except OSError:
+                pass
+
+    def _flush(self) -> None:
+        """Send as much pending response data as the flow control windows allow (caller holds lock)"""
+        for stream_id, data in list(self.pending.items()):
+            try:
+                while data:
+                    size = min(len(data), self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                    if size <= 0:
+                        break
+                    self.conn.send_data(stream_id, data[:size])
+                    data = data[size:]
+                if data:
+                    self.pending[stream_id] = data
+                else:
+                    self.conn.end_stream(stream_id)
+                    del self.pending[stream_id]
+            except h2.exceptions.StreamClosedError:
+                del self.pending[stream_id]
+
+    def _send(self) -> None:
+        outbound = self.conn.data_to_send()
+        if outbound:
+            self.sock.sendall(outbound)
+
+
+class FakePanH2Server:
+    """
+    Threaded h2c server exposing a FakePanApp on localhost
+
+    Clients must speak HTTP/2 with prior knowledge, e.g.
+    PanAPI(base_url=server.base_url, transport=HTTP2Transport(prior_knowledge=True)).
+    """
+
+    def __init__(self, app: Optional[FakePanApp] = None, host: str = "127.0.0.1", port: int = 0, workers: int = 64):
+        """
+        Initialize FakePanH2Server
+
+        Args:
+            app: Application to serve (default: empty FakePanApp)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            workers: Requests handled at once over all connections
+        """
+        self.app = app or FakePanApp()
+        self._sock = socket.create_server((host, port), backlog=128)
+        self._sock.settimeout(0.05)
+        self.server_address = self._sock.getsockname()[:2]
+        self._workers = ThreadPoolExecutor(max_workers=workers)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._clients: List[socket.socket] = []
+        self.connections = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def _serve(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                client, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            client.settimeout(None)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._clients.append(client)
+            self.connections += 1
+            connection = _H2Connection(client, self.app, self._workers)
+            threading.Thread(target=connection.run, daemon=True).start()
+
+    def start(self) -> "FakePanH2Server":
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        self._sock.close()
+        for client in self._clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._workers.shutdown(wait=True)
+
+    def __enter__(self) -> "FakePanH2Server":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -0,0 +1,284 @@
+"""
+Scenario benchmarks against the local 123Pan stand-in server
+
+Usage:
+    python -m benchmarks.run                       # all scenarios
+    python -m benchmarks.run crawl direct_links    # selected scenarios
+    python -m benchmarks.run --latency 0.005 --json
+    python -m benchmarks.run --record session.jsonl.gz    # record the traffic
+    python -m benchmarks.run --replay session.jsonl.gz    # replay it offline
+    python -m benchmarks.run direct_links --rate-limit 50 --accounts 4   # multi-account pool
+    python -m benchmarks.run direct_links --concurrency 64 --transport http2   # vs http1 / requests
+
+The server runs in a child process, so the reported peak RSS belongs to the
+client side only.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import PanAPI
+from api.pool import ClientPool
+from api.transport import TRANSPORTS, TRANSPORT_HTTP1, TRANSPORT_HTTP2, HTTP1Transport, HTTP2Transport
+from config import FILE_TYPE_FOLDER, HTTP_TRANSPORT
+from benchmarks.fake_server import serve_in_process
+from utils.batching import chunked
+from utils.cassette import Cassette, MODE_RECORD, MODE_REPLAY
+from utils.crawler import TreeCrawler
+from utils.pagination import ShareListPaginator
+from utils.tracing import CallbackHook
+
+
+class LatencyRecorder(CallbackHook):
+    """Collect the exact latency of every request"""
+
+    def __init__(self):
+        super().__init__(after=self._record)
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def _record(self, ctx) -> None:
+        with self._lock:
+            self.latencies.append(ctx.elapsed)
+            if ctx.error is not None:
+                self.errors += 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return usage / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def client_sockets(port: int) -> Optional[Set[str]]:
+    """
+    Local endpoints of TCP sockets to a port, including ones in TIME_WAIT
+
+    Comparing the set before and after a scenario approximates the number of
+    connections it opened. Returns None where /proc/net/tcp is unavailable.
+    """
+    found: Set[str] = set()
+    readable = False
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                lines = f.readlines()[1:]
+        except OSError:
+            continue
+        readable = True
+        for line in lines:
+            fields = line.split()
+            if int(fields[2].rsplit(":", 1)[1], 16) == port:
+                found.add(fields[1])
+    return found if readable else None
+
+
+def scenario_crawl(api: PanAPI, options: argparse.Namespace) -> int:
+    """Deep-tree crawl of the whole account"""
+    return sum(1 for _ in TreeCrawler(api, root_id=0))
+
+
+def scenario_bulk_move(api: PanAPI, options: argparse.Namespace) -> int:
+    """Move bulk_ids file IDs in MAX_BATCH_SIZE chunks, concurrently"""
+    files, _ = api.get_file_list(parent_file_id=0, limit=100)
+    target = next(entry["fileId"] for entry in files if entry["type"] == FILE_TYPE_FOLDER)
+    # IDs outside the generated tree: the server accepts them without
+    # reshaping the tree, so later scenarios see the same data
+    ids = range(10_000_000, 10_000_000 + options.bulk_ids)
+    with ThreadPoolExecutor(max_workers=options.concurrency) as pool:
+        list(pool.map(lambda batch: api.move_files(batch, target), chunked(ids)))
+    return options.bulk_ids
+
+
+def scenario_share_listing(api: PanAPI, options: argparse.Namespace) -> int:
+    """Paginated listing of every share"""
+    return sum(1 for _ in ShareListPaginator(api.get_share_list))
+
+
+def scenario_direct_links(api: PanAPI, options: argparse.Namespace) -> int:
+    """Burst of concurrent direct-link lookups"""
+    ids = [1 + index % 1000 for index in range(options.direct_links)]
+    with ThreadPoolExecutor(max_workers=options.concurrency) as pool:
+        list(pool.map(api.get_direct_link, ids))
+    return len(ids)
+
+
+# Scenarios that only read files and can be spread over an account pool
+READ_SCENARIOS = ("crawl", "direct_links")
+
+SCENARIOS: Dict[str, Callable[[PanAPI, argparse.Namespace], int]] = {
+    "crawl": scenario_crawl,
+    "bulk_move": scenario_bulk_move,
+    "share_listing": scenario_share_listing,
+    "direct_links": scenario_direct_links,
+}
+
+
+def run_scenario(
+    name: str,
+    base_url: Optional[str],
+    options: argparse.Namespace,
+    cassette: Optional[Cassette] = None,
+) -> Dict[str, Any]:
+    """Run one scenario with a fresh client and return its report"""
+    recorder = LatencyRecorder()
+    # One transport shared by every account, as it would be in an application
+    transport = None
+    if options.transport == TRANSPORT_HTTP1:
+        transport = HTTP1Transport(pool_size=options.concurrency)
+    elif options.transport == TRANSPORT_HTTP2:
+        transport = HTTP2Transport(prior_knowledge=True)
+    # Taken before the token requests, so kept-alive connections count too
+    port = urlsplit(base_url).port if base_url else None
+    sockets_before = client_sockets(port) if port else None
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = ClientPool(qps=options.rate_limit, cooldown=0.1)
+        for index in range(options.accounts):
+            account = PanAPI(
+                client_id=f"bench{index}",
+                client_secret="bench",
+                token_file=os.path.join(tmp, f"access{index}.json"),
+                request_log_level=logging.DEBUG,
+                hooks=[recorder],
+                base_url=base_url,
+                cassette=cassette,
+                transport=transport,
+            )
+            if cassette is None or not cassette.replaying:
+                account.ensure_token()
+            pool.add(f"bench{index}", account)
+        recorder.latencies.clear()
+
+        # Reads go through the pool even with one account, so runs with
+        # different --accounts pace themselves the same way
+        api = pool.reader() if name in READ_SCENARIOS else pool.client("bench0")
+        started = time.perf_counter()
+        items = SCENARIOS[name](api, options)
+        elapsed = time.perf_counter() - started
+        sockets_after = client_sockets(port) if port else None
+    if transport is not None:
+        transport.close()
+
+    requests_made = len(recorder.latencies)
+    return {
+        "scenario": name,
+        "items": items,
+        "requests": requests_made,
+        "errors": recorder.errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(requests_made / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(recorder.latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(recorder.latencies, 0.99) * 1000, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "connections": len(sockets_after - sockets_before) if sockets_before is not None else None,
+    }
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="123Pan API client benchmarks")
+    parser.add_argument("scenarios", nargs="*", help=f"any of: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--depth", type=int, default=3, help="folder levels below the root")
+    parser.add_argument("--folders", type=int, default=4, help="sub-folders per folder")
+    parser.add_argument("--files", type=int, default=50, help="files per folder")
+    parser.add_argument("--shares", type=int, default=2000)
+    parser.add_argument("--bulk-ids", type=int, default=100000)
+    parser.add_argument("--direct-links", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="server QPS limit per account")
+    parser.add_argument("--accounts", type=int, default=1,
+                        help="spread read scenarios over this many accounts (ClientPool)")
+    parser.add_argument("--page-size", type=int, default=100, help="server page size cap")
+    parser.add_argument("--transport", choices=TRANSPORTS, default=HTTP_TRANSPORT,
+                        help="client HTTP transport; http2 serves the tree over h2c (needs httpx[http2])")
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="PATH", help="record all traffic to a cassette")
+    cassette.add_argument("--replay", metavar="PATH", help="replay a cassette instead of starting the server")
+    parser.add_argument("--replay-speed", type=float, default=None,
+                        help="replay with the recorded latency divided by this factor (default: no delay)")
+    options = parser.parse_args(argv)
+    unknown = set(options.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if options.accounts < 1:
+        parser.error("--accounts must be at least 1")
+    return options
+
+
+def main(argv: List[str] = None) -> None:
+    options = parse_args(sys.argv[1:] if argv is None else argv)
+    # Per-request success logs would dominate the measurement
+    logging.getLogger("api.pan_api").setLevel(logging.WARNING)
+    tree = {
+        "depth": options.depth,
+        "folders_per_folder": options.folders,
+        "files_per_folder": options.files,
+        "shares": options.shares,
+    }
+    app_options = {
+        "latency": options.latency,
+        "jitter": options.jitter,
+        "error_rate": options.error_rate,
+        "rate_limit": options.rate_limit,
+        "max_page_size": options.page_size,
+    }
+
+    server = None
+    base_url = None
+    if options.replay:
+        cassette = Cassette(options.replay, MODE_REPLAY, speed=options.replay_speed)
+    else:
+        parent_conn, child_conn = multiprocessing.Pipe()
+        http2 = options.transport == TRANSPORT_HTTP2
+        server = multiprocessing.Process(target=serve_in_process, args=(child_conn, tree, app_options, http2), daemon=True)
+        server.start()
+        base_url = parent_conn.recv()
+        cassette = Cassette(options.record, MODE_RECORD) if options.record else None
+
+    try:
+        if not options.json:
+            print(f"{'scenario':<15}{'items':>9}{'reqs':>8}{'errs':>6}{'req/s':>10}"
+                  f"{'p50 ms':>9}{'p99 ms':>9}{'rss MiB':>9}{'conns':>7}")
+        for name in options.scenarios or list(SCENARIOS):
+            report = run_scenario(name, base_url, options, cassette)
+            if options.json:
+                print(json.dumps(report))
+            else:
+                print(f"{name:<15}{report['items']:>9}{report['requests']:>8}{report['errors']:>6}"
+                      f"{report['requests_per_sec']:>10}{report['p50_ms']:>9}{report['p99_ms']:>9}"
+                      f"{report['peak_rss_mb']:>9}{'-' if report['connections'] is None else report['connections']:>7}")
+    finally:
+        if cassette is not None:
+            cassette.close()
+        if server is not None:
+            parent_conn.send("stop")
+            server.join(timeout=5)
+
+if __name__ == "__main__":
+    main()
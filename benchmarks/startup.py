@@ -0,0 +1,131 @@
+"""
+Startup time budget check based on `python -X importtime`
+
+Usage:
+    python -m benchmarks.startup                     # check main and cli.batch
+    python -m benchmarks.startup --budget-ms 60 --top 15
+    python -m benchmarks.startup api utils.crawler --json
+
+For each module, imports it in fresh interpreters, takes the median
+cumulative import time reported by -X importtime and fails (exit status 1)
+if it exceeds the budget. Also reports the wall time of `main.py --help`
+minus a bare interpreter start, i.e. what a scripted invocation pays before
+its first request.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["main", "cli.batch"]
+DEFAULT_BUDGET_MS = 150.0
+
+# Modules that must stay out of a plain startup; they are imported lazily
+DEFERRED_MODULES = ["requests", "urllib3", "httpx", "pyarrow", "opentelemetry.trace", "cli.handlers"]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, float, float]]:
+    """
+    Parse -X importtime output
+
+    Returns:
+        (module, nesting level, self ms, cumulative ms) per imported module
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One separator space, then two spaces per nesting level
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), level, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[str, int, float, float]], List[str]]:
+    """Import module in a fresh interpreter; return (cumulative ms, rows, loaded deferred modules)"""
+    probe = f"import sys, {module}; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    total = next((cumulative for name, level, _, cumulative in rows if name == module and level == 0), 0.0)
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total, rows, loaded
+
+
+def measure_wall(argv: List[str]) -> float:
+    """Wall time of one interpreter run in ms"""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *argv], cwd=ROOT, capture_output=True, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def check_module(module: str, repeat: int, top: int) -> Dict[str, Any]:
+    totals = []
+    rows: List[Tuple[str, int, float, float]] = []
+    loaded: List[str] = []
+    for _ in range(repeat):
+        total, rows, loaded = measure_import(module)
+        totals.append(total)
+    # Slowest modules (self time) imported on behalf of the target in the last run
+    start = next((index for index, row in enumerate(rows) if row[0] == module and row[1] == 0), len(rows))
+    first = start
+    while first > 0 and rows[first - 1][1] > 0:
+        first -= 1
+    slowest = sorted(rows[first:start + 1], key=lambda row: row[2], reverse=True)[:top]
+    return {
+        "module": module,
+        "import_ms": round(statistics.median(totals), 2),
+        "deferred_loaded": loaded,
+        "slowest": [{"module": name, "self_ms": round(self_ms, 2)} for name, _, self_ms, _ in slowest],
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Startup time budget check")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="max cumulative import time")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list")
+    parser.add_argument("--json", action="store_true")
+    options = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    failed = False
+    reports = []
+    for module in options.modules:
+        report = check_module(module, options.repeat, options.top)
+        report["over_budget"] = report["import_ms"] > options.budget_ms or bool(report["deferred_loaded"])
+        failed = failed or report["over_budget"]
+        reports.append(report)
+
+    baseline = statistics.median(measure_wall(["-c", "pass"]) for _ in range(options.repeat))
+    cli_help = statistics.median(measure_wall(["main.py", "--help"]) for _ in range(options.repeat))
+
+    if options.json:
+        for report in reports:
+            print(json.dumps(report))
+        print(json.dumps({"main_help_ms": round(cli_help - baseline, 2), "interpreter_ms": round(baseline, 2)}))
+    else:
+        for report in reports:
+            status = "OVER BUDGET" if report["over_budget"] else "ok"
+            print(f"{report['module']}: {report['import_ms']} ms (budget {options.budget_ms} ms) {status}")
+            if report["deferred_loaded"]:
+                print(f"  eagerly imported: {', '.join(report['deferred_loaded'])}")
+            for row in report["slowest"]:
+                print(f"  {row['self_ms']:>8.2f} ms  {row['module']}")
+        print(f"main.py --help: {cli_help - baseline:.1f} ms over a bare interpreter ({baseline:.1f} ms)")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
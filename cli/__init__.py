@@ -1,11 +1,20 @@
 """
 CLI module for 123Pan API wrapper
 Provides command-line interface for the API
+
+Exports are resolved on first access, so `python main.py <command>` (batch
+mode, cli.batch) does not import the interactive menu handlers.
 """
 
-from .menu import MenuPrinter
-from .input_parser import InputParser
-from .handlers import ShareHandler, FileHandler, DirectLinkHandler
+import importlib
+
+_EXPORTS = {
+    "MenuPrinter": ".menu",
+    "InputParser": ".input_parser",
+    "ShareHandler": ".handlers",
+    "FileHandler": ".handlers",
+    "DirectLinkHandler": ".handlers",
+}
 
 __all__ = [
     "MenuPrinter",
@@ -14,3 +23,16 @@ __all__ = [
     "FileHandler",
     "DirectLinkHandler",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
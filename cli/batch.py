@@ -0,0 +1,575 @@
+"""
+Non-interactive command line mode with JSON Lines output
+
+Usage:
+    python main.py ls 0 --recursive
+    python main.py ls -r --top 100 --sort size
+    python main.py stat 101 102
+    cat ids.txt | python main.py mv --to 12345 -
+    python main.py trash --from ids.txt
+    python main.py share create --name backup --expire 7 101,102
+    python main.py share bulk releases.csv --rate-limit 5 > shares.jsonl
+    python main.py link get 101 102 103
+    python main.py reorg rules.json --dry-run
+    python main.py bulk-rename --root 123 '^IMG_' 'Photo_' --dry-run
+    python main.py snapshot save monday.jsonl.gz && python main.py snapshot diff monday.jsonl.gz today.jsonl.gz
+    python main.py jobs submit trash --from ids.txt && python main.py jobs run
+
+Every result is written to stdout as one JSON object per line as soon as it
+is available; logs go to stderr. IDs may be given as arguments (separated by
+spaces or commas), read from stdin with "-" or from files with --from. The
+exit status is 0 when everything succeeded, 1 if any item failed and 2 for
+usage errors.
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from api import PanAPI
+from api.exceptions import CredentialsError, InvalidParameterError, PanAPIException
+from config import JOB_MAX_ATTEMPTS, JOB_QUEUE_PATH, MAX_BATCH_SIZE, TOKEN_FILE_PATH
+from utils.batching import bounded_map, chunked
+from utils.bulk_rename import plan_renames, submit_renames
+from utils.crawler import CrawlError, TreeCrawler
+from utils.export import FORMAT_CSV, FORMAT_JSONL, detect_format
+from utils.jobqueue import TASK_FAILED, JobQueue, JobWorker
+from utils.logger import configure_console, setup_logger
+from utils.pagination import ShareListPaginator
+from utils.ranking import SORT_FIELDS, external_sort, top_k
+from utils.reorganize import apply_reorg, load_rules, plan_reorg
+from utils.share_manifest import create_shares, read_manifest
+from utils.snapshot import diff_snapshot_files, read_snapshot_header, take_snapshot
+
+logger = setup_logger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+class JsonLinesOutput:
+    """Thread-safe JSON Lines writer that flushes every record"""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if record.get("error") is not None:
+                self.errors += 1
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def parse_id_tokens(tokens: Iterable[str], on_invalid: Optional[Callable[[str], None]] = None) -> Iterator[int]:
+    """
+    Parse file IDs from text tokens or lines
+
+    Blank lines and lines starting with "#" are skipped; IDs within a line
+    may be separated by spaces or commas.
+
+    Args:
+        tokens: Text tokens or lines
+        on_invalid: Called with each value that is not an integer, which is
+            then skipped (default: raise)
+
+    Raises:
+        InvalidParameterError: If a value is not an integer and on_invalid is None
+    """
+    for token in tokens:
+        token = token.strip()
+        if not token or token.startswith("#"):
+            continue
+        for value in token.replace(",", " ").split():
+            try:
+                yield int(value)
+            except ValueError:
+                if on_invalid is None:
+                    raise InvalidParameterError("ID", f"无效的文件ID: {value}")
+                on_invalid(value)
+
+
+def iter_ids(values: List[str], files: List[TextIO], stdin: TextIO,
+             report: Callable[[Dict[str, Any]], None]) -> Iterator[int]:
+    """
+    Lazily yield IDs from arguments ("-" meaning stdin) and opened --from files
+
+    Arguments must already be valid (see run). Streams are read while
+    earlier batches are being sent, so an invalid token or an unreadable
+    file there is passed to report as an error record and skipped instead
+    of aborting the command.
+    """
+    def invalid(value: str) -> None:
+        report({"id": value, "error": f"无效的文件ID: {value}"})
+
+    for value in values:
+        if value == "-":
+            yield from parse_id_tokens(stdin, invalid)
+        else:
+            yield from parse_id_tokens([value])
+    for f in files:
+        try:
+            yield from parse_id_tokens(f, invalid)
+        except UnicodeDecodeError as e:
+            report({"file": f.name, "error": f"无法读取ID文件: {e}"})
+
+
+def error_record(key: str, value: Any, error: BaseException) -> Dict[str, Any]:
+    record = {key: value, "error": str(error)}
+    code = getattr(error, "code", None)
+    if code is not None:
+        record["code"] = code
+    return record
+
+
+def run_per_id(output: JsonLinesOutput, ids: Iterable[int], concurrency: int,
+               func: Callable[[int], Any], build: Callable[[int, Any], Dict[str, Any]]) -> None:
+    """Call func for every ID concurrently and write one record per ID"""
+    for file_id, result, error in bounded_map(func, ids, concurrency):
+        output.write(error_record("fileId", file_id, error) if error else build(file_id, result))
+
+
+def run_per_batch(output: JsonLinesOutput, ids: Iterable[int], concurrency: int,
+                  func: Callable[[List[int]], Any]) -> None:
+    """Call func for MAX_BATCH_SIZE chunks of IDs concurrently and write one record per chunk"""
+    for batch, _, error in bounded_map(func, chunked(ids, MAX_BATCH_SIZE), concurrency):
+        output.write(error_record("fileIds", batch, error) if error else {"fileIds": batch, "ok": True})
+
+
+# Commands: each takes (api, args, output, ids) where ids is a lazy ID iterator
+
+def cmd_ls(api: PanAPI, args: argparse.Namespace, output: JsonLinesOutput, ids: Iterator[int]) -> None:
+    max_depth = args.max_depth if args.recursive else 1
+    crawler = TreeCrawler(api, root_id=args.folder, limit=args.limit, max_depth=max_depth,
+                          include_trashed=args.include_trashed)
+    entries: Iterable[Any] = crawler
+    if args.top:
+        entries = top_k(crawler, args.top, key=args.sort or "size", largest=not args.reverse)
+    elif args.sort:
+        entries = external_sort(crawler, key=args.sort, reverse=args.reverse)
+    try:
+        for entry in entries:
+            output.write(entry.to_dict())
+    except CrawlError as e:
+        # Entries already written stay valid; the record marks the listing incomplete
+        output.write(error_record("folderId", e.folder_id, e))
+
+
+def cmd_stat(api, args, output, ids) -> None:
+    run_per_id(output, ids, args.concurrency, api.get_file_detail, lambda file_id, info: info)
+
+
+def cmd_mv(api, args, output, ids) -> None:
+    run_per_batch(output, ids, args.concurrency, lambda batch: api.move_files(batch, args.to))
+
+
+def cmd_rename(api, args, output, ids) -> None:
+    try:
+        api.rename_files(args.file_id, args.name)
+        output.write({"fileId": args.file_id, "filename": args.name, "ok": True})
+    except PanAPIException as e:
+        output.write(error_record("fileId", args.file_id, e))
+
+
+def cmd_trash(api, args, output, ids) -> None:
+    run_per_batch(output, ids, args.concurrency, api.trash_files)
+
+
+def cmd_rm(api, args, output, ids) -> None:
+    run_per_batch(output, ids, args.concurrency, api.delete_files)
+
+
+def cmd_recover(api, args, output, ids) -> None:
+    run_per_batch(output, ids, args.concurrency, api.recover_files)
+
+
+def cmd_share_ls(api, args, output, ids) -> None:
+    paginator = ShareListPaginator(api.get_share_list, limit=args.limit)
+    for share in paginator:
+        output.write(share)
+    if not paginator.is_exhausted:
+        output.write({"command": args.command, "error": f"分享列表未能完整获取: {paginator.error}"})
+
+
+def cmd_share_create(api, args, output, ids) -> None:
+    file_ids = list(ids)
+    try:
+        share = api.create_share_link(file_ids, args.name, share_expire=args.expire, share_pwd=args.pwd)
+        output.write(share)
+    except PanAPIException as e:
+        output.write(error_record("fileIds", file_ids, e))
+
+
+def cmd_share_bulk(api, args, output, ids) -> None:
+    if args.manifest == "-":
+        specs = read_manifest(args.stdin, args.format or FORMAT_CSV)
+        for record in create_shares(api, specs, args.concurrency, args.rate_limit):
+            output.write(record)
+        return
+    try:
+        f = open(args.manifest, "r", encoding="utf-8", newline="")
+    except OSError as e:
+        raise InvalidParameterError("manifest", f"无法读取清单: {e}")
+    with f:
+        specs = read_manifest(f, args.format or detect_format(args.manifest))
+        for record in create_shares(api, specs, args.concurrency, args.rate_limit):
+            output.write(record)
+
+
+def cmd_link_get(api, args, output, ids) -> None:
+    run_per_id(output, ids, args.concurrency, api.get_direct_link,
+               lambda file_id, url: {"fileId": file_id, "url": url})
+
+
+def cmd_link_enable(api, args, output, ids) -> None:
+    run_per_id(output, ids, args.concurrency, api.enable_direct_link,
+               lambda file_id, _: {"fileId": file_id, "ok": True})
+
+
+def cmd_link_disable(api, args, output, ids) -> None:
+    run_per_id(output, ids, args.concurrency, api.disable_direct_link,
+               lambda file_id, _: {"fileId": file_id, "ok": True})
+
+
+def cmd_bulk_rename(api, args, output, ids) -> None:
+    crawler = TreeCrawler(api, root_id=args.root, max_depth=None if args.recursive else 1)
+    try:
+        rename_plan = plan_renames(crawler, args.pattern, args.template, include_folders=args.folders)
+    except ValueError as e:
+        raise InvalidParameterError("pattern", str(e))
+    except CrawlError as e:
+        # Nothing is submitted for a tree that could not be listed in full
+        output.write(error_record("folderId", e.folder_id, e))
+        return
+    if rename_plan.collisions:
+        for collision in rename_plan.collisions:
+            output.write(collision)
+        return
+    if args.dry_run:
+        for rename in rename_plan.renames:
+            output.write(rename)
+        return
+    with JobQueue(args.queue) as queue:
+        job_id, count = submit_renames(queue, rename_plan)
+        logger.info("已提交重命名任务 %s: %d 个文件", job_id, count)
+        worker = JobWorker(api, queue, concurrency=args.concurrency, max_attempts=args.max_attempts,
+                           rate_limit=args.rate_limit)
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            logger.warning("已中断，运行 jobs run 继续重命名任务 %s", job_id)
+        job = queue.job(job_id)
+        output.write(job)
+        for result in queue.results(job_id):
+            if result["state"] == TASK_FAILED:
+                file_id, new_name = result["fileIds"][0]
+                output.write({"fileId": file_id, "new": new_name, "error": result["last_error"]})
+
+
+def cmd_reorg(api, args, output, ids) -> None:
+    try:
+        rules = load_rules(args.rules)
+    except (OSError, ValueError) as e:
+        raise InvalidParameterError("rules", f"无法读取规则: {e}")
+    crawler = TreeCrawler(api, root_id=args.root, max_depth=args.max_depth)
+    reorg = plan_reorg(crawler, rules)
+    records = reorg.records() if args.dry_run else apply_reorg(api, reorg, args.concurrency)
+    for record in records:
+        output.write(record)
+
+
+def cmd_snapshot_save(api, args, output, ids) -> None:
+    try:
+        count = take_snapshot(api, args.file, root_id=args.root, include_trashed=args.include_trashed)
+    except CrawlError as e:
+        output.write(error_record("snapshot", args.file, e))
+        return
+    output.write({"snapshot": args.file, "root": args.root, "entries": count})
+
+
+def cmd_snapshot_diff(api, args, output, ids) -> None:
+    for path in (args.old, args.new):
+        try:
+            read_snapshot_header(path)
+        except (OSError, ValueError) as e:
+            raise InvalidParameterError("snapshot", str(e))
+    try:
+        for change in diff_snapshot_files(args.old, args.new):
+            output.write(change.to_dict())
+    except ValueError as e:
+        raise InvalidParameterError("snapshot", str(e))
+
+
+def cmd_jobs_submit(api, args, output, ids) -> None:
+    params: Dict[str, Any] = {}
+    if args.op == "move":
+        if args.to is None:
+            raise InvalidParameterError("--to", "move 操作需要目标文件夹ID")
+        params["target"] = args.to
+    elif args.op == "share":
+        if not args.name:
+            raise InvalidParameterError("--name", "share 操作需要分享名称")
+        params.update(name=args.name, expire=args.expire, pwd=args.pwd)
+    with JobQueue(args.queue) as queue:
+        job_id = queue.submit(args.op, ids, **params)
+        output.write(queue.job(job_id))
+
+
+def cmd_jobs_ls(api, args, output, ids) -> None:
+    with JobQueue(args.queue) as queue:
+        for job in queue.jobs():
+            output.write(job)
+
+
+def cmd_jobs_show(api, args, output, ids) -> None:
+    with JobQueue(args.queue) as queue:
+        job = queue.job(args.job_id)
+        if job is None:
+            output.write({"jobId": args.job_id, "error": "任务不存在"})
+            return
+        output.write(job)
+        if args.tasks:
+            for task in queue.results(args.job_id):
+                output.write(task)
+
+
+def cmd_jobs_control(api, args, output, ids) -> None:
+    with JobQueue(args.queue) as queue:
+        if args.jobs_command == "retry":
+            output.write({"jobId": args.job_id, "requeued": queue.retry_failed(args.job_id)})
+            return
+        changed = getattr(queue, args.jobs_command)(args.job_id)
+        output.write({"jobId": args.job_id, "ok": True} if changed
+                     else {"jobId": args.job_id, "error": "任务不存在或已取消"})
+
+
+def cmd_jobs_run(api, args, output, ids) -> None:
+    with JobQueue(args.queue) as queue:
+        worker = JobWorker(api, queue, concurrency=args.concurrency, max_attempts=args.max_attempts,
+                           rate_limit=args.rate_limit)
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            # Tasks already running finish first; the rest stay queued
+            logger.warning("已中断，未完成的任务会在下次运行时继续")
+        for job in queue.jobs():
+            output.write(job)
+
+
+def _add_ids(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("ids", nargs="*", metavar="ID", help='file IDs (space/comma separated, "-" reads stdin)')
+    parser.add_argument("--from", dest="id_files", action="append", default=[], metavar="FILE",
+                        help="read file IDs from FILE (one or more per line)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for batch mode"""
+    parser = argparse.ArgumentParser(prog="main.py", description="123Pan 批处理命令行，结果以 JSON Lines 输出")
+    parser.add_argument("--token-file", default=TOKEN_FILE_PATH, help="凭证文件 (默认: %(default)s)")
+    parser.add_argument("-j", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="并发请求数")
+    parser.add_argument("-v", "--verbose", action="store_true", help="在 stderr 输出 INFO 日志")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    ls = commands.add_parser("ls", help="列出文件夹内容")
+    ls.add_argument("folder", type=int, nargs="?", default=0, help="文件夹ID (默认: 根目录)")
+    ls.add_argument("-r", "--recursive", action="store_true", help="递归遍历子文件夹")
+    ls.add_argument("--max-depth", type=int, default=None, help="递归时的最大深度")
+    ls.add_argument("--limit", type=int, default=100, help="每页数量")
+    ls.add_argument("--include-trashed", action="store_true", help="包含回收站中的文件")
+    ls.add_argument("--sort", choices=SORT_FIELDS, default=None, help="按字段排序输出（数据量大时分段写入临时文件）")
+    ls.add_argument("--reverse", action="store_true", help="降序排序；与 --top 一起使用时取最小的 N 个")
+    ls.add_argument("--top", type=int, default=None, metavar="N", help="只输出 --sort 字段 (默认 size) 最大的 N 个文件")
+    ls.set_defaults(func=cmd_ls, uses_ids=False)
+
+    stat = commands.add_parser("stat", help="查看文件详情")
+    _add_ids(stat)
+    stat.set_defaults(func=cmd_stat)
+
+    mv = commands.add_parser("mv", help="移动文件")
+    mv.add_argument("--to", type=int, required=True, help="目标文件夹ID")
+    _add_ids(mv)
+    mv.set_defaults(func=cmd_mv)
+
+    rename = commands.add_parser("rename", help="重命名文件")
+    rename.add_argument("file_id", type=int)
+    rename.add_argument("name")
+    rename.set_defaults(func=cmd_rename, uses_ids=False)
+
+    for name, func, help_text in (
+        ("trash", cmd_trash, "移至回收站"),
+        ("rm", cmd_rm, "永久删除（不在回收站的文件会先移入）"),
+        ("recover", cmd_recover, "从回收站恢复"),
+    ):
+        sub = commands.add_parser(name, help=help_text)
+        _add_ids(sub)
+        sub.set_defaults(func=func)
+
+    share = commands.add_parser("share", help="分享操作").add_subparsers(dest="share_command", metavar="ACTION")
+    share.required = True
+    share_ls = share.add_parser("ls", help="列出分享")
+    share_ls.add_argument("--limit", type=int, default=100)
+    share_ls.set_defaults(func=cmd_share_ls, uses_ids=False)
+    share_create = share.add_parser("create", help="为给定文件创建一个分享")
+    share_create.add_argument("--name", required=True, help="分享名称")
+    share_create.add_argument("--expire", type=int, choices=[0, 1, 7, 30], default=7, help="有效天数，0 表示永久")
+    share_create.add_argument("--pwd", default=None, help="提取码")
+    _add_ids(share_create)
+    share_create.set_defaults(func=cmd_share_create)
+    share_bulk = share.add_parser("bulk", help="按清单 (CSV/JSONL) 批量创建分享，每行一个")
+    share_bulk.add_argument("manifest", help='清单文件，"-" 从 stdin 读取')
+    share_bulk.add_argument("--format", choices=[FORMAT_CSV, FORMAT_JSONL], default=None,
+                            help="清单格式 (默认按扩展名判断，stdin 为 csv)")
+    share_bulk.add_argument("--rate-limit", type=float, default=None, help="每秒最多创建的分享数")
+    share_bulk.set_defaults(func=cmd_share_bulk, uses_ids=False)
+
+    link = commands.add_parser("link", help="直链操作").add_subparsers(dest="link_command", metavar="ACTION")
+    link.required = True
+    for name, func, help_text in (
+        ("get", cmd_link_get, "获取直链"),
+        ("enable", cmd_link_enable, "启用直链"),
+        ("disable", cmd_link_disable, "禁用直链"),
+    ):
+        sub = link.add_parser(name, help=help_text)
+        _add_ids(sub)
+        sub.set_defaults(func=func)
+
+    bulk_rename = commands.add_parser("bulk-rename", help="按正则批量重命名（先在本地检查重名，再经任务队列并发执行）")
+    bulk_rename.add_argument("pattern", help="在文件名中查找的正则表达式")
+    bulk_rename.add_argument("template", help=r"替换模板 (同 re.sub，如 \1、\g<name>)")
+    bulk_rename.add_argument("--root", type=int, default=0, help="文件夹ID (默认: 根目录)")
+    bulk_rename.add_argument("-r", "--recursive", action="store_true", help="包含所有子文件夹")
+    bulk_rename.add_argument("--folders", action="store_true", help="同时重命名文件夹")
+    bulk_rename.add_argument("--dry-run", action="store_true", help="只输出重命名计划")
+    bulk_rename.add_argument("--queue", default=JOB_QUEUE_PATH, help="任务队列数据库 (默认: %(default)s)")
+    bulk_rename.add_argument("--rate-limit", type=float, default=None, help="每秒最多发起的请求数")
+    bulk_rename.add_argument("--max-attempts", type=int, default=JOB_MAX_ATTEMPTS, help="每个文件的最大尝试次数")
+    bulk_rename.set_defaults(func=cmd_bulk_rename, uses_ids=False)
+
+    reorg = commands.add_parser("reorg", help="按规则 (扩展名/日期/名称 → 目标路径) 批量整理文件")
+    reorg.add_argument("rules", help="JSON 规则文件")
+    reorg.add_argument("--root", type=int, default=0, help="要整理的文件夹ID (默认: 根目录)")
+    reorg.add_argument("--max-depth", type=int, default=None, help="遍历的最大深度")
+    reorg.add_argument("--dry-run", action="store_true", help="只输出每个目标文件夹的计划，不创建文件夹也不移动")
+    reorg.set_defaults(func=cmd_reorg, uses_ids=False)
+
+    snapshot = commands.add_parser("snapshot", help="目录树快照与差异").add_subparsers(dest="snapshot_command", metavar="ACTION")
+    snapshot.required = True
+    save = snapshot.add_parser("save", help="遍历目录树并保存快照（按 fileId 排序，.gz 结尾则压缩）")
+    save.add_argument("file")
+    save.add_argument("--root", type=int, default=0, help="起始文件夹ID (默认: 根目录)")
+    save.add_argument("--include-trashed", action="store_true", help="包含回收站中的文件")
+    save.set_defaults(func=cmd_snapshot_save, uses_ids=False)
+    diff = snapshot.add_parser("diff", help="输出两个快照之间新增/删除/重命名/移动/修改的条目")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.set_defaults(func=cmd_snapshot_diff, uses_ids=False, needs_api=False)
+
+    jobs_parser = commands.add_parser("jobs", help="持久化批量任务队列")
+    jobs_parser.add_argument("--queue", default=JOB_QUEUE_PATH, help="队列数据库 (默认: %(default)s)")
+    jobs = jobs_parser.add_subparsers(dest="jobs_command", metavar="ACTION")
+    jobs.required = True
+    submit = jobs.add_parser("submit", help="提交批量任务（不立即执行）")
+    submit.add_argument("op", choices=["move", "trash", "delete", "recover", "share"])
+    submit.add_argument("--to", type=int, default=None, help="move: 目标文件夹ID")
+    submit.add_argument("--name", default=None, help="share: 分享名称（每 100 个文件一个分享）")
+    submit.add_argument("--expire", type=int, choices=[0, 1, 7, 30], default=7, help="share: 有效天数")
+    submit.add_argument("--pwd", default=None, help="share: 提取码")
+    _add_ids(submit)
+    submit.set_defaults(func=cmd_jobs_submit, needs_api=False)
+    jobs.add_parser("ls", help="列出任务").set_defaults(func=cmd_jobs_ls, uses_ids=False, needs_api=False)
+    show = jobs.add_parser("show", help="查看任务")
+    show.add_argument("job_id", type=int)
+    show.add_argument("--tasks", action="store_true", help="同时输出每个分块的状态")
+    show.set_defaults(func=cmd_jobs_show, uses_ids=False, needs_api=False)
+    for name, help_text in (("pause", "暂停任务"), ("resume", "恢复任务"), ("cancel", "取消任务"),
+                            ("retry", "重新排队失败的分块")):
+        sub = jobs.add_parser(name, help=help_text)
+        sub.add_argument("job_id", type=int)
+        sub.set_defaults(func=cmd_jobs_control, uses_ids=False, needs_api=False)
+    run_jobs = jobs.add_parser("run", help="执行队列中的任务直到全部完成（-j 设置并发数）")
+    run_jobs.add_argument("--rate-limit", type=float, default=None, help="每秒最多发起的请求数")
+    run_jobs.add_argument("--max-attempts", type=int, default=JOB_MAX_ATTEMPTS, help="每个分块的最大尝试次数")
+    run_jobs.set_defaults(func=cmd_jobs_run, uses_ids=False)
+
+    return parser
+
+
+def run(
+    argv: List[str],
+    api: Optional[PanAPI] = None,
+    stdin: TextIO = None,
+    stdout: TextIO = None,
+) -> int:
+    """
+    Run one batch command
+
+    Args:
+        argv: Command line arguments without the program name
+        api: Client to use (default: created from --token-file)
+        stdin: Stream for "-" ID lists (default: sys.stdin)
+        stdout: Stream for JSON Lines results (default: sys.stdout)
+
+    Returns:
+        Process exit status
+    """
+    stdin = stdin or sys.stdin
+    output = JsonLinesOutput(stdout or sys.stdout)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency 必须为正整数")
+    if getattr(args, "top", None) is not None and args.top < 1:
+        parser.error("--top 必须为正整数")
+
+    # stdout carries data only
+    configure_console(stream=sys.stderr, level=None if args.verbose else logging.WARNING)
+
+    args.stdin = stdin
+    with contextlib.ExitStack() as stack:
+        ids: Iterator[int] = iter(())
+        if getattr(args, "uses_ids", True):
+            if not args.ids and not args.id_files:
+                parser.error("请提供文件ID（参数、- 或 --from）")
+            # Open --from files up front so a bad path fails before any request is sent
+            try:
+                files = [stack.enter_context(open(path, "r", encoding="utf-8")) for path in args.id_files]
+            except OSError as e:
+                parser.error(f"无法读取ID文件: {e}")
+            ids = iter_ids(args.ids, files, stdin, output.write)
+
+        try:
+            # Command line IDs are all in memory: reject a bad one before anything is sent
+            for _ in parse_id_tokens(value for value in getattr(args, "ids", []) if value != "-"):
+                pass
+            if api is None and getattr(args, "needs_api", True):
+                api = PanAPI(token_file=args.token_file)
+            args.func(api, args, output, ids)
+        except (InvalidParameterError, CredentialsError) as e:
+            logger.error("%s", e)
+            return EXIT_USAGE
+        except PanAPIException as e:
+            output.write(error_record("command", args.command, e))
+        except CrawlError as e:
+            # Commands planning from a crawl (e.g. reorg) stop before changing anything
+            output.write(error_record("folderId", e.folder_id, e))
+
+    return EXIT_FAILED if output.errors else EXIT_OK
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return run(sys.argv[1:] if argv is None else argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,8 @@ CLI event handlers for various operations
 
 from api import PanAPI
 from api.exceptions import TokenExpiredError, NetworkError, APIError
-from utils import PaginationIterator
+from utils import CrawlError, PaginationIterator, FileListPaginator, TreeCrawler
+from utils.export import ExportIncompleteError, export_entries, detect_format
 from utils.logger import setup_logger
 from .menu import MenuPrinter
 from .input_parser import InputParser
@@ -258,16 +259,58 @@ class FileHandler:
             self.menu.print_error(f"未知错误: {e}")
             logger.exception("Unexpected error in get_file_list")
 
+    def export_file_list(self) -> None:
+        """Export a file listing (optionally recursive) to CSV/JSON Lines/Parquet"""
+        try:
+            parent_file_id = self.parser.prompt_optional_int(
+                "请输入父文件夹ID (默认为0，表示根目录): ",
+                default=0
+            )
+
+            recursive = input("是否包含所有子文件夹？(y/n): ").strip().lower() == 'y'
+
+            output_path = self.parser.prompt_optional_string(
+                "请输入导出文件路径 (.csv/.jsonl/.parquet，回车默认为 files.jsonl): ",
+                default="files.jsonl"
+            )
+
+            if recursive:
+                entries = TreeCrawler(self.api, root_id=parent_file_id)
+            else:
+                entries = FileListPaginator(
+                    self.api.get_file_list,
+                    parent_file_id=parent_file_id,
+                    compact=True,
+                )
+
+            total = export_entries(entries, output_path, fmt=detect_format(output_path))
+            self.menu.print_success(f"已导出 {total} 条记录到 {output_path}")
+
+        except (TokenExpiredError, NetworkError, APIError) as e:
+            self.menu.print_error(f"导出文件列表失败: {e}")
+        except (CrawlError, ExportIncompleteError) as e:
+            self.menu.print_error(f"导出不完整，已中止: {e}")
+        except (ImportError, OSError, ValueError) as e:
+            self.menu.print_error(f"导出失败: {e}")
+        except KeyboardInterrupt:
+            self.menu.print_info("操作已取消")
+        except Exception as e:
+            self.menu.print_error(f"未知错误: {e}")
+            logger.exception("Unexpected error in export_file_list")
+
     def view_file_detail(self) -> None:
-        """View file details"""
+        """View details of one or more files"""
         try:
-            file_id = self.parser.prompt_positive_int("请输入文件ID: ")
-            if file_id is None:
+            file_ids = self.parser.prompt_file_ids("请输入文件ID (多个以逗号分隔): ")
+            if not file_ids:
                 self.menu.print_error("文件ID无效")
                 return
 
-            file_info = self.api.get_file_detail(file_id)
-            self.menu.print_file_info(file_info)
+            for file_id, file_info in self.api.get_file_details(file_ids).items():
+                if isinstance(file_info, Exception):
+                    self.menu.print_error(f"获取文件 {file_id} 的详情失败: {file_info}")
+                else:
+                    self.menu.print_file_info(file_info)
 
         except (TokenExpiredError, NetworkError, APIError) as e:
             self.menu.print_error(f"获取文件详情失败: {e}")
@@ -35,6 +35,7 @@ class MenuPrinter:
         print("5. 将文件移至回收站")
         print("6. 永久删除文件")
         print("7. 从回收站恢复文件")
+        print("8. 导出文件清单")
         print("0. 返回主菜单")
 
     @staticmethod
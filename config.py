@@ -3,30 +3,71 @@ Configuration file for 123Pan API wrapper
 Defines API endpoints, constants, and default settings
 """
 
+import logging
+
 # API Base Configuration
 API_BASE_URL = "https://open-api.123pan.com/api"
 PLATFORM_HEADER = "open_platform"
-DEFAULT_TIMEOUT = 30  # seconds
+CONNECT_TIMEOUT = 5   # seconds to establish a connection
+READ_TIMEOUT = 30     # seconds to wait for the server between bytes of the response
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
 TOKEN_FILE_PATH = "./access.json"
 
-# API Endpoints
-ENDPOINTS = {
-    "access_token": f"{API_BASE_URL}/v1/access_token",
-    "direct_link_enable": f"{API_BASE_URL}/v1/direct-link/enable",
-    "direct_link_disable": f"{API_BASE_URL}/v1/direct-link/disable",
-    "direct_link_get": f"{API_BASE_URL}/v1/direct-link/get",
-    "file_list": f"{API_BASE_URL}/v2/file/list",
-    "file_info": f"{API_BASE_URL}/v1/file/info",
-    "file_move": f"{API_BASE_URL}/v1/file/move",
-    "file_rename": f"{API_BASE_URL}/v1/file/rename",
-    "file_trash": f"{API_BASE_URL}/v1/file/trash",
-    "file_delete": f"{API_BASE_URL}/v1/file/delete",
-    "file_recover": f"{API_BASE_URL}/v1/file/recover",
-    "share_list": f"{API_BASE_URL}/v1/share/list",
-    "share_update": f"{API_BASE_URL}/v1/share/update",
-    "share_create": f"{API_BASE_URL}/v1/share/create",
+# HTTP transport (api.transport) used by PanAPI:
+#   "requests" - requests.request per call (a new connection each time)
+#   "http1"    - shared requests.Session with a keep-alive HTTP/1.1 connection pool
+#   "http2"    - httpx client multiplexing concurrent requests over HTTP/2 (pip install "httpx[http2]")
+HTTP_TRANSPORT = "requests"
+HTTP1_POOL_SIZE = 16               # keep-alive connections per host for "http1"
+HTTP2_MAX_CONNECTIONS = 2          # connections per host for "http2"; each carries many streams
+
+# API Endpoints (paths relative to API_BASE_URL)
+ENDPOINT_PATHS = {
+    "access_token": "/v1/access_token",
+    "direct_link_enable": "/v1/direct-link/enable",
+    "direct_link_disable": "/v1/direct-link/disable",
+    "direct_link_get": "/v1/direct-link/get",
+    "file_list": "/v2/file/list",
+    "file_info": "/v1/file/info",
+    "file_move": "/v1/file/move",
+    "file_rename": "/v1/file/rename",
+    "file_trash": "/v1/file/trash",
+    "file_delete": "/v1/file/delete",
+    "file_recover": "/v1/file/recover",
+    "file_mkdir": "/upload/v1/file/mkdir",
+    "share_list": "/v1/share/list",
+    "share_update": "/v1/share/update",
+    "share_create": "/v1/share/create",
 }
 
+# Endpoints that share a circuit breaker (they fail together when a backend degrades)
+ENDPOINT_GROUPS = {
+    "access_token": "auth",
+    "direct_link_enable": "direct_link",
+    "direct_link_disable": "direct_link",
+    "direct_link_get": "direct_link",
+    "file_list": "file",
+    "file_info": "file",
+    "file_move": "file",
+    "file_rename": "file",
+    "file_trash": "file",
+    "file_delete": "file",
+    "file_recover": "file",
+    "file_mkdir": "file",
+    "share_list": "share",
+    "share_update": "share",
+    "share_create": "share",
+}
+
+
+def build_endpoints(base_url: str) -> dict:
+    """Full endpoint URLs for an API base URL (e.g., a local test server)"""
+    base_url = base_url.rstrip("/")
+    return {name: f"{base_url}{path}" for name, path in ENDPOINT_PATHS.items()}
+
+
+ENDPOINTS = build_endpoints(API_BASE_URL)
+
 # Default pagination settings
 DEFAULT_PAGE_LIMIT = 100
 MAX_PAGE_LIMIT = 100
@@ -41,6 +82,7 @@ ROOT_DIRECTORY_ID = 0
 
 # API Response Codes
 SUCCESS_CODE = 0
+RATE_LIMITED_CODE = 429  # returned when an account exceeds its QPS quota
 
 # File operation defaults
 DEFAULT_PARENT_FILE_ID = 0
@@ -48,3 +90,51 @@ DEFAULT_PARENT_FILE_ID = 0
 # Share settings
 DEFAULT_SHARE_DOWNLOAD_COUNT = -1  # -1 means unlimited
 DEFAULT_SHARE_DURATION = 2592000   # 30 days in seconds
+DEFAULT_SHARE_EXPIRE_DAYS = 7      # share lifetime when a manifest row leaves expire empty
+SHARE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # "expiration" field of share list entries
+
+# ShareInventory re-lists every share after this many seconds; in between only new shares are fetched
+SHARE_INVENTORY_MAX_AGE = 3600
+
+# Maximum number of file IDs per move/trash/delete/recover request
+MAX_BATCH_SIZE = 100
+
+# Entries sorted in memory per run by utils.ranking.external_sort before spilling to disk
+SORT_RUN_SIZE = 100_000
+
+# Concurrent file_info requests in PanAPI.get_file_details
+FILE_DETAIL_CONCURRENCY = 8
+
+# Concurrent calls on one shared PanAPI client
+CLIENT_MAP_CONCURRENCY = 8         # calls in flight per PanAPI.map
+CLIENT_EXECUTOR_WORKERS = 16       # threads running PanAPI.submit / submit_<method> futures
+
+# File types as returned in the "type" field of file data
+FILE_TYPE_FILE = 0
+FILE_TYPE_FOLDER = 1
+
+# Circuit breaker (utils.circuit_breaker), one per endpoint group
+CIRCUIT_BREAKER_ENABLED = True
+CIRCUIT_FAILURE_THRESHOLD = 5      # consecutive network/5xx failures that open a circuit
+CIRCUIT_RECOVERY_TIMEOUT = 30.0    # seconds an open circuit fails fast before a trial request
+CIRCUIT_HALF_OPEN_REQUESTS = 1     # trial requests let through while half-open
+
+# Path cache (utils.path_cache): name -> fileId trie filled from listings.
+# Each entry costs roughly 270 bytes (node, name, dict slots), so the default
+# is about 13 MiB; 1_000_000 would be about 270 MiB.
+PATH_CACHE_MAX_ENTRIES = 50_000  # cleared when it grows beyond this many entries
+
+# Request scheduler (api.scheduler): priority classes sharing one client
+SCHEDULER_CONCURRENCY = 8          # calls running at once over all classes
+SCHEDULER_WEIGHTS = {"interactive": 16, "normal": 4, "bulk": 1}    # share of dispatches
+SCHEDULER_CLASS_LIMITS = {"interactive": 8, "normal": 6, "bulk": 4}  # calls running at once per class
+
+# Logging settings
+LOG_ASYNC = False                  # write log output from a background QueueListener thread
+REQUEST_LOG_LEVEL = logging.INFO   # level of per-request success lines (e.g., one per file list page)
+
+# Persistent job queue (utils.jobqueue)
+JOB_QUEUE_PATH = "./jobs.db"
+JOB_MAX_ATTEMPTS = 5               # tries per task before it is marked failed
+JOB_RETRY_BACKOFF = 2.0            # seconds, doubled after every failed try
+JOB_LEASE_SECONDS = 300            # a running task whose worker vanished is retried after this
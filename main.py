@@ -1,10 +1,14 @@
 """
 Main entry point for 123Pan API CLI
+
+Without arguments an interactive menu is started; with arguments the command
+runs non-interactively (see cli/batch.py, or `python main.py --help`).
 """
 
+import sys
+
 from api import PanAPI
-from api.exceptions import CredentialsError, NetworkError, APIError
-from cli import MenuPrinter, ShareHandler, FileHandler, DirectLinkHandler
+from api.exceptions import CredentialsError
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -12,31 +16,18 @@ logger = setup_logger(__name__)
 
 def main():
     """Main function - initialize API and start CLI loop"""
+    # Imported here so that batch mode does not pay for the menu handlers
+    from cli import MenuPrinter, ShareHandler, FileHandler, DirectLinkHandler
+
     try:
-        # Create API instance, load credentials from access.json
+        # Create API instance, load credentials from access.json. The access
+        # token is requested by the first API call, so the menu shows at once
         api = PanAPI(token_file="access.json")
-
-        # Ensure we have a valid access token
-        access_token = api.ensure_token()
-        if not access_token:
-            logger.error("无法获取有效的Access Token")
-            print("错误：无法获取有效的Access Token，请检查凭证是否正确")
-            return
-
     except CredentialsError as e:
         logger.error(f"凭证错误: {e}")
         print(f"错误: 凭证无效 - {e}")
         print("请检查 access.json 文件或直接提供有效的客户端凭证")
         return
-    except NetworkError as e:
-        logger.error(f"网络错误: {e}")
-        print(f"错误: 网络连接失败 - {e}")
-        print("请检查您的网络连接")
-        return
-    except APIError as e:
-        logger.error(f"API 错误: {e}")
-        print(f"错误: API 请求失败 - {e}")
-        return
     except Exception as e:
         logger.error(f"初始化失败: {e}")
         print(f"错误: 初始化失败 - {e}")
@@ -78,7 +69,7 @@ def main():
             # File management submenu
             while True:
                 menu.print_file_menu()
-                file_choice = input("请输入选项 (0-7): ").strip()
+                file_choice = input("请输入选项 (0-8): ").strip()
 
                 if file_choice == '0':
                     break
@@ -96,6 +87,8 @@ def main():
                     file_handler.delete_files()
                 elif file_choice == '7':
                     file_handler.recover_files()
+                elif file_choice == '8':
+                    file_handler.export_file_list()
                 else:
                     menu.print_error("无效选项，请重新输入")
 
@@ -121,4 +114,7 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from cli.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[1:]))
     main()
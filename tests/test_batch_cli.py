@@ -0,0 +1,152 @@
+"""
+Tests for the non-interactive batch CLI
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from api import PanAPI, APIError
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from cli.batch import EXIT_FAILED, EXIT_OK, EXIT_USAGE, parse_id_tokens, run
+from utils.logger import configure_console
+
+
+class TestParseIds(unittest.TestCase):
+    """Test cases for ID list parsing"""
+
+    def test_separators_and_comments(self):
+        lines = ["1, 2 3\n", "\n", "# comment\n", "4\n"]
+        self.assertEqual(list(parse_id_tokens(lines)), [1, 2, 3, 4])
+
+
+class TestBatchCLI(unittest.TestCase):
+    """Test cases for batch commands against FakePanServer"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(configure_console, sys.stdout, logging.NOTSET)
+        self.state = FakePanState()
+        self.folder = self.state.add_file(0, "folder", is_folder=True)
+        self.files = [self.state.add_file(self.folder, f"f{index}") for index in range(3)]
+        self.server = FakePanServer(FakePanApp(self.state)).start()
+        self.addCleanup(self.server.stop)
+        self.api = PanAPI(
+            client_id="id",
+            client_secret="secret",
+            token_file=os.path.join(self.tmp.name, "access.json"),
+            base_url=self.server.base_url,
+        )
+
+    def run_cli(self, argv, stdin=""):
+        stdout = io.StringIO()
+        status = run(argv, api=self.api, stdin=io.StringIO(stdin), stdout=stdout)
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_ls(self):
+        status, records = self.run_cli(["ls"])
+        self.assertEqual(status, EXIT_OK)
+        self.assertEqual([record["fileId"] for record in records], [self.folder])
+
+        status, records = self.run_cli(["ls", "-r"])
+        self.assertEqual(sorted(record["fileId"] for record in records), [self.folder] + self.files)
+
+    def test_incomplete_listings_fail(self):
+        """Test that listings cut short by a failed page end with an error record"""
+        listing = self.api.get_file_list
+
+        def flaky(parent_file_id, *args, **kwargs):
+            if parent_file_id == self.folder:
+                raise APIError("获取文件列表失败", 503)
+            return listing(parent_file_id, *args, **kwargs)
+
+        with patch.object(self.api, "get_file_list", side_effect=flaky):
+            status, records = self.run_cli(["ls", "-r"])
+        self.assertEqual(status, EXIT_FAILED)
+        self.assertEqual(records[0]["fileId"], self.folder)
+        self.assertEqual(records[-1]["folderId"], self.folder)
+        self.assertIn("error", records[-1])
+
+        with patch.object(self.api, "get_share_list", side_effect=APIError("获取分享列表失败", 503)):
+            status, records = self.run_cli(["share", "ls"])
+        self.assertEqual(status, EXIT_FAILED)
+        self.assertIn("获取分享列表失败", records[0]["error"])
+
+    def test_stat_reports_per_id_errors(self):
+        """Test that one missing ID fails alone and sets the exit status"""
+        status, records = self.run_cli(["stat", f"{self.files[0]},999"])
+
+        self.assertEqual(status, EXIT_FAILED)
+        by_id = {record.get("fileId"): record for record in records}
+        self.assertEqual(by_id[self.files[0]]["filename"], "f0")
+        self.assertIn("error", by_id[999])
+
+    def test_mv_from_stdin_in_batches(self):
+        """Test that IDs from stdin are moved in MAX_BATCH_SIZE chunks"""
+        ids = "\n".join(str(file_id) for file_id in self.files + list(range(1000, 1200)))
+        status, records = self.run_cli(["-j", "2", "mv", "--to", "0", "-"], stdin=ids)
+
+        self.assertEqual(status, EXIT_OK)
+        self.assertEqual(sorted(len(record["fileIds"]) for record in records), [3, 100, 100])
+        self.assertTrue(all(self.state.files[file_id]["parentFileId"] == 0 for file_id in self.files))
+
+    def test_ids_from_file(self):
+        path = os.path.join(self.tmp.name, "ids.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(str(file_id) for file_id in self.files))
+
+        status, records = self.run_cli(["link", "get", "--from", path])
+
+        self.assertEqual(status, EXIT_OK)
+        self.assertEqual(sorted(record["fileId"] for record in records), self.files)
+        self.assertTrue(all(record["url"] for record in records))
+
+    def test_unreadable_id_files(self):
+        """Test that missing or undecodable --from files are usage errors, not tracebacks"""
+        with self.assertRaises(SystemExit) as ctx:
+            self.run_cli(["link", "get", "--from", os.path.join(self.tmp.name, "missing.txt")])
+        self.assertEqual(ctx.exception.code, EXIT_USAGE)
+
+        path = os.path.join(self.tmp.name, "ids.bin")
+        with open(path, "wb") as f:
+            f.write(b"\xff\xfe\x00\x01")
+        status, records = self.run_cli(["link", "get", "--from", path])
+        self.assertEqual(status, EXIT_FAILED)
+        self.assertEqual(records[0]["file"], path)
+
+    def test_share_create(self):
+        status, records = self.run_cli(["share", "create", "--name", "s", *map(str, self.files)])
+
+        self.assertEqual(status, EXIT_OK)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(self.state.shares[0]["shareName"], "s")
+
+    def test_invalid_ids(self):
+        """Test that a bad command line ID is rejected before any batch is sent"""
+        ids = [str(file_id) for file_id in self.files + list(range(1000, 1150))]
+        status, records = self.run_cli(["-j", "2", "trash", *ids, "abc"])
+        self.assertEqual((status, records), (EXIT_USAGE, []))
+        self.assertNotIn("file_trash", self.server.app.request_counts)
+        self.assertFalse(any(self.state.files[file_id].get("trashed") for file_id in self.files))
+
+    def test_invalid_ids_in_stream(self):
+        """Test that a bad ID in a --from file is reported alone and the other batches still run"""
+        path = os.path.join(self.tmp.name, "ids.txt")
+        with open(path, "w") as f:
+            f.write(f"{self.files[0]}\nabc\n{self.files[1]}, {self.files[2]}\n")
+
+        status, records = self.run_cli(["trash", "--from", path])
+
+        self.assertEqual(status, EXIT_FAILED)
+        self.assertIn({"id": "abc", "error": "无效的文件ID: abc"}, records)
+        self.assertEqual([record["fileIds"] for record in records if "fileIds" in record], [self.files])
+        self.assertTrue(all(self.state.files[file_id]["trashed"] for file_id in self.files))
+
+
+if __name__ == "__main__":
+    unittest.main()
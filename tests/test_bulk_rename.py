@@ -0,0 +1,135 @@
+"""
+Tests for bulk regex rename
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from api import PanAPI, APIError
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from cli.batch import EXIT_FAILED, EXIT_OK, EXIT_USAGE, run
+from utils.bulk_rename import plan_renames, submit_renames
+from utils.jobqueue import JobQueue, JobWorker
+from utils.logger import configure_console
+
+
+def entry(file_id, name, parent=1, is_folder=False):
+    return {"fileId": file_id, "filename": name, "parentFileId": parent, "type": 1 if is_folder else 0}
+
+
+class TestPlanRenames(unittest.TestCase):
+    """Test cases for rename planning and collision detection"""
+
+    def test_substitution(self):
+        entries = [entry(1, "Show.S01E02.mkv"), entry(2, "notes.txt"), entry(3, "Show.S01E03", is_folder=True)]
+        plan = plan_renames(entries, r"Show\.S(\d+)E(\d+)", r"Show - S\1E\2")
+        self.assertEqual(plan.items(), [[1, "Show - S01E02.mkv"]])
+        self.assertEqual(plan.collisions, [])
+        plan = plan_renames(entries, r"Show\.S(\d+)E(\d+)", r"Show - S\1E\2", include_folders=True)
+        self.assertEqual([item[0] for item in plan.items()], [1, 3])
+
+        with self.assertRaises(ValueError):
+            plan_renames(entries, "(", "x")
+        with self.assertRaises(ValueError):
+            plan_renames(entries, "a", r"\9")
+
+    def test_collisions(self):
+        entries = [entry(1, "a1.txt"), entry(2, "a2.txt"), entry(3, "b.txt"),
+                   entry(4, "c.txt"), entry(5, "c.txt", parent=2), entry(6, "d.txt")]
+        plan = plan_renames(entries, r"^a\d", "b")
+        self.assertEqual(sorted(c["fileId"] for c in plan.collisions), [1, 2])
+        # The same new name in different folders is fine; an existing sibling is not
+        plan = plan_renames(entries, r"^d", "c")
+        self.assertEqual([c["fileId"] for c in plan.collisions], [6])
+        plan = plan_renames(entries, r"^b\.txt$", "")
+        self.assertIn("无效", plan.collisions[0]["error"])
+        with self.assertRaises(ValueError):
+            submit_renames(None, plan)
+
+
+class TestBulkRename(unittest.TestCase):
+    """Test cases for running bulk renames against FakePanServer"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(configure_console, sys.stdout, logging.NOTSET)
+        self.state = FakePanState()
+        self.season = self.state.add_file(0, "season1", is_folder=True)
+        self.episodes = [self.state.add_file(self.season, f"Show.S01E{index:02d}.mkv") for index in range(1, 61)]
+        self.queue_path = os.path.join(self.tmp.name, "jobs.db")
+
+    def start(self, **options):
+        server = FakePanServer(FakePanApp(self.state, **options)).start()
+        self.addCleanup(server.stop)
+        api = PanAPI(client_id="id", client_secret="secret",
+                     token_file=os.path.join(self.tmp.name, "access.json"), base_url=server.base_url)
+        return server, api
+
+    def run_cli(self, api, argv):
+        stdout = io.StringIO()
+        status = run(argv, api=api, stdout=stdout)
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def names(self):
+        return sorted(self.state.files[file_id]["filename"] for file_id in self.episodes)
+
+    def test_cli(self):
+        server, api = self.start()
+        argv = ["bulk-rename", "--root", str(self.season), "--queue", self.queue_path,
+                r"Show\.S(\d+)E(\d+)", r"Show - S\1E\2"]
+        status, records = self.run_cli(api, argv + ["--dry-run"])
+        self.assertEqual((status, len(records)), (EXIT_OK, 60))
+        self.assertNotIn("file_rename", server.app.request_counts)
+
+        status, records = self.run_cli(api, ["-j", "8"] + argv)
+        self.assertEqual(status, EXIT_OK)
+        self.assertEqual(records[0]["status"], "done")
+        self.assertEqual(server.app.request_counts["file_rename"], 60)
+        self.assertEqual(self.names(), [f"Show - S01E{index:02d}.mkv" for index in range(1, 61)])
+
+        status, records = self.run_cli(api, ["bulk-rename", "--root", str(self.season), "--queue", self.queue_path,
+                                             r"E\d+", "E01"])
+        self.assertEqual((status, len(records)), (EXIT_FAILED, 59))  # E01 keeps its name
+        self.assertEqual(len(JobQueue(self.queue_path).jobs()), 1)
+
+        status, _ = self.run_cli(api, ["bulk-rename", "(", "x"])
+        self.assertEqual(status, EXIT_USAGE)
+
+    def test_incomplete_listing_aborts(self):
+        """Test that nothing is planned or submitted when a folder cannot be listed in full"""
+        server, api = self.start()
+        with patch.object(api, "get_file_list", side_effect=APIError("获取文件列表失败", 503)):
+            status, records = self.run_cli(api, ["bulk-rename", "--root", str(self.season), "--queue",
+                                                 self.queue_path, r"\.mkv$", ".mp4"])
+
+        self.assertEqual(status, EXIT_FAILED)
+        self.assertEqual(records, [{"folderId": self.season, "error": records[0]["error"]}])
+        self.assertFalse(os.path.exists(self.queue_path))
+        self.assertNotIn("file_rename", server.app.request_counts)
+
+    def test_retries_and_resume(self):
+        """Test that a submitted job survives a restart and failed calls are retried"""
+        server, api = self.start(error_rate=0.3, seed=7)
+        api.circuit_breakers = None  # injected errors would otherwise trip the breaker for 30 s
+        plan = plan_renames([dict(self.state.files[file_id]) for file_id in self.state.children[self.season]],
+                            r"\.mkv$", ".mp4")
+        with JobQueue(self.queue_path) as queue:
+            job_id, count = submit_renames(queue, plan)
+        self.assertEqual(count, 60)
+
+        with JobQueue(self.queue_path) as queue:
+            worker = JobWorker(api, queue, concurrency=8, max_attempts=20, backoff=0.001, idle_interval=0.01)
+            worker.run()
+            self.assertEqual(queue.job(job_id)["status"], "done")
+        self.assertGreater(server.app.request_counts["file_rename"], 60)
+        self.assertTrue(all(name.endswith(".mp4") for name in self.names()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests for cassette record/replay
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from api import PanAPI
+from api.transport import HTTP1Transport
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from utils.cassette import Cassette, CassetteError, MODE_RECORD, MODE_REPLAY
+from utils.crawler import TreeCrawler
+
+
+class TestCassette(unittest.TestCase):
+    """Test cases for Cassette"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "session.jsonl.gz")
+        state = FakePanState.generate_tree(depth=1, folders_per_folder=2, files_per_folder=3)
+        self.server = FakePanServer(FakePanApp(state)).start()
+        self.addCleanup(self.server.stop)
+
+    def make_api(self, cassette, base_url=None, transport=None):
+        return PanAPI(
+            client_id="id",
+            client_secret="secret",
+            token_file=os.path.join(self.tmp.name, "access.json"),
+            base_url=base_url,
+            cassette=cassette,
+            transport=transport,
+        )
+
+    def record_crawl(self):
+        with Cassette(self.path, MODE_RECORD) as cassette:
+            api = self.make_api(cassette, self.server.base_url)
+            entries = [entry.to_dict() for entry in TreeCrawler(api)]
+            api.get_direct_link(1)
+        return entries, cassette
+
+    def test_replay_matches_recording(self):
+        """Test that a replayed crawl sees exactly the recorded data, offline"""
+        recorded, cassette = self.record_crawl()
+        self.assertEqual(cassette.recorded, 4)
+        self.server.stop()
+
+        with Cassette(self.path, MODE_REPLAY) as replay:
+            api = self.make_api(replay)
+            with patch("utils.cassette.requests.request") as mock_request:
+                replayed = [entry.to_dict() for entry in TreeCrawler(api)]
+                link = api.get_direct_link(1)
+            mock_request.assert_not_called()
+
+        self.assertEqual(replayed, recorded)
+        self.assertTrue(link)
+        self.assertEqual(replay.replayed, 4)
+
+    def test_no_credentials_recorded(self):
+        """Test that token requests and headers stay out of the cassette"""
+        self.record_crawl()
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            text = f.read()
+        lines = [json.loads(line) for line in text.splitlines()]
+
+        self.assertEqual(lines[0]["cassette"], 1)
+        self.assertNotIn("access_token", {line.get("endpoint") for line in lines})
+        self.assertNotIn("secret", text)
+        self.assertNotIn("fake-access-token", text)
+
+    def test_unmatched_request(self):
+        """Test that requests missing from the cassette raise CassetteError"""
+        self.record_crawl()
+        api = self.make_api(Cassette(self.path, MODE_REPLAY))
+
+        with self.assertRaises(CassetteError):
+            api.get_direct_link(2)
+
+    def test_repeats_last_response(self):
+        """Test that a request replayed more often than recorded reuses the last answer"""
+        self.record_crawl()
+        api = self.make_api(Cassette(self.path, MODE_REPLAY))
+
+        self.assertEqual(api.get_direct_link(1), api.get_direct_link(1))
+
+    def test_original_timing(self):
+        """Test that speed scales the recorded latency"""
+        self.record_crawl()
+        cassette = Cassette(self.path, MODE_REPLAY, speed=2.0)
+        api = self.make_api(cassette)
+
+        with patch("utils.cassette.time.sleep") as mock_sleep:
+            api.get_direct_link(1)
+        mock_sleep.assert_called_once()
+        self.assertGreater(mock_sleep.call_args[0][0], 0)
+
+    def test_records_through_transport(self):
+        """Test that recording uses the client's transport and composite calls replay offline"""
+        with HTTP1Transport() as transport, Cassette(self.path, MODE_RECORD) as cassette:
+            api = self.make_api(cassette, self.server.base_url, transport=transport)
+            with patch("utils.cassette.requests.request") as mock_request:
+                self.assertTrue(api.delete_files([3]))
+            mock_request.assert_not_called()
+        self.assertEqual(cassette.recorded, 3)  # file_info, file_trash, file_delete
+        self.server.stop()
+        os.remove(os.path.join(self.tmp.name, "access.json"))  # replay needs no token
+
+        with Cassette(self.path, MODE_REPLAY) as replay:
+            self.assertTrue(self.make_api(replay).delete_files([3]))
+        self.assertEqual(replay.replayed, 3)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            Cassette(self.path, "rewind")
+        with self.assertRaises(ValueError):
+            Cassette(self.path, MODE_REPLAY, speed=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests for circuit breakers and request timeouts
+"""
+
+import json
+import unittest
+from unittest.mock import Mock, patch
+import requests
+from api import PanAPI, APIError, CircuitOpenError, NetworkError
+from config import DEFAULT_TIMEOUT
+from utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(payload, status_code=200):
+    response = Mock()
+    response.status_code = status_code
+    response.content = json.dumps(payload).encode()
+    return response
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for the breaker state machine"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("file", failure_threshold=3, recovery_timeout=10, clock=self.clock)
+
+    def trip(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.breaker.record_success()
+
+        self.trip()
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.retry_after(), 10)
+
+    def test_half_open_trial(self):
+        """Test that one trial passes after the timeout and its outcome decides the state"""
+        self.trip()
+        self.clock.now += 10
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+        self.clock.now += 10
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.assertEqual(self.breaker.snapshot()["times_opened"], 2)
+
+    def test_release_frees_trial(self):
+        self.trip()
+        self.clock.now += 10
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+        self.assertTrue(self.breaker.allow())
+
+
+class TestPanAPICircuit(unittest.TestCase):
+    """Test cases for breakers and timeouts in PanAPI._request"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breakers = CircuitBreakerRegistry(failure_threshold=2, recovery_timeout=30, clock=self.clock)
+        self.api = PanAPI(client_id="id", client_secret="secret", token_file="/nonexistent/access.json",
+                          circuit_breakers=self.breakers)
+        self.api.access_token = "token"
+
+    @patch("api.pan_api.requests.request")
+    def test_fails_fast_per_group(self, mock_request):
+        """Test that an open file group fails without a request while other groups still work"""
+        mock_request.side_effect = requests.exceptions.ConnectTimeout("timed out")
+        for _ in range(2):
+            with self.assertRaises(NetworkError):
+                self.api.get_file_list()
+
+        with self.assertRaises(CircuitOpenError) as ctx:
+            self.api.get_file_detail(1)
+        self.assertEqual((ctx.exception.group, ctx.exception.retry_after), ("file", 30))
+        self.assertEqual(mock_request.call_count, 2)
+
+        mock_request.side_effect = None
+        mock_request.return_value = make_response({"code": 0, "data": {"url": "https://x"}})
+        self.assertEqual(self.api.get_direct_link(1), "https://x")
+
+        # After the recovery timeout one trial request closes the circuit
+        self.clock.now += 30
+        mock_request.return_value = make_response({"code": 0, "data": {"fileList": [], "lastFileID": -1}})
+        self.api.get_file_list()
+        self.assertEqual(self.breakers.snapshot()["file"]["state"], STATE_CLOSED)
+
+    @patch("api.pan_api.requests.request")
+    def test_api_errors_do_not_trip(self, mock_request):
+        """Test that business errors count as a healthy endpoint, 5xx as failures"""
+        mock_request.return_value = make_response({"code": 5066, "message": "not found"})
+        for _ in range(3):
+            with self.assertRaises(APIError):
+                self.api.get_file_detail(1)
+        self.assertEqual(self.breakers.snapshot()["file"]["state"], STATE_CLOSED)
+
+        mock_request.return_value = make_response({}, status_code=502)
+        for _ in range(2):
+            with self.assertRaises(APIError):
+                self.api.get_file_detail(1)
+        self.assertEqual(self.breakers.snapshot()["file"]["state"], STATE_OPEN)
+
+    @patch("api.pan_api.requests.request")
+    def test_every_request_has_timeouts(self, mock_request):
+        """Test that the token and direct-link requests send (connect, read) timeouts"""
+        self.api.access_token = None
+        mock_request.side_effect = [
+            make_response({"code": 0, "data": {"accessToken": "t", "expiredAt": "2099-01-01T00:00:00+08:00"}}),
+            make_response({"code": 0, "data": {"filename": "a"}}),
+        ]
+        with patch.object(PanAPI, "save_access_token"):
+            self.api.enable_direct_link(1)
+        self.assertIsInstance(DEFAULT_TIMEOUT, tuple)
+        self.assertEqual([call.kwargs["timeout"] for call in mock_request.call_args_list], [DEFAULT_TIMEOUT] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Tests for sharing one PanAPI client across threads: map, submit and token locking
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from api import PanAPI, APIError, InvalidParameterError
+from api.transport import Transport
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from utils.batching import bounded_map
+
+
+class RecordingTransport(Transport):
+    """Answers every request with an empty success and records the headers objects"""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers=None, params=None, json=None, timeout=None):
+        with self._lock:
+            self.calls.append((threading.get_ident(), headers))
+        response = Mock(status_code=200)
+        response.content = b'{"code": 0, "data": {"filename": "f"}}'
+        return response
+
+
+class TestBoundedMapOrdered(unittest.TestCase):
+    """Test cases for bounded_map(ordered=True)"""
+
+    def test_input_order_and_bound(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def work(n):
+            with lock:
+                running.append(n)
+                peak.append(len(running))
+            time.sleep(0.001 * (n % 5))
+            with lock:
+                running.remove(n)
+            if n == 7:
+                raise ValueError("seven")
+            return n * n
+
+        results = list(bounded_map(work, range(40), 4, ordered=True))
+
+        self.assertEqual([item for item, _, _ in results], list(range(40)))
+        self.assertEqual(results[3], (3, 9, None))
+        self.assertIsInstance(results[7][2], ValueError)
+        self.assertLessEqual(max(peak), 4)
+
+
+class TestClientMap(unittest.TestCase):
+    """Test cases for PanAPI.map, submit and thread safety"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.state = FakePanState.generate_tree(depth=1, folders_per_folder=1, files_per_folder=40)
+        self.server = FakePanServer(FakePanApp(self.state, latency=0.005)).start()
+        self.addCleanup(self.server.stop)
+        self.api = PanAPI(
+            client_id="id",
+            client_secret="secret",
+            token_file=os.path.join(self.tmp.name, "access.json"),
+            base_url=self.server.base_url,
+        )
+        self.addCleanup(self.api.close)
+        self.file_ids = sorted(self.state.files)[1:]
+
+    def test_token_refreshed_once(self):
+        """Test that concurrent first requests share one token refresh"""
+        results = list(self.api.map("get_file_detail", self.file_ids, concurrency=16))
+
+        self.assertEqual(len(results), len(self.file_ids))
+        self.assertTrue(all(error is None for _, _, error in results))
+        self.assertEqual(self.server.app.request_counts["access_token"], 1)
+
+    def test_map_collects_errors_per_item(self):
+        ids = self.file_ids[:10] + [999_999] + self.file_ids[10:20]
+
+        results = list(self.api.map(self.api.get_file_detail, ids, concurrency=4, ordered=True))
+
+        self.assertEqual([item for item, _, _ in results], ids)
+        failed = [(item, error) for item, _, error in results if error is not None]
+        self.assertEqual([item for item, _ in failed], [999_999])
+        self.assertIsInstance(failed[0][1], APIError)
+        self.assertEqual(results[0][1]["fileId"], ids[0])
+
+    def test_map_unpack(self):
+        """Test that tuple items are spread over the method's parameters"""
+        renames = [(file_id, f"renamed_{file_id}.txt") for file_id in self.file_ids[:5]]
+
+        results = list(self.api.map("rename_files", renames, unpack=True))
+
+        self.assertTrue(all(result is True for _, result, _ in results))
+        self.assertEqual(self.state.files[renames[0][0]]["filename"], renames[0][1])
+
+    def test_get_file_details_keeps_errors(self):
+        details = self.api.get_file_details([self.file_ids[0], 999_999, self.file_ids[0]])
+        self.assertEqual(list(details), [self.file_ids[0], 999_999])
+        self.assertIsInstance(details[999_999], APIError)
+
+    def test_submit_futures(self):
+        future = self.api.submit("get_file_detail", self.file_ids[0])
+        named = self.api.submit_get_file_detail(self.file_ids[1])
+        failing = self.api.submit_get_file_detail(999_999)
+
+        self.assertEqual(future.result()["fileId"], self.file_ids[0])
+        self.assertEqual(named.result()["fileId"], self.file_ids[1])
+        with self.assertRaises(APIError):
+            failing.result()
+
+    def test_invalid_methods(self):
+        for method in ("_request", "no_such_method", "map", "close"):
+            with self.assertRaises(InvalidParameterError, msg=method):
+                self.api.submit(method)
+        with self.assertRaises(InvalidParameterError):
+            self.api.map("get_file_detail", [], concurrency=0)
+        self.assertFalse(hasattr(self.api, "submit_no_such_method"))
+        self.assertFalse(hasattr(self.api, "submit__request"))
+
+
+class TestHeaderReuse(unittest.TestCase):
+    """Test cases for per-thread request headers"""
+
+    def test_headers_reused_per_thread(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            token_file = os.path.join(tmp, "access.json")
+            with open(token_file, "w") as f:
+                json.dump({
+                    "client_id": "id",
+                    "client_secret": "secret",
+                    "access_token": "token-1",
+                    "expired_at": "2099-01-01 00:00:00",
+                }, f)
+            transport = RecordingTransport()
+            api = PanAPI(token_file=token_file, transport=transport)
+
+            api.get_file_detail(1)
+            api.get_file_detail(2)
+            list(api.map("get_file_detail", range(20), concurrency=4))
+            api.access_token = "token-2"
+            api.get_file_detail(3)
+
+        calls = transport.calls
+        self.assertIs(calls[0][1], calls[1][1])
+        self.assertEqual(calls[0][1], {"Platform": "open_platform", "Authorization": "token-1"})
+        # One dict per worker thread, distinct from the caller's
+        worker_headers = {id(headers) for thread, headers in calls[2:22]}
+        self.assertLessEqual(len(worker_headers), 4)
+        self.assertNotIn(id(calls[0][1]), worker_headers)
+        # A new token gets a new dict; the old one is left untouched
+        self.assertEqual(calls[-1][1]["Authorization"], "token-2")
+        self.assertEqual(calls[0][1]["Authorization"], "token-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
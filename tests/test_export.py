@@ -0,0 +1,96 @@
+"""
+Tests for streaming listing export
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from utils.export import export_entries, CsvExportWriter, ExportIncompleteError, pyarrow
+from utils.file_entry import FileEntry
+from utils.pagination import FileListPaginator
+
+ENTRIES = [
+    {"fileId": i, "filename": f"f{i}.txt", "type": 0, "size": i * 10, "extra": "x"}
+    for i in range(1, 6)
+]
+
+
+class TestExport(unittest.TestCase):
+    """Test cases for export writers"""
+
+    def test_jsonl_is_lossless(self):
+        """Test that JSON Lines export keeps every key"""
+        out = io.StringIO()
+        count = export_entries([FileEntry.from_dict(e) for e in ENTRIES], out, fmt="jsonl")
+        self.assertEqual(count, 5)
+        self.assertEqual([json.loads(line) for line in out.getvalue().splitlines()], ENTRIES)
+
+    def test_csv_columns(self):
+        """Test CSV export with selected columns"""
+        out = io.StringIO()
+        export_entries(ENTRIES, out, fmt="csv", fields=["fileId", "filename"])
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(rows[0], ["fileId", "filename"])
+        self.assertEqual(rows[1], ["1", "f1.txt"])
+        self.assertEqual(len(rows), 6)
+
+    def test_flushes_per_page(self):
+        """Test that writers flush after each page"""
+        out = io.StringIO()
+        out.flush = Mock()
+        export_entries(ENTRIES, out, fmt="jsonl", flush_rows=2)
+        self.assertEqual(out.flush.call_count, 3)
+
+    def test_writer_as_paginator_callback(self):
+        """Test that write_page can be used directly as a page callback"""
+        out = io.StringIO()
+        writer = CsvExportWriter(out)
+        writer.write_page(ENTRIES[:2])
+        writer.write_page(ENTRIES[2:])
+        self.assertEqual(writer.rows_written, 5)
+
+    def test_truncated_listing_raises(self):
+        """Test that a paginator ending on a failed page is not reported as a complete export"""
+        def get_file_list(parent_file_id, limit, compact=False, last_file_id=None):
+            if last_file_id is None:
+                return ENTRIES[:2], 2
+            raise RuntimeError("page 2 failed")
+
+        out = io.StringIO()
+        paginator = FileListPaginator(get_file_list, parent_file_id=0, compact=True)
+        with self.assertRaises(ExportIncompleteError) as ctx:
+            export_entries(paginator, out, fmt="jsonl")
+        self.assertEqual(ctx.exception.rows_written, 2)
+        self.assertIsInstance(ctx.exception.error, RuntimeError)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+    def test_format_from_extension(self):
+        """Test that the format is picked from the file extension"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "files.csv")
+            export_entries(ENTRIES, path)
+            with open(path, encoding="utf-8") as f:
+                self.assertTrue(f.readline().startswith("fileId,"))
+
+    def test_unknown_format(self):
+        """Test that unknown formats are rejected"""
+        with self.assertRaises(ValueError):
+            export_entries(ENTRIES, io.StringIO(), fmt="xml")
+
+    @unittest.skipIf(pyarrow is None, "pyarrow not installed")
+    def test_parquet(self):
+        """Test Parquet export"""
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "files.parquet")
+            export_entries(ENTRIES, path)
+            table = pq.read_table(path)
+            self.assertEqual(table.num_rows, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
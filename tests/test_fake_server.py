@@ -0,0 +1,118 @@
+"""
+Integration tests for PanAPI against the local fake server
+"""
+
+import os
+import tempfile
+import unittest
+from api import PanAPI, APIError
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState, CODE_RATE_LIMITED
+from utils.batching import chunked
+from utils.crawler import TreeCrawler
+from utils.pagination import ShareListPaginator
+
+
+class TestChunked(unittest.TestCase):
+    """Test cases for chunked"""
+
+    def test_splits_lazily(self):
+        """Test batch sizes, including the final partial batch"""
+        self.assertEqual([len(batch) for batch in chunked(range(250))], [100, 100, 50])
+        self.assertEqual(list(chunked(iter("abcde"), 2)), [["a", "b"], ["c", "d"], ["e"]])
+        self.assertEqual(list(chunked([])), [])
+
+    def test_rejects_non_positive_size(self):
+        with self.assertRaises(ValueError):
+            list(chunked([1], 0))
+
+
+class TestFakeServer(unittest.TestCase):
+    """Test cases for PanAPI over HTTP against FakePanServer"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def start(self, state, **options):
+        server = FakePanServer(FakePanApp(state, **options)).start()
+        self.addCleanup(server.stop)
+        api = PanAPI(
+            client_id="id",
+            client_secret="secret",
+            token_file=os.path.join(self.tmp.name, "access.json"),
+            base_url=server.base_url,
+        )
+        return server, api
+
+    def test_crawl_whole_tree(self):
+        """Test that a crawl sees every generated file across pages"""
+        state = FakePanState.generate_tree(depth=2, folders_per_folder=2, files_per_folder=120)
+        server, api = self.start(state)
+
+        entries = list(TreeCrawler(api, root_id=0))
+
+        self.assertEqual(len(entries), len(state.files))
+        # 7 folders, each with more than one page of children
+        self.assertEqual(server.app.request_counts["file_list"], 14)
+
+    def test_move_and_share_listing(self):
+        """Test that writes reach the server state and shares paginate"""
+        state = FakePanState()
+        folder = state.add_file(0, "target", is_folder=True)
+        files = [state.add_file(0, f"f{index}") for index in range(3)]
+        for index in range(5):
+            state.add_share(files[:1], f"s{index}")
+        _, api = self.start(state, max_page_size=2)
+
+        self.assertTrue(api.move_files(files, folder))
+        self.assertEqual(state.children[folder], files)
+
+        shares = list(ShareListPaginator(api.get_share_list, limit=2))
+        self.assertEqual([share["shareName"] for share in shares], [f"s{index}" for index in range(5)])
+
+    def test_file_details_and_delete(self):
+        """Test batch details with duplicates and a missing ID, and delete_files built on them"""
+        state = FakePanState()
+        files = [state.add_file(0, f"f{index}") for index in range(20)]
+        server, api = self.start(state)
+        api.trash_files(files[:5])
+
+        details = api.get_file_details(files + files[:3] + [999])
+
+        self.assertEqual(list(details), files + [999])
+        self.assertEqual(server.app.request_counts["file_info"], 21)
+        self.assertEqual(details[files[0]]["filename"], "f0")
+        self.assertIsInstance(details[999], APIError)
+
+        # Already trashed files are deleted directly, the rest are trashed first
+        self.assertTrue(api.delete_files(files[3:8]))
+        self.assertEqual(server.app.request_counts["file_trash"], 2)
+        self.assertFalse(any(file_id in state.files for file_id in files[3:8]))
+
+    def test_injected_errors(self):
+        """Test that HTTP 503 answers surface as APIError"""
+        server, api = self.start(FakePanState())
+        api.ensure_token()
+        server.app.error_rate = 1.0
+
+        with self.assertRaises(APIError) as ctx:
+            api.get_file_list()
+        self.assertEqual(ctx.exception.status_code, 503)
+
+    def test_rate_limit(self):
+        """Test that requests over the per-account rate limit get code 429"""
+        server, api = self.start(FakePanState(), rate_limit=1)
+        api.get_file_list()
+
+        with self.assertRaises(APIError) as ctx:
+            api.get_file_list()
+        self.assertEqual(ctx.exception.code, CODE_RATE_LIMITED)
+
+        # Another account has its own budget
+        other = PanAPI(client_id="other", client_secret="secret",
+                       token_file=os.path.join(self.tmp.name, "other.json"), base_url=server.base_url)
+        other.get_file_list()
+
+
+if __name__ == "__main__":
+    unittest.main()
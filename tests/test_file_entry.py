@@ -0,0 +1,148 @@
+"""
+Tests for the compact FileEntry representation and tree crawler
+"""
+
+import pickle
+import unittest
+from unittest.mock import Mock
+from utils.file_entry import FileEntry
+from utils.pagination import PaginationIterator, FileListPaginator
+from utils.crawler import CrawlError, TreeCrawler
+
+RAW = {
+    "fileId": 42,
+    "filename": "report.pdf",
+    "parentFileId": 7,
+    "type": 0,
+    "size": 1024,
+    "etag": "abc",
+    "status": 0,
+    "category": 3,
+    "trashed": 0,
+    "createAt": "2026-01-01 00:00:00",
+    "updateAt": "2026-01-02 00:00:00",
+    "storageNode": "m1",
+}
+
+
+class TestFileEntry(unittest.TestCase):
+    """Test cases for FileEntry"""
+
+    def test_round_trip_is_lossless(self):
+        """Test that from_dict/to_dict preserves every key, including unknown ones"""
+        self.assertEqual(FileEntry.from_dict(RAW).to_dict(), RAW)
+
+    def test_absent_keys_stay_absent(self):
+        """Test that keys missing from the source are not invented"""
+        raw = {"fileId": 1, "filename": "a", "etag": None}
+        self.assertEqual(FileEntry.from_dict(raw).to_dict(), raw)
+
+    def test_dict_style_access(self):
+        """Test get/[]/in with API keys"""
+        entry = FileEntry.from_dict(RAW)
+        self.assertEqual(entry.get("fileId"), 42)
+        self.assertEqual(entry["storageNode"], "m1")
+        self.assertIn("size", entry)
+        self.assertEqual(entry.get("missing", "x"), "x")
+        with self.assertRaises(KeyError):
+            entry["missing"]
+
+    def test_attributes_and_slots(self):
+        """Test attribute access and absence of a per-instance dict"""
+        entry = FileEntry.from_dict(RAW)
+        self.assertEqual(entry.parent_file_id, 7)
+        self.assertFalse(entry.is_folder)
+        self.assertFalse(hasattr(entry, "__dict__"))
+
+    def test_pickle(self):
+        """Test that entries survive pickling"""
+        entry = FileEntry.from_dict(RAW)
+        self.assertEqual(pickle.loads(pickle.dumps(entry)), RAW)
+
+    def test_compact_paginator(self):
+        """Test that FileListPaginator asks the API for FileEntry pages"""
+        api_method = Mock(side_effect=[([FileEntry.from_dict(RAW)], -1)])
+        items = FileListPaginator(api_method, compact=True).get_all()
+        self.assertEqual(api_method.call_args.kwargs["compact"], True)
+        self.assertIsInstance(items[0], FileEntry)
+        self.assertEqual(items[0].to_dict(), RAW)
+
+    def test_compact_paginator_without_compact_parameter(self):
+        """Test that a callable without a compact parameter gets raw pages converted"""
+        calls = []
+
+        def get_file_list(parent_file_id, limit, last_file_id=None):
+            calls.append(last_file_id)
+            return [RAW], -1
+
+        items = FileListPaginator(get_file_list, compact=True).get_all()
+        self.assertEqual(calls, [None])
+        self.assertIsInstance(items[0], FileEntry)
+        self.assertEqual(items[0].to_dict(), RAW)
+
+    def test_item_factory(self):
+        """Test that item_factory converts raw items"""
+        api_method = Mock(side_effect=[([RAW], -1)])
+        paginator = PaginationIterator(api_method, {}, item_factory=FileEntry.from_dict)
+        self.assertIsInstance(paginator.get_all()[0], FileEntry)
+
+
+class TestTreeCrawler(unittest.TestCase):
+    """Test cases for TreeCrawler"""
+
+    def setUp(self):
+        tree = {
+            0: [{"fileId": 1, "filename": "docs", "type": 1, "trashed": 0},
+                {"fileId": 2, "filename": "a.txt", "type": 0, "trashed": 0}],
+            1: [{"fileId": 3, "filename": "b.txt", "type": 0, "trashed": 0},
+                {"fileId": 4, "filename": "old.txt", "type": 0, "trashed": 1}],
+        }
+        self.api = Mock()
+        self.api.get_file_list.side_effect = (
+            lambda parent_file_id, limit, compact=False: (
+                [FileEntry.from_dict(item) for item in tree.get(parent_file_id, [])]
+                if compact else tree.get(parent_file_id, []),
+                -1,
+            )
+        )
+
+    def test_crawl_whole_tree(self):
+        """Test that every non-trashed entry is visited"""
+        crawler = TreeCrawler(self.api)
+        self.assertEqual([e.file_id for e in crawler], [1, 2, 3])
+        self.assertEqual(crawler.folders_visited, 2)
+
+    def test_max_depth(self):
+        """Test that max_depth stops descent"""
+        crawler = TreeCrawler(self.api, max_depth=1, compact=False)
+        self.assertEqual([e["fileId"] for e in crawler], [1, 2])
+
+    def test_failed_page_raises(self):
+        """Test that a folder listing that fails mid-way ends the crawl with CrawlError"""
+        listing = self.api.get_file_list.side_effect
+
+        def flaky(parent_file_id, limit, compact=False, last_file_id=None):
+            if parent_file_id == 1:
+                raise RuntimeError("page 2 failed")
+            return listing(parent_file_id, limit, compact)
+
+        self.api.get_file_list.side_effect = flaky
+        seen = []
+        with self.assertRaises(CrawlError) as ctx:
+            for entry in TreeCrawler(self.api):
+                seen.append(entry.file_id)
+        self.assertEqual(seen, [1, 2])
+        self.assertEqual(ctx.exception.folder_id, 1)
+        self.assertIsInstance(ctx.exception.__cause__, RuntimeError)
+
+    def test_incompatible_api_raises(self):
+        """Test that an api without the compact parameter is not mistaken for an empty tree"""
+        api = Mock()
+        api.get_file_list.side_effect = lambda parent_file_id, limit: ([], -1)
+        with self.assertRaises(CrawlError) as ctx:
+            list(TreeCrawler(api))
+        self.assertIsInstance(ctx.exception.error, TypeError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+"""
+Tests for the persistent job queue
+"""
+
+import io
+import json
+import logging
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from api import PanAPI, NetworkError
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from cli.batch import EXIT_OK, run
+from utils.jobqueue import JobQueue, JobWorker, TASK_DONE, TASK_FAILED
+from utils.logger import configure_console
+from utils.tracing import current_attempt
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test cases for JobQueue and JobWorker"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "jobs.db")
+        self.clock = FakeClock()
+        self.queue = JobQueue(self.path, clock=self.clock)
+        self.addCleanup(self.queue.close)
+
+    def test_submit_chunks_and_persists(self):
+        """Test that jobs are split into tasks and survive reopening the database"""
+        job_id = self.queue.submit("move", iter(range(250)), target=7)
+
+        with JobQueue(self.path, clock=self.clock) as reopened:
+            job = reopened.job(job_id)
+            self.assertEqual((job["total_tasks"], job["total_items"]), (3, 250))
+            self.assertEqual(job["params"], {"target": 7})
+            self.assertEqual(job["tasks"]["pending"], 3)
+            task = reopened.claim()
+            self.assertEqual((task.op, task.seq, len(task.file_ids)), ("move", 0, 100))
+
+    def test_invalid_jobs(self):
+        with self.assertRaises(ValueError):
+            self.queue.submit("chmod", [1])
+        with self.assertRaises(ValueError):
+            self.queue.submit("move", [1])
+
+    def test_lease(self):
+        """Test that a claimed task is handed out again only after its lease expires"""
+        self.queue.submit("trash", [1])
+        self.assertIsNotNone(self.queue.claim())
+        self.assertIsNone(self.queue.claim())
+
+        self.clock.now += self.queue.lease_seconds + 1
+        task = self.queue.claim()
+        self.assertEqual(task.attempts, 2)
+
+    def test_lease_token(self):
+        """Test that a worker whose lease was taken over cannot record an outcome"""
+        job_id = self.queue.submit("trash", [1])
+        stale = self.queue.claim()
+        self.clock.now += self.queue.lease_seconds * 0.9
+        self.assertTrue(self.queue.renew(stale))
+        self.clock.now += self.queue.lease_seconds * 0.9
+        self.assertIsNone(self.queue.claim())
+
+        self.clock.now += self.queue.lease_seconds
+        current = self.queue.claim()
+        self.assertFalse(self.queue.renew(stale))
+        self.assertFalse(self.queue.complete(stale, True))
+        self.assertFalse(self.queue.fail(stale, "late", None))
+        self.assertEqual(self.queue.job(job_id)["tasks"]["running"], 1)
+        self.assertTrue(self.queue.complete(current, True))
+        self.assertEqual(self.queue.job(job_id)["status"], "done")
+
+    def test_heartbeat_keeps_long_tasks(self):
+        """Test that a task outliving its lease is not handed to a second thread"""
+        queue = JobQueue(os.path.join(self.tmp.name, "short.db"), lease_seconds=0.2)
+        self.addCleanup(queue.close)
+        api = Mock()
+        api.trash_files.side_effect = lambda ids: time.sleep(0.6) or True
+        job_id = queue.submit("trash", [1])
+
+        JobWorker(api, queue, concurrency=2, idle_interval=0.01, heartbeat_interval=0.05).run()
+
+        self.assertEqual(api.trash_files.call_count, 1)
+        self.assertEqual(queue.job(job_id)["status"], "done")
+
+    def test_expired_too_often(self):
+        """Test that a task whose lease keeps expiring is failed instead of reclaimed forever"""
+        api = Mock()
+        job_id = self.queue.submit("trash", [1])
+        worker = JobWorker(api, self.queue, max_attempts=2)
+        for _ in range(3):
+            self.queue.claim()
+            self.clock.now += self.queue.lease_seconds + 1
+
+        self.assertFalse(worker.run_task(self.queue.claim()))
+        api.trash_files.assert_not_called()
+        self.assertEqual((self.queue.job(job_id)["status"], worker.failed), ("failed", 1))
+
+    def test_interrupt_leaves_remaining_tasks(self):
+        """Test that Ctrl-C stops a running worker after its current tasks instead of draining the queue"""
+        queue = JobQueue(os.path.join(self.tmp.name, "interrupt.db"), chunk_size=1)
+        self.addCleanup(queue.close)
+        api = Mock()
+        api.trash_files.side_effect = lambda ids: time.sleep(0.05) or True
+        job_id = queue.submit("trash", range(20))
+        previous = signal.signal(signal.SIGINT, signal.default_int_handler)
+        self.addCleanup(signal.signal, signal.SIGINT, previous)
+        timer = threading.Timer(0.12, os.kill, (os.getpid(), signal.SIGINT))
+
+        timer.start()
+        with self.assertRaises(KeyboardInterrupt):
+            JobWorker(api, queue, concurrency=2, idle_interval=0.01).run()
+        timer.join()
+
+        tasks = queue.job(job_id)["tasks"]
+        self.assertLess(api.trash_files.call_count, 20)
+        self.assertEqual(tasks[TASK_DONE], api.trash_files.call_count)
+        self.assertEqual(tasks["pending"], 20 - api.trash_files.call_count)
+
+    def test_pause_resume_cancel(self):
+        job_id = self.queue.submit("trash", [1])
+
+        self.assertTrue(self.queue.pause(job_id))
+        self.assertIsNone(self.queue.claim())
+        self.assertFalse(self.queue.has_pending())
+        self.assertTrue(self.queue.resume(job_id))
+        self.assertIsNotNone(self.queue.claim())
+
+        self.assertTrue(self.queue.cancel(job_id))
+        self.assertFalse(self.queue.resume(job_id))
+        self.assertEqual(self.queue.job(job_id)["status"], "cancelled")
+
+    def test_retries_then_succeeds(self):
+        """Test that a failed task is retried after the backoff delay"""
+        attempts = []
+
+        def trash(ids):
+            attempts.append(current_attempt())
+            if len(attempts) == 1:
+                raise NetworkError("timeout")
+            return True
+
+        api = Mock()
+        api.trash_files.side_effect = trash
+        job_id = self.queue.submit("trash", [1, 2])
+        worker = JobWorker(api, self.queue, concurrency=1, backoff=5)
+
+        self.assertFalse(worker.run_task(self.queue.claim()))
+        self.assertIsNone(self.queue.claim())
+        self.clock.now += 5
+        self.assertTrue(worker.run_task(self.queue.claim()))
+        self.assertEqual(attempts, [1, 2])
+
+        job = self.queue.job(job_id)
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(self.queue.results(job_id)[0]["attempts"], 2)
+
+    def test_gives_up_after_max_attempts(self):
+        api = Mock()
+        api.trash_files.side_effect = NetworkError("down")
+        job_id = self.queue.submit("trash", [1])
+        worker = JobWorker(api, self.queue, concurrency=1, max_attempts=2, backoff=0)
+
+        worker.run()
+
+        job = self.queue.job(job_id)
+        self.assertEqual((job["status"], job["tasks"][TASK_FAILED]), ("failed", 1))
+        self.assertIn("down", job["last_error"])
+        self.assertEqual(worker.failed, 1)
+
+        self.assertEqual(self.queue.retry_failed(job_id), 1)
+        self.assertEqual(self.queue.job(job_id)["status"], "active")
+
+    def test_drains_against_server(self):
+        """Test concurrent workers against the fake server, including delete"""
+        state = FakePanState()
+        files = [state.add_file(0, f"f{index}") for index in range(250)]
+        with FakePanServer(FakePanApp(state)) as server:
+            api = PanAPI(client_id="id", client_secret="secret",
+                         token_file=os.path.join(self.tmp.name, "access.json"), base_url=server.base_url)
+            api.ensure_token()
+            trash_job = self.queue.submit("trash", files[:150])
+            delete_job = self.queue.submit("delete", files[150:])
+
+            JobWorker(api, self.queue, concurrency=4, idle_interval=0.01).run()
+
+        self.assertEqual(self.queue.job(trash_job)["tasks"][TASK_DONE], 2)
+        self.assertEqual(self.queue.job(delete_job)["status"], "done")
+        self.assertTrue(all(state.files[file_id]["trashed"] for file_id in files[:150]))
+        self.assertFalse(any(file_id in state.files for file_id in files[150:]))
+
+    def test_rate_limit_counts_requests(self):
+        """Test that rate_limit applies to each request a task sends, not to the task"""
+        state = FakePanState()
+        files = [state.add_file(0, f"f{index}") for index in range(10)]
+        with FakePanServer(FakePanApp(state)) as server:
+            api = PanAPI(client_id="id", client_secret="secret",
+                         token_file=os.path.join(self.tmp.name, "access.json"), base_url=server.base_url)
+            api.ensure_token()
+            self.queue.submit("delete", files)
+
+            started = time.monotonic()
+            JobWorker(api, self.queue, concurrency=4, rate_limit=50, idle_interval=0.01).run()
+            elapsed = time.monotonic() - started
+
+        # One task, but 10 file_info + file_trash + file_delete requests
+        self.assertGreaterEqual(elapsed, 11 / 50)
+        self.assertEqual(api.hooks, [])
+
+
+class TestJobsCLI(unittest.TestCase):
+    """Test cases for the jobs batch commands"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(configure_console, sys.stdout, logging.NOTSET)
+        self.queue_path = os.path.join(self.tmp.name, "jobs.db")
+
+    def run_cli(self, argv, api=None, stdin=""):
+        stdout = io.StringIO()
+        status = run(argv, api=api, stdin=io.StringIO(stdin), stdout=stdout)
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_submit_inspect_run(self):
+        status, records = self.run_cli(["jobs", "--queue", self.queue_path, "submit", "recover", "-"],
+                                       stdin="1\n2\n3\n")
+        self.assertEqual(status, EXIT_OK)
+        job_id = records[0]["id"]
+
+        status, records = self.run_cli(["jobs", "--queue", self.queue_path, "pause", str(job_id)])
+        self.assertEqual(records, [{"jobId": job_id, "ok": True}])
+        self.run_cli(["jobs", "--queue", self.queue_path, "resume", str(job_id)])
+
+        api = Mock()
+        status, records = self.run_cli(["jobs", "--queue", self.queue_path, "run"], api=api)
+        self.assertEqual(status, EXIT_OK)
+        api.recover_files.assert_called_once_with([1, 2, 3])
+        self.assertEqual(records[0]["status"], "done")
+
+        status, records = self.run_cli(["jobs", "--queue", self.queue_path, "show", str(job_id), "--tasks"])
+        self.assertEqual(records[1]["fileIds"], [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
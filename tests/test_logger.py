@@ -0,0 +1,49 @@
+"""
+Tests for logging configuration
+"""
+
+import logging
+import unittest
+from unittest.mock import patch
+from utils import logger as log_module
+from utils.logger import setup_logger, enable_async_logging, disable_async_logging, is_async_logging
+
+
+class TestLogger(unittest.TestCase):
+    """Test cases for setup_logger and async output"""
+
+    def tearDown(self):
+        disable_async_logging()
+
+    def test_handlers_are_shared(self):
+        """Test that loggers share one console handler and repeated setup adds none"""
+        first = setup_logger("tests.logger.a")
+        second = setup_logger("tests.logger.b")
+        setup_logger("tests.logger.a")
+        self.assertEqual(len(first.handlers), 1)
+        self.assertIs(first.handlers[0], second.handlers[0])
+
+    def test_async_logging_uses_queue(self):
+        """Test that async mode swaps in a QueueHandler and flushes on disable"""
+        logger = setup_logger("tests.logger.async")
+        enable_async_logging()
+        self.assertTrue(is_async_logging())
+        self.assertIsInstance(logger.handlers[0], logging.handlers.QueueHandler)
+
+        with patch.object(log_module._console_handler, "emit") as emit:
+            logger.info("hello %s", "world")
+            disable_async_logging()
+            emit.assert_called_once()
+            self.assertEqual(emit.call_args.args[0].getMessage(), "hello world")
+
+        self.assertIs(logger.handlers[0], log_module._console_handler)
+
+    def test_loggers_created_while_async(self):
+        """Test that loggers set up in async mode also use the queue"""
+        enable_async_logging()
+        logger = setup_logger("tests.logger.late")
+        self.assertIsInstance(logger.handlers[0], logging.handlers.QueueHandler)
+
+
+if __name__ == "__main__":
+    unittest.main()
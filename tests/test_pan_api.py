@@ -0,0 +1,155 @@
+"""
+Tests for PanAPI response handling
+"""
+
+import json
+import unittest
+from unittest.mock import Mock, patch
+from api import PanAPI, APIError, NetworkError
+from config import ENDPOINTS
+from utils.file_entry import FileEntry
+from utils.json_codec import get_decoder, available_decoders
+from utils.metrics import MetricsRegistry
+
+
+def make_response(payload, status_code=200):
+    response = Mock()
+    response.status_code = status_code
+    response.content = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return response
+
+
+class TestJsonDecoders(unittest.TestCase):
+    """Test cases for the pluggable JSON decoders"""
+
+    def test_every_available_decoder(self):
+        """Test that all installed decoders agree and raise JSONDecodeError"""
+        for name in available_decoders():
+            decode = get_decoder(name)
+            self.assertEqual(decode(b'{"a": [1, "\\u4e2d"]}'), {"a": [1, "中"]})
+            with self.assertRaises(json.JSONDecodeError):
+                decode(b"{not json")
+
+    def test_unknown_decoder(self):
+        """Test that unknown decoder names are rejected"""
+        with self.assertRaises(ValueError):
+            get_decoder("yaml")
+
+
+class TestPanAPIResponses(unittest.TestCase):
+    """Test cases for PanAPI response parsing"""
+
+    def setUp(self):
+        self.api = PanAPI(client_id="id", client_secret="secret", token_file="/nonexistent/access.json")
+        self.api.access_token = "token"
+
+    @patch("api.pan_api.requests.request")
+    def test_get_file_list_compact(self, mock_get):
+        """Test that compact=True decodes pages into FileEntry objects"""
+        mock_get.return_value = make_response({
+            "code": 0,
+            "data": {"fileList": [{"fileId": 1, "filename": "a"}], "lastFileID": -1},
+        })
+        files, cursor = self.api.get_file_list(compact=True)
+        self.assertIsInstance(files[0], FileEntry)
+        self.assertEqual(files[0].to_dict(), {"fileId": 1, "filename": "a"})
+        self.assertEqual(cursor, -1)
+
+    @patch("api.pan_api.requests.request")
+    def test_debug_sample_is_lazy(self, mock_get):
+        """Test that the debug sample is not serialized when DEBUG is off"""
+        mock_get.return_value = make_response({
+            "code": 0,
+            "data": {"fileList": [{"fileId": 1}], "lastFileID": -1},
+        })
+        with patch("api.pan_api.json.dumps") as mock_dumps:
+            self.api.get_file_list()
+        mock_dumps.assert_not_called()
+
+    @patch("api.pan_api.requests.request")
+    def test_api_error_code(self, mock_get):
+        """Test that non-zero API codes raise APIError"""
+        mock_get.return_value = make_response({"code": 401, "message": "denied"})
+        with self.assertRaises(APIError) as ctx:
+            self.api.get_file_detail(1)
+        self.assertEqual(ctx.exception.code, 401)
+
+    @patch("api.pan_api.requests.request")
+    def test_malformed_body(self, mock_get):
+        """Test that malformed JSON raises APIError"""
+        mock_get.return_value = make_response(b"<html>")
+        with self.assertRaises(APIError):
+            self.api.get_file_detail(1)
+
+    @patch("api.pan_api.requests.request")
+    def test_http_error(self, mock_get):
+        """Test that non-200 responses raise APIError with the status code"""
+        mock_get.return_value = make_response({}, status_code=502)
+        with self.assertRaises(APIError) as ctx:
+            self.api.get_file_detail(1)
+        self.assertEqual(ctx.exception.status_code, 502)
+
+
+class TestPanAPIMetrics(unittest.TestCase):
+    """Test cases for request metrics"""
+
+    def setUp(self):
+        self.metrics = MetricsRegistry(ENDPOINTS)
+        self.api = PanAPI(
+            client_id="id", client_secret="secret",
+            token_file="/nonexistent/access.json", metrics=self.metrics,
+        )
+        self.api.access_token = "token"
+
+    @patch("api.pan_api.requests.request")
+    def test_counts_requests_and_errors(self, mock_request):
+        """Test that successes, API codes, HTTP statuses and bytes are recorded"""
+        mock_request.side_effect = [
+            make_response({"code": 0, "data": {"fileList": [], "lastFileID": -1}}),
+            make_response({"code": 429, "message": "too many"}),
+            make_response({}, status_code=503),
+        ]
+        self.api.get_file_list()
+        for _ in range(2):
+            with self.assertRaises(APIError):
+                self.api.get_file_list()
+
+        data = self.metrics.snapshot()["file_list"]
+        self.assertEqual(data["requests"], 3)
+        self.assertEqual(data["errors"], {"429": 1, "HTTP_503": 1})
+        self.assertEqual(data["status_codes"], {200: 2, 503: 1})
+        self.assertGreater(data["bytes_in"], 0)
+        self.assertEqual(data["latency"]["count"], 3)
+        self.assertEqual(self.metrics.snapshot()["share_list"]["requests"], 0)
+
+    @patch("api.pan_api.requests.request")
+    def test_network_errors(self, mock_request):
+        """Test that network failures are counted"""
+        import requests
+        mock_request.side_effect = requests.exceptions.ConnectionError("down")
+        with self.assertRaises(NetworkError):
+            self.api.get_file_detail(1)
+        self.assertEqual(self.metrics.snapshot()["file_info"]["errors"], {"NETWORK_ERROR": 1})
+
+    def test_prometheus_format(self):
+        """Test the Prometheus text exposition"""
+        self.metrics.observe("file_list", 0.02, status_code=200)
+        text = self.metrics.to_prometheus()
+        self.assertIn('pan_api_requests_total{endpoint="file_list"} 1', text)
+        self.assertIn('pan_api_request_duration_seconds_bucket{endpoint="file_list",le="0.025"} 1', text)
+        self.assertIn('pan_api_request_duration_seconds_bucket{endpoint="file_list",le="+Inf"} 1', text)
+
+    def test_quantiles(self):
+        """Test histogram quantile estimates"""
+        for _ in range(99):
+            self.metrics.observe("file_info", 0.003)
+        self.metrics.observe("file_info", 4.0)
+        latency = self.metrics.snapshot()["file_info"]["latency"]
+        self.assertLessEqual(latency["p50"], 0.005)
+        self.assertLessEqual(latency["p99"], 0.005)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot()["file_info"]["requests"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for path resolution and the path trie
+"""
+
+import os
+import tempfile
+import unittest
+from api import PanAPI
+from api.exceptions import FileNotFoundError as PanFileNotFoundError
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from utils.crawler import TreeCrawler
+from utils.path_cache import PathTrie
+
+
+class TestPathTrie(unittest.TestCase):
+    """Test cases for PathTrie bookkeeping"""
+
+    def test_completeness_needs_every_page(self):
+        trie = PathTrie()
+        trie.add_page(0, [{"fileId": 1, "filename": "a", "type": 1}], None, 1)
+        self.assertEqual(trie.child(0, "b"), (None, False))
+        trie.add_page(0, [{"fileId": 2, "filename": "b", "type": 0}], 1, -1)
+        self.assertEqual(trie.child(0, "b"), (2, True))
+        self.assertEqual(trie.child(0, "c"), (None, True))
+
+        # A page out of sequence does not make a listing complete
+        trie.add_page(1, [], 5, -1)
+        self.assertEqual(trie.child(1, "x"), (None, False))
+
+    def test_updates(self):
+        trie = PathTrie()
+        trie.add_page(0, [{"fileId": 1, "filename": "a", "type": 1},
+                          {"fileId": 3, "filename": "c", "type": 1}], None, -1)
+        trie.add_page(1, [{"fileId": 2, "filename": "f.txt", "type": 0}], None, -1)
+        self.assertEqual(trie.path_of(2), "/a/f.txt")
+
+        trie.rename(1, "b")
+        self.assertEqual(trie.path_of(2), "/b/f.txt")
+        self.assertEqual(trie.child(0, "a"), (None, True))
+
+        trie.move([2], 3)
+        self.assertEqual(trie.path_of(2), "/c/f.txt")
+        trie.move([99], 3)
+        self.assertEqual(trie.child(3, "g"), (None, False))
+
+        trie.remove([3])
+        self.assertIsNone(trie.path_of(2))
+        self.assertEqual(len(trie), 2)
+
+        trie.add_page(0, [{"fileId": 1, "filename": "b", "type": 1, "trashed": 1}], None, -1)
+        self.assertIsNone(trie.path_of(1))
+
+
+class TestResolvePath(unittest.TestCase):
+    """Test cases for PanAPI.resolve_path and path_of against the fake server"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.state = FakePanState()
+        projects = self.state.add_file(0, "projects", is_folder=True)
+        year = self.state.add_file(projects, "2026", is_folder=True)
+        self.raw = self.state.add_file(year, "raw", is_folder=True)
+        self.archive = self.state.add_file(0, "archive", is_folder=True)
+        for index in range(150):
+            self.state.add_file(year, f"f{index}")
+        self.server = FakePanServer(FakePanApp(self.state)).start()
+        self.addCleanup(self.server.stop)
+        self.api = PanAPI(client_id="id", client_secret="secret",
+                          token_file=os.path.join(self.tmp.name, "access.json"), base_url=self.server.base_url)
+        self.api.ensure_token()
+
+    def requests_made(self):
+        return sum(self.server.app.request_counts.values())
+
+    def test_repeated_resolution_is_local(self):
+        self.assertEqual(self.api.resolve_path("/projects/2026/raw/"), self.raw)
+        before = self.requests_made()
+        self.assertEqual(self.api.resolve_path("projects//2026/raw"), self.raw)
+        self.assertEqual(self.api.path_of(self.raw), "/projects/2026/raw")
+        self.assertEqual(self.api.resolve_path("/"), 0)
+        self.assertEqual(self.requests_made(), before)
+
+    def test_missing_paths(self):
+        with self.assertRaises(PanFileNotFoundError):
+            self.api.resolve_path("/projects/2027")
+        # The root is fully listed now, so this needs no request
+        before = self.requests_made()
+        with self.assertRaises(PanFileNotFoundError):
+            self.api.resolve_path("/nothing/here")
+        self.assertEqual(self.requests_made(), before)
+
+        with self.assertRaises(PanFileNotFoundError):
+            self.api.resolve_path("/projects/2026/f1/x")
+
+    def test_follows_rename_and_move(self):
+        self.api.resolve_path("/projects/2026/raw")
+        self.api.rename_files(self.raw, "raw-v2")
+        self.api.move_files([self.raw], self.archive)
+        before = self.requests_made()
+        self.assertEqual(self.api.path_of(self.raw), "/archive/raw-v2")
+        self.assertEqual(self.api.resolve_path("/archive/raw-v2"), self.raw)
+        self.assertEqual(self.requests_made(), before)
+
+        # "2026" was only partly listed, so the old name is checked with the server
+        with self.assertRaises(PanFileNotFoundError):
+            self.api.resolve_path("/projects/2026/raw")
+
+    def test_path_of_uncached_and_crawled(self):
+        """Test that path_of walks up with file details, and that a crawl fills the cache"""
+        self.assertEqual(self.api.path_of(self.raw), "/projects/2026/raw")
+        self.assertEqual(self.server.app.request_counts["file_info"], 3)
+
+        api = PanAPI(client_id="id", client_secret="secret",
+                     token_file=os.path.join(self.tmp.name, "access.json"), base_url=self.server.base_url)
+        list(TreeCrawler(api))
+        before = self.requests_made()
+        self.assertEqual(api.resolve_path("/projects/2026/f149"), max(self.state.files))
+        with self.assertRaises(PanFileNotFoundError):
+            api.resolve_path("/projects/2026/f150")
+        self.assertEqual(self.requests_made(), before)
+
+    def test_disabled_cache(self):
+        """Test that path_cache=False keeps listings out of any cache but lookups still work"""
+        api = PanAPI(client_id="id", client_secret="secret", path_cache=False,
+                     token_file=os.path.join(self.tmp.name, "access.json"), base_url=self.server.base_url)
+        self.assertIsNone(api.paths)
+        self.assertEqual(len(list(TreeCrawler(api))), len(self.state.files))
+
+        self.assertEqual(api.resolve_path("/projects/2026/raw"), self.raw)
+        self.assertEqual(api.path_of(self.raw), "/projects/2026/raw")
+        with self.assertRaises(PanFileNotFoundError):
+            api.resolve_path("/projects/2027")
+        before = self.server.app.request_counts["file_list"]
+        api.resolve_path("/projects/2026/raw")
+        self.assertEqual(self.server.app.request_counts["file_list"], before + 3)
+
+        new_id = api.make_folders("/archive/2026/q1")
+        self.assertEqual(api.path_of(new_id), "/archive/2026/q1")
+        self.assertEqual(api.make_folders("/archive/2026/q1"), new_id)
+        api.rename_files(self.raw, "raw-v2")
+        api.move_files([self.raw], self.archive)
+        self.assertEqual(api.resolve_path("/archive/raw-v2"), self.raw)
+
+
+if __name__ == "__main__":
+    unittest.main()
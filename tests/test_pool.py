@@ -0,0 +1,117 @@
+"""
+Tests for the multi-account client pool
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from api import ClientPool, PanAPI, APIError, NetworkError
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from config import RATE_LIMITED_CODE
+from utils.crawler import TreeCrawler
+from utils.tracing import current_attempt
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestClientPool(unittest.TestCase):
+    """Test cases for ClientPool routing"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.a, self.b = Mock(), Mock()
+        self.pool = ClientPool({"a": self.a, "b": self.b}, cooldown=5,
+                               clock=self.clock, sleep=self.clock.sleep)
+
+    def test_spreads_by_quota(self):
+        """Test that reads move to the next account once one is out of quota"""
+        pool = ClientPool({"a": self.a, "b": self.b}, qps=2, clock=self.clock, sleep=self.clock.sleep)
+        for _ in range(4):
+            pool.call("get_direct_link", 1)
+        self.assertEqual((self.a.get_direct_link.call_count, self.b.get_direct_link.call_count), (2, 2))
+
+        # Both are exhausted: the pool waits for quota instead of failing
+        pool.call("get_direct_link", 1)
+        self.assertGreater(self.clock.now, 1000.0)
+
+    def test_rate_limited_account_cools_down(self):
+        """Test that a 429 is retried on the other account, which then takes the traffic"""
+        self.a.get_file_detail.side_effect = APIError("busy", code=RATE_LIMITED_CODE)
+        self.b.get_file_detail.return_value = {"fileId": 1}
+
+        self.assertEqual(self.pool.call("get_file_detail", 1), {"fileId": 1})
+        self.pool.call("get_file_detail", 2)
+        self.assertEqual(self.a.get_file_detail.call_count, 1)
+        self.assertEqual(self.b.get_file_detail.call_count, 2)
+        self.assertEqual(self.pool.stats()["a"]["rate_limited"], 1)
+
+    def test_retries_report_attempt(self):
+        """Test that each retry runs under the next attempt number"""
+        seen = []
+
+        def busy(file_id):
+            seen.append(current_attempt())
+            raise NetworkError("down")
+
+        self.a.get_file_detail.side_effect = busy
+        self.b.get_file_detail.side_effect = lambda file_id: seen.append(current_attempt()) or {"fileId": file_id}
+
+        self.pool.call("get_file_detail", 1)
+        self.assertEqual(seen, [1, 2])
+        self.assertEqual(current_attempt(), 1)
+
+    def test_gives_up_after_retries(self):
+        self.a.get_file_list.side_effect = NetworkError("down")
+        self.b.get_file_list.side_effect = NetworkError("down")
+        with self.assertRaises(NetworkError):
+            self.pool.call("get_file_list")
+        self.assertEqual(self.a.get_file_list.call_count + self.b.get_file_list.call_count, 4)
+
+    def test_request_errors_not_retried(self):
+        self.a.get_file_detail.side_effect = APIError("not found", code=5066)
+        self.b.get_file_detail.side_effect = APIError("not found", code=5066)
+        with self.assertRaises(APIError):
+            self.pool.call("get_file_detail", 1)
+        self.assertEqual(self.a.get_file_detail.call_count + self.b.get_file_detail.call_count, 1)
+
+    def test_writes_are_pinned(self):
+        with self.assertRaises(ValueError):
+            self.pool.call("move_files", [1], 2)
+        with self.assertRaises(AttributeError):
+            self.pool.reader().delete_files
+        self.assertIs(self.pool.client("b"), self.b)
+        with self.assertRaises(KeyError):
+            self.pool.client("c")
+
+
+class TestClientPoolServer(unittest.TestCase):
+    """Test ClientPool against the fake server's per-account rate limit"""
+
+    def test_crawl_across_accounts(self):
+        state = FakePanState.generate_tree(depth=2, folders_per_folder=3, files_per_folder=5)
+        with tempfile.TemporaryDirectory() as tmp, FakePanServer(FakePanApp(state, rate_limit=5)) as server:
+            pool = ClientPool(qps=5)
+            for name in ("a", "b", "c"):
+                pool.add(name, PanAPI(client_id=name, client_secret="secret",
+                                      token_file=os.path.join(tmp, f"{name}.json"), base_url=server.base_url))
+
+            files = list(TreeCrawler(pool.reader()))
+
+        self.assertEqual(len(files), len(state.files))
+        stats = pool.stats()
+        self.assertTrue(all(member["requests"] > 0 for member in stats.values()))
+        self.assertEqual(sum(member["rate_limited"] for member in stats.values()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for streaming ranking operators
+"""
+
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import unittest
+from api import PanAPI
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from cli.batch import run
+from utils.file_entry import FileEntry
+from utils.logger import configure_console
+from utils.pagination import FileListPaginator
+from utils.ranking import external_sort, merge_sorted, top_k
+
+
+def make_entries(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        FileEntry(index, filename=f"n{rng.randrange(count // 2)}", type=0, size=rng.randrange(1000),
+                  update_at=f"2026-{rng.randrange(1, 13):02d}-01 00:00:00")
+        for index in range(1, count + 1)
+    ]
+
+
+class TestRanking(unittest.TestCase):
+    """Test cases for top_k, merge_sorted and external_sort"""
+
+    def test_top_k(self):
+        entries = make_entries(500) + [FileEntry(9999, filename="dir", type=1, size=10**9)]
+        expected = sorted((e for e in entries if e.type == 0), key=lambda e: e.size, reverse=True)[:10]
+        self.assertEqual(top_k(iter(entries), 10), expected)
+        newest = top_k(entries, 3, key="updateAt")
+        self.assertTrue(all(entry.update_at.startswith("2026-12") for entry in newest))
+        smallest = top_k(entries, 5, largest=False)
+        self.assertEqual([e.size for e in smallest], sorted(e.size for e in entries if e.type == 0)[:5])
+        self.assertEqual(len(top_k(entries, 1000)), 500)
+        with self.assertRaises(ValueError):
+            top_k(entries, 0)
+
+    def test_merge_sorted(self):
+        streams = [[{"fileId": i} for i in range(start, 30, 3)] for start in range(3)]
+        self.assertEqual([e["fileId"] for e in merge_sorted(iter(s) for s in streams)], list(range(30)))
+        missing = list(merge_sorted([[{"size": 2}], [{}, {"size": 1}]], key="size"))
+        self.assertEqual(missing, [{}, {"size": 1}, {"size": 2}])
+
+    def test_external_sort_matches_sorted(self):
+        entries = make_entries(1000)
+        for reverse in (False, True):
+            expected = sorted(entries, key=lambda e: e.filename, reverse=reverse)
+            # Several spilled runs, a single run and a short last run are all stable
+            for run_size in (64, 1000, 5000):
+                result = list(external_sort(iter(entries), "filename", reverse=reverse, run_size=run_size))
+                self.assertEqual([e.file_id for e in result], [e.file_id for e in expected])
+        self.assertEqual(list(external_sort([])), [])
+
+
+class TestRankingCLI(unittest.TestCase):
+    """Test cases for ranking over live listings"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(configure_console, sys.stdout, logging.NOTSET)
+        self.state = FakePanState.generate_tree(depth=2, folders_per_folder=3, files_per_folder=20, seed=3)
+        self.server = FakePanServer(FakePanApp(self.state)).start()
+        self.addCleanup(self.server.stop)
+        self.api = PanAPI(client_id="id", client_secret="secret",
+                          token_file=os.path.join(self.tmp.name, "access.json"), base_url=self.server.base_url)
+
+    def run_cli(self, argv):
+        stdout = io.StringIO()
+        run(argv, api=self.api, stdout=stdout)
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_ls_top_and_sort(self):
+        files = [f for f in self.state.files.values() if f["type"] == 0 and not f.get("trashed")]
+        largest = self.run_cli(["ls", "-r", "--top", "5"])
+        self.assertEqual([r["size"] for r in largest], sorted((f["size"] for f in files), reverse=True)[:5])
+
+        names = [r["filename"] for r in self.run_cli(["ls", "-r", "--sort", "filename"])]
+        self.assertEqual(names, sorted(names))
+        folders = sum(1 for f in self.state.files.values() if f["type"] == 1)
+        self.assertEqual(len(names), len(files) + folders)
+
+    def test_merge_folder_listings(self):
+        folders = [f["fileId"] for f in self.state.files.values() if f["type"] == 1][:4]
+        streams = [FileListPaginator(self.api.get_file_list, parent_file_id=folder, limit=7) for folder in folders]
+        ids = [entry["fileId"] for entry in merge_sorted(streams)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), sum(len(self.state.children[folder]) for folder in folders))
+
+
+if __name__ == "__main__":
+    unittest.main()
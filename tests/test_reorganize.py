@@ -0,0 +1,138 @@
+"""
+Tests for the rule-based reorganizer
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from api import PanAPI, APIError
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from cli.batch import EXIT_FAILED, EXIT_OK, EXIT_USAGE, run
+from utils.logger import configure_console
+from utils.reorganize import Rule, apply_reorg, plan_reorg
+
+
+class TestRules(unittest.TestCase):
+    """Test cases for rule matching"""
+
+    def test_conditions_and_template(self):
+        photo = {"fileId": 1, "filename": "IMG_1.JPG", "type": 0, "updateAt": "2025-03-09 10:00:00"}
+        rule = Rule("/Photos/{year}/{month}", extensions=[".jpg"])
+        self.assertEqual(rule.target_for(photo), "/Photos/2025/03")
+        self.assertIsNone(Rule("/x", extensions=["png"]).target_for(photo))
+        self.assertIsNone(Rule("/x", pattern=r"^DSC").target_for(photo))
+        self.assertEqual(Rule("/old", before="2025-04-01").target_for(photo), "/old")
+        self.assertIsNone(Rule("/new", after="2025-04-01").target_for(photo))
+        self.assertEqual(Rule("/by-ext/{ext}").target_for(photo), "/by-ext/jpg")
+
+        with self.assertRaises(ValueError):
+            Rule("/x", pattern="(")
+        with self.assertRaises(ValueError):
+            Rule("/{unknown}")
+        with self.assertRaises(ValueError):
+            Rule.from_dict({"extensions": ["jpg"]})
+
+    def test_first_match_wins(self):
+        entries = [{"fileId": 1, "filename": "a.mp4", "type": 0, "parentFileId": 0},
+                   {"fileId": 2, "filename": "b.txt", "type": 0, "parentFileId": 0},
+                   {"fileId": 3, "filename": "dir.mp4", "type": 1, "parentFileId": 0}]
+        reorg = plan_reorg(entries, [Rule("/Videos", extensions=["mp4"]), Rule("/All")])
+        self.assertEqual({t: [f for f, _ in files] for t, files in reorg.targets.items()},
+                         {"/Videos": [1], "/All": [2]})
+        self.assertEqual((reorg.scanned, reorg.unmatched), (2, 0))
+
+
+class TestReorganize(unittest.TestCase):
+    """Test cases for applying a plan against FakePanServer"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(configure_console, sys.stdout, logging.NOTSET)
+        self.state = FakePanState()
+        inbox = self.state.add_file(0, "inbox", is_folder=True)
+        self.videos = [self.state.add_file(inbox, f"ep{index}.mkv") for index in range(150)]
+        self.photos = []
+        for index, month in enumerate(["01", "01", "02"]):
+            photo = self.state.add_file(inbox, f"p{index}.jpg")
+            self.state.files[photo]["updateAt"] = f"2025-{month}-15 12:00:00"
+            self.photos.append(photo)
+        self.other = self.state.add_file(inbox, "notes.txt")
+        self.media = self.state.add_file(0, "Media", is_folder=True)
+        self.placed = self.state.add_file(self.state.add_file(self.media, "Videos", is_folder=True), "old.mkv")
+        self.server = FakePanServer(FakePanApp(self.state)).start()
+        self.addCleanup(self.server.stop)
+        self.api = PanAPI(client_id="id", client_secret="secret",
+                          token_file=os.path.join(self.tmp.name, "access.json"), base_url=self.server.base_url)
+        self.rules = os.path.join(self.tmp.name, "rules.json")
+        with open(self.rules, "w", encoding="utf-8") as f:
+            json.dump([{"target": "/Media/Videos", "extensions": ["mkv"]},
+                       {"target": "/Media/Photos/{year}-{month}", "extensions": ["jpg"]}], f)
+
+    def run_cli(self, argv):
+        stdout = io.StringIO()
+        status = run(argv, api=self.api, stdout=stdout)
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def path(self, file_id):
+        return self.api.path_of(file_id)
+
+    def test_dry_run_makes_no_changes(self):
+        status, records = self.run_cli(["reorg", self.rules, "--dry-run"])
+        self.assertEqual(status, EXIT_OK)
+        self.assertEqual([(r["target"], r["files"], r["moveCalls"]) for r in records],
+                         [("/Media/Photos/2025-01", 2, 1), ("/Media/Photos/2025-02", 1, 1), ("/Media/Videos", 151, 2)])
+        self.assertNotIn("file_move", self.server.app.request_counts)
+        self.assertNotIn("file_mkdir", self.server.app.request_counts)
+
+    def test_moves_are_grouped_by_target(self):
+        status, records = self.run_cli(["-j", "4", "reorg", self.rules])
+        self.assertEqual(status, EXIT_OK)
+        # 150 videos in 2 calls (the one already in place is skipped), one call per photo folder
+        self.assertEqual(self.server.app.request_counts["file_move"], 4)
+        self.assertEqual(self.server.app.request_counts["file_mkdir"], 3)
+        self.assertEqual(sum(len(r["fileIds"]) for r in records), 153)
+
+        self.assertEqual(self.path(self.videos[-1]), "/Media/Videos/ep149.mkv")
+        self.assertEqual(self.path(self.photos[1]), "/Media/Photos/2025-01/p1.jpg")
+        self.assertEqual(self.path(self.photos[2]), "/Media/Photos/2025-02/p2.jpg")
+        self.assertEqual(self.path(self.other), "/inbox/notes.txt")
+
+    def test_folder_errors_are_reported(self):
+        """Test that a target path blocked by a file fails alone"""
+        blocker = self.state.add_file(0, "Blocked")
+        reorg = plan_reorg([self.state.files[self.other]], [Rule("/Blocked/{ext}")])
+        records = list(apply_reorg(self.api, reorg))
+        self.assertEqual(len(records), 1)
+        self.assertIn("error", records[0])
+        self.assertNotIn(blocker, self.state.children)
+
+    def test_incomplete_listing_moves_nothing(self):
+        """Test that reorg stops before any move when a folder cannot be listed in full"""
+        listing = self.api.get_file_list
+
+        def flaky(parent_file_id, *args, **kwargs):
+            if parent_file_id == self.media:
+                raise APIError("获取文件列表失败", 503)
+            return listing(parent_file_id, *args, **kwargs)
+
+        with patch.object(self.api, "get_file_list", side_effect=flaky):
+            status, records = self.run_cli(["reorg", self.rules])
+        self.assertEqual(status, EXIT_FAILED)
+        self.assertEqual(records[-1]["folderId"], self.media)
+        self.assertNotIn("file_move", self.server.app.request_counts)
+
+    def test_bad_rules(self):
+        with open(self.rules, "w", encoding="utf-8") as f:
+            f.write('{"target": "/x"}')
+        status, _ = self.run_cli(["reorg", self.rules, "--dry-run"])
+        self.assertEqual(status, EXIT_USAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
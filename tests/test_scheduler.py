@@ -0,0 +1,127 @@
+"""
+Tests for the priority request scheduler
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from api.scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, RequestScheduler
+
+
+class TestRequestScheduler(unittest.TestCase):
+    """Test cases for RequestScheduler"""
+
+    def start(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread
+
+    def wait_for(self, scheduler, key, count):
+        deadline = time.monotonic() + 5
+        while sum(c[key] for c in scheduler.stats().values()) < count:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.001)
+
+    def block(self, scheduler):
+        """Occupy the only slot until the returned event is set"""
+        gate = threading.Event()
+        self.start(scheduler.run, PRIORITY_NORMAL, gate.wait)
+        self.wait_for(scheduler, "in_flight", 1)
+        return gate
+
+    def test_interactive_overtakes_bulk(self):
+        """Test that queued interactive calls run before bulk calls queued earlier"""
+        scheduler = RequestScheduler(Mock(), concurrency=1)
+        gate = self.block(scheduler)
+        order = []
+
+        threads = []
+        for index, priority in enumerate([PRIORITY_BULK] * 3 + [PRIORITY_INTERACTIVE] * 2):
+            threads.append(self.start(scheduler.run, priority, order.append, f"{priority}{index}"))
+            self.wait_for(scheduler, "queued", index + 1)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(order, ["interactive3", "interactive4", "bulk0", "bulk1", "bulk2"])
+        self.assertEqual(scheduler.stats()[PRIORITY_BULK]["dispatched"], 3)
+
+    def test_bulk_is_not_starved(self):
+        """Test that bulk still gets its weighted share while interactive calls keep coming"""
+        scheduler = RequestScheduler(Mock(), concurrency=1, weights={PRIORITY_INTERACTIVE: 4, PRIORITY_BULK: 1})
+        gate = self.block(scheduler)
+        order = []
+        threads = []
+        for index, priority in enumerate([PRIORITY_BULK] * 2 + [PRIORITY_INTERACTIVE] * 8):
+            threads.append(self.start(scheduler.run, priority, order.append, priority))
+            self.wait_for(scheduler, "queued", index + 1)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(order.index(PRIORITY_BULK), 4)
+        self.assertEqual(order[5:].count(PRIORITY_BULK), 1)
+
+    def test_class_limit(self):
+        """Test that bulk never holds more than its cap of the shared slots"""
+        scheduler = RequestScheduler(Mock(), concurrency=4, limits={PRIORITY_BULK: 2})
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def work():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+        threads = [self.start(scheduler.run, PRIORITY_BULK, work) for _ in range(8)]
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(max(peak), 2)
+
+    def test_qps(self):
+        scheduler = RequestScheduler(Mock(), qps=100)
+        started = time.monotonic()
+        threads = [self.start(scheduler.run, PRIORITY_NORMAL, lambda: None) for _ in range(6)]
+        for thread in threads:
+            thread.join(5)
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    def test_client_proxy(self):
+        """Test method default priorities, the proxy and error propagation"""
+        api = Mock()
+        api.get_direct_link.return_value = "https://x"
+        api.move_files.side_effect = RuntimeError("boom")
+        scheduler = RequestScheduler(api)
+
+        self.assertEqual(scheduler.call("get_direct_link", 1), "https://x")
+        self.assertEqual(scheduler.stats()[PRIORITY_INTERACTIVE]["dispatched"], 1)
+        scheduler.client(PRIORITY_BULK).get_direct_link(2)
+        self.assertEqual(scheduler.stats()[PRIORITY_BULK]["dispatched"], 1)
+
+        with self.assertRaises(RuntimeError):
+            scheduler.client().move_files([1], 2)
+        self.assertEqual(scheduler.stats()[PRIORITY_NORMAL]["in_flight"], 0)
+        with self.assertRaises(ValueError):
+            scheduler.run("urgent", print)
+
+    def test_composite_methods_rejected(self):
+        """Test that methods fanning out into several requests cannot take a single slot"""
+        scheduler = RequestScheduler(Mock())
+        client = scheduler.client(PRIORITY_BULK)
+
+        for method in ("delete_files", "get_file_details", "map", "resolve_path"):
+            with self.assertRaises(ValueError, msg=method):
+                scheduler.call(method, [1])
+            self.assertFalse(hasattr(client, method), method)
+        self.assertTrue(callable(client.get_file_list))
+        self.assertEqual(scheduler.stats()[PRIORITY_BULK]["dispatched"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests for the cached share inventory
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from api import PanAPI
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from utils.share_inventory import ShareInventory
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestShareInventory(unittest.TestCase):
+    """Test cases for ShareInventory against FakePanServer"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.state = FakePanState()
+        self.files = [self.state.add_file(0, f"f{index}") for index in range(5)]
+        self.state.add_share(self.files[:2], "week")                   # expires 2026-12-31
+        self.state.add_share([self.files[1]], "forever", expire_days=0)
+        for index in range(250):
+            self.state.add_share([self.files[4]], f"bulk{index}", expire_days=0)
+        self.server = FakePanServer(FakePanApp(self.state)).start()
+        self.addCleanup(self.server.stop)
+        self.api = PanAPI(client_id="id", client_secret="secret",
+                          token_file=os.path.join(self.tmp.name, "access.json"), base_url=self.server.base_url)
+        self.clock = FakeClock(datetime(2026, 12, 28).timestamp())
+        self.inventory = ShareInventory(self.api, max_age=60, clock=self.clock)
+
+    def list_requests(self):
+        return self.server.app.request_counts["share_list"]
+
+    def test_queries_from_memory(self):
+        self.assertEqual(self.inventory.refresh(), 252)
+        before = self.list_requests()
+        self.assertEqual(before, 3)
+
+        self.assertEqual([share["shareName"] for share in self.inventory.shares_for(self.files[1])], ["week", "forever"])
+        self.assertTrue(self.inventory.is_shared(self.files[0]))
+        self.assertFalse(self.inventory.is_shared(self.files[2]))
+        self.assertEqual([share["shareName"] for share in self.inventory.expiring()], ["week"])
+
+        self.clock.now = datetime(2027, 1, 1).timestamp()
+        self.assertFalse(self.inventory.is_shared(self.files[0]))
+        self.assertEqual(len(self.inventory.shares_for(self.files[0], include_expired=True)), 1)
+        self.assertEqual(self.list_requests(), before)
+
+    def test_incremental_and_full_refresh(self):
+        self.inventory.refresh()
+        before = self.list_requests()
+        self.state.add_share([self.files[3]], "new")
+        self.assertEqual(self.inventory.refresh(), 1)
+        self.assertEqual(self.list_requests(), before + 1)
+        self.assertTrue(self.inventory.is_shared(self.files[3]))
+
+        # Removals are only seen by a full listing
+        del self.state.shares[0]
+        self.inventory.refresh()
+        self.assertTrue(self.inventory.is_shared(self.files[0]))
+        self.clock.now += 60
+        self.assertEqual(self.inventory.refresh(), 252)
+        self.assertFalse(self.inventory.is_shared(self.files[0]))
+        self.assertEqual(len(self.inventory), 252)
+
+    def test_failed_listing_keeps_inventory(self):
+        self.inventory.refresh()
+        with patch.object(self.api, "get_share_list", side_effect=RuntimeError("boom")):
+            self.assertEqual(self.inventory.refresh(full=True), 0)
+        self.assertEqual(len(self.inventory), 252)
+
+    def test_bulk_update(self):
+        """Test that updates go out in batches and are applied without re-listing"""
+        ids = self.inventory.select(lambda share: share["shareName"].startswith("bulk"))
+        before = self.list_requests()
+        self.assertEqual(self.inventory.update(ids, traffic_switch=2, traffic_limit_switch=2, traffic_limit=1024), 250)
+
+        self.assertEqual(self.server.app.request_counts["share_update"], 3)
+        self.assertEqual(self.list_requests(), before)
+        self.assertEqual(self.inventory.get(ids[-1])["trafficLimit"], 1024)
+        self.assertEqual(self.state.shares[-1]["trafficLimit"], 1024)
+        self.assertEqual(self.inventory.get(1)["trafficSwitch"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests for bulk share creation from manifests
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from api import PanAPI
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from cli.batch import EXIT_FAILED, EXIT_OK, EXIT_USAGE, run
+from utils.logger import configure_console
+from utils.share_manifest import create_shares, read_manifest
+
+
+class TestReadManifest(unittest.TestCase):
+    """Test cases for manifest parsing"""
+
+    def test_csv(self):
+        manifest = io.StringIO(
+            "name,path,fileIds,expire,pwd,trafficSwitch\n"
+            "release,/releases/1.0,,0,ab12,\n"
+            "assets,,101 102;103,30,,2\n"
+            "broken,,,7,,\n"
+            ",,5,,,\n"
+            "bad-expire,,5,3,,\n"
+        )
+        specs = list(read_manifest(manifest))
+        self.assertEqual(specs[0]["path"], "/releases/1.0")
+        self.assertEqual((specs[0]["expire"], specs[0]["pwd"]), (0, "ab12"))
+        self.assertEqual(specs[1]["fileIds"], [101, 102, 103])
+        self.assertEqual((specs[1]["expire"], specs[1]["trafficSwitch"], specs[1]["pwd"]), (30, 2, None))
+        self.assertEqual([spec["line"] for spec in specs], [2, 3, 4, 5, 6])
+        self.assertEqual([("error" in spec) for spec in specs], [False, False, True, True, True])
+
+    def test_jsonl(self):
+        manifest = io.StringIO(
+            '{"name": "a", "fileIds": [1, 2]}\n'
+            "\n"
+            "not json\n"
+            '{"name": "b", "fileIds": "3,4", "trafficLimit": "x"}\n'
+        )
+        specs = list(read_manifest(manifest, "jsonl"))
+        self.assertEqual((specs[0]["fileIds"], specs[0]["expire"]), ([1, 2], 7))
+        self.assertEqual([spec["line"] for spec in specs], [1, 3, 4])
+        self.assertIn("trafficLimit", specs[2]["error"])
+
+
+class TestCreateShares(unittest.TestCase):
+    """Test cases for create_shares and "share bulk" against FakePanServer"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(configure_console, sys.stdout, logging.NOTSET)
+        self.state = FakePanState()
+        releases = self.state.add_file(0, "releases", is_folder=True)
+        self.release = self.state.add_file(releases, "1.0", is_folder=True)
+        self.files = [self.state.add_file(0, f"f{index}") for index in range(20)]
+        self.server = FakePanServer(FakePanApp(self.state)).start()
+        self.addCleanup(self.server.stop)
+        self.api = PanAPI(client_id="id", client_secret="secret",
+                          token_file=os.path.join(self.tmp.name, "access.json"), base_url=self.server.base_url)
+
+    def test_records_and_errors(self):
+        rows = [f'{{"name": "s{index}", "fileIds": [{file_id}]}}' for index, file_id in enumerate(self.files)]
+        rows += ['{"name": "release", "path": "/releases/1.0", "pwd": "ab12"}',
+                 '{"name": "missing", "path": "/releases/2.0"}',
+                 '{"fileIds": [1]}']
+        specs = read_manifest(io.StringIO("\n".join(rows)), "jsonl")
+        records = sorted(create_shares(self.api, specs, concurrency=4), key=lambda record: record["line"])
+
+        self.assertEqual(len(records), 23)
+        self.assertTrue(all(record["shareUrl"].startswith("https://") for record in records[:21]))
+        self.assertEqual(records[20]["name"], "release")
+        self.assertEqual(records[20]["sharePwd"], "ab12")
+        self.assertIn("error", records[21])
+        self.assertIn("error", records[22])
+        self.assertEqual(len(self.state.shares), 21)
+        shares = {share["shareId"]: share for share in self.state.shares}
+        self.assertEqual(shares[records[20]["shareID"]]["fileIdList"], str(self.release))
+
+    def test_cli(self):
+        path = os.path.join(self.tmp.name, "shares.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"name,fileIds\nfirst,{self.files[0]}\nsecond,\n")
+
+        stdout = io.StringIO()
+        status = run(["share", "bulk", path, "--rate-limit", "50"], api=self.api, stdout=stdout)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(status, EXIT_FAILED)
+        self.assertEqual({record["line"]: "shareID" in record for record in records}, {2: True, 3: False})
+
+        stdout = io.StringIO()
+        status = run(["share", "bulk", "-", "--format", "jsonl"], api=self.api,
+                     stdin=io.StringIO(f'{{"name": "x", "fileIds": [{self.files[1]}]}}\n'), stdout=stdout)
+        self.assertEqual(status, EXIT_OK)
+        self.assertEqual(json.loads(stdout.getvalue())["name"], "x")
+
+        status = run(["share", "bulk", os.path.join(self.tmp.name, "none.csv")], api=self.api, stdout=io.StringIO())
+        self.assertEqual(status, EXIT_USAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for tree snapshots and snapshot diffs
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from api import PanAPI, APIError
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from cli.batch import EXIT_FAILED, EXIT_OK, EXIT_USAGE, run
+from utils.file_entry import FileEntry
+from utils.logger import configure_console
+from utils.snapshot import diff_snapshots, read_snapshot, read_snapshot_header, take_snapshot, write_snapshot
+
+
+def entry(file_id, name, parent=0, size=1):
+    return FileEntry(file_id, filename=name, parent_file_id=parent, type=0, size=size)
+
+
+class TestDiffSnapshots(unittest.TestCase):
+    """Test cases for the linear-merge diff"""
+
+    def test_change_kinds(self):
+        old = [entry(1, "a"), entry(2, "b"), entry(3, "c"), entry(5, "e"), entry(6, "f")]
+        new = [entry(2, "b2"), entry(3, "c", parent=9), entry(4, "d"), entry(5, "e", size=2),
+               entry(6, "f"), entry(7, "g", parent=9)]
+        changes = [(c.change, c.file_id) for c in diff_snapshots(iter(old), iter(new))]
+        self.assertEqual(changes, [("removed", 1), ("renamed", 2), ("moved", 3), ("added", 4),
+                                   ("modified", 5), ("added", 7)])
+        both = list(diff_snapshots([entry(1, "a")], [entry(1, "b", parent=2)]))
+        self.assertEqual([c.change for c in both], ["moved", "renamed"])
+        self.assertEqual(both[0].to_dict()["new"]["parentFileId"], 2)
+
+    def test_unsorted_input(self):
+        with self.assertRaises(ValueError):
+            list(diff_snapshots([entry(2, "b"), entry(1, "a")], []))
+
+    def test_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("s.jsonl", "s.jsonl.gz"):
+                path = os.path.join(tmp, name)
+                entries = [entry(file_id, f"n{file_id}") for file_id in (5, 3, 9, 1, 7)]
+                self.assertEqual(write_snapshot(entries, path, root_id=4, run_size=2), 5)
+                self.assertEqual(read_snapshot_header(path)["root"], 4)
+                self.assertEqual([e.file_id for e in read_snapshot(path)], [1, 3, 5, 7, 9])
+                self.assertEqual(list(read_snapshot(path))[0], entry(1, "n1"))
+
+
+class TestSnapshotCLI(unittest.TestCase):
+    """Test cases for snapshot save/diff against FakePanServer"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(configure_console, sys.stdout, logging.NOTSET)
+        self.state = FakePanState.generate_tree(depth=2, folders_per_folder=3, files_per_folder=10, seed=5)
+        self.server = FakePanServer(FakePanApp(self.state)).start()
+        self.addCleanup(self.server.stop)
+        self.api = PanAPI(client_id="id", client_secret="secret",
+                          token_file=os.path.join(self.tmp.name, "access.json"), base_url=self.server.base_url)
+
+    def run_cli(self, argv):
+        stdout = io.StringIO()
+        status = run(argv, api=self.api, stdout=stdout)
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_save_and_diff(self):
+        monday = os.path.join(self.tmp.name, "monday.jsonl.gz")
+        today = os.path.join(self.tmp.name, "today.jsonl.gz")
+        total = len(self.state.files)
+        status, records = self.run_cli(["snapshot", "save", monday])
+        self.assertEqual((status, records[0]["entries"]), (EXIT_OK, total))
+
+        folders = sorted(f for f, info in self.state.files.items() if info["type"] == 1)
+        files = sorted(f for f, info in self.state.files.items() if info["type"] == 0)
+        self.state.move(files[0], folders[1])
+        self.state.files[files[1]]["filename"] = "renamed.dat"
+        self.state.files[files[2]]["size"] += 1
+        added = self.state.add_file(folders[0], "new.dat")
+        self.api.delete_files([files[3]])
+        take_snapshot(self.api, today)
+
+        status, records = self.run_cli(["snapshot", "diff", monday, today])
+        self.assertEqual(status, EXIT_OK)
+        self.assertEqual([(r["change"], r["fileId"]) for r in records],
+                         [("moved", files[0]), ("renamed", files[1]), ("modified", files[2]),
+                          ("removed", files[3]), ("added", added)])
+
+        status, _ = self.run_cli(["snapshot", "diff", monday, os.path.join(self.tmp.name, "missing")])
+        self.assertEqual(status, EXIT_USAGE)
+
+    def test_incomplete_crawl_not_saved(self):
+        """Test that a failed folder listing removes the partial snapshot and fails the command"""
+        path = os.path.join(self.tmp.name, "partial.jsonl")
+        folder = min(f for f, info in self.state.files.items() if info["type"] == 1)
+        listing = self.api.get_file_list
+
+        def flaky(parent_file_id, *args, **kwargs):
+            if parent_file_id == folder:
+                raise APIError("获取文件列表失败", 503)
+            return listing(parent_file_id, *args, **kwargs)
+
+        with patch.object(self.api, "get_file_list", side_effect=flaky):
+            status, records = self.run_cli(["snapshot", "save", path])
+
+        self.assertEqual(status, EXIT_FAILED)
+        self.assertEqual(records[0]["snapshot"], path)
+        self.assertIn(str(folder), records[0]["error"])
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for lazy imports and client construction cost
+"""
+
+import builtins
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from api import PanAPI
+from benchmarks.startup import measure_import
+from utils.lazy import LazyModule, lazy_import
+
+
+class TestLazyImport(unittest.TestCase):
+    """Test cases for lazy_import"""
+
+    def test_loads_on_first_use(self):
+        module = lazy_import("colorsys")
+        self.assertIsInstance(module, LazyModule)
+        self.assertIn("not loaded", repr(module))
+        self.assertEqual(module.rgb_to_hsv(0, 0, 0), (0, 0, 0))
+        self.assertIn("(loaded)", repr(module))
+
+    def test_missing_module(self):
+        self.assertIsNone(lazy_import("no_such_module_123pan", optional=True))
+        with self.assertRaises(ImportError):
+            lazy_import("no_such_module_123pan")
+
+
+class TestStartup(unittest.TestCase):
+    """Test cases for startup work"""
+
+    def test_entry_points_defer_heavy_imports(self):
+        """Test that CLI entry points do not import requests, pyarrow, otel or menu handlers"""
+        for module in ("main", "cli.batch"):
+            _, _, loaded = measure_import(module)
+            self.assertEqual(loaded, [], module)
+
+    def test_token_file_read_once_without_network(self):
+        """Test that the constructor reads access.json once and sends nothing"""
+        with tempfile.TemporaryDirectory() as tmp:
+            token_file = os.path.join(tmp, "access.json")
+            with open(token_file, "w") as f:
+                json.dump({
+                    "client_id": "id",
+                    "client_secret": "secret",
+                    "access_token": "token",
+                    "expired_at": "2099-01-01 00:00:00",
+                }, f)
+
+            real_open = builtins.open
+            opened = []
+
+            def counting_open(path, *args, **kwargs):
+                opened.append(path)
+                return real_open(path, *args, **kwargs)
+
+            with patch("builtins.open", counting_open), patch("api.pan_api.requests.request") as mock_request:
+                api = PanAPI(token_file=token_file)
+
+            self.assertEqual(opened.count(token_file), 1)
+            mock_request.assert_not_called()
+            self.assertEqual((api.client_id, api.access_token), ("id", "token"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests for request tracing hooks
+"""
+
+import json
+import unittest
+from unittest.mock import Mock, patch
+from api import PanAPI, APIError
+from utils.tracing import (
+    CallbackHook,
+    OpenTelemetryHook,
+    RequestHook,
+    KIND_TOKEN_REFRESH,
+    otel_trace,
+    retry_attempt,
+)
+
+
+def make_response(payload, status_code=200):
+    response = Mock()
+    response.status_code = status_code
+    response.content = json.dumps(payload).encode()
+    return response
+
+
+TOKEN_RESPONSE = {
+    "code": 0,
+    "data": {"accessToken": "new-token", "expiredAt": "2099-01-01T00:00:00+08:00"},
+}
+
+
+class RecordingHook(RequestHook):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, ctx):
+        self.events.append(("before", ctx.endpoint, ctx.params_size))
+
+    def after_request(self, ctx):
+        self.events.append(("after", ctx.endpoint, ctx.status_code, ctx.error_code))
+
+    def before_token_refresh(self, ctx):
+        self.events.append(("before_refresh", ctx.kind))
+
+    def after_token_refresh(self, ctx):
+        self.events.append(("after_refresh", ctx.error is None))
+
+
+class TestTracingHooks(unittest.TestCase):
+    """Test cases for PanAPI request hooks"""
+
+    def setUp(self):
+        self.hook = RecordingHook()
+        self.api = PanAPI(
+            client_id="id", client_secret="secret",
+            token_file="/nonexistent/access.json", hooks=[self.hook],
+        )
+
+    @patch("api.pan_api.PanAPI.save_access_token")
+    @patch("api.pan_api.requests.request")
+    def test_token_refresh_wraps_request(self, mock_request, _save):
+        """Test hook order for a request that triggers a token refresh"""
+        mock_request.side_effect = [
+            make_response(TOKEN_RESPONSE),
+            make_response({"code": 0, "data": {}}),
+        ]
+        self.api.move_files([1, 2, 3], 9)
+        self.assertEqual(self.hook.events, [
+            ("before_refresh", KIND_TOKEN_REFRESH),
+            ("before", "access_token", 2),
+            ("after", "access_token", 200, None),
+            ("after_refresh", True),
+            ("before", "file_move", 4),
+            ("after", "file_move", 200, None),
+        ])
+
+    @patch("api.pan_api.requests.request")
+    def test_error_reported_to_hook(self, mock_request):
+        """Test that API errors reach after_request"""
+        self.api.access_token = "token"
+        mock_request.return_value = make_response({"code": 5066, "message": "no such file"})
+        with self.assertRaises(APIError):
+            self.api.get_file_detail(1)
+        self.assertEqual(self.hook.events[-1], ("after", "file_info", 200, 5066))
+
+    @patch("api.pan_api.requests.request")
+    def test_failing_hook_does_not_break_request(self, mock_request):
+        """Test that hook exceptions are isolated"""
+        self.api.access_token = "token"
+        self.api.add_hook(CallbackHook(before=Mock(side_effect=RuntimeError("boom"))))
+        mock_request.return_value = make_response({"code": 0, "data": {"fileName": "a"}})
+        self.assertEqual(self.api.get_file_detail(1), {"fileName": "a"})
+
+    @patch("api.pan_api.requests.request")
+    def test_retry_attempt_reaches_hook(self, mock_request):
+        """Test that retrying callers set RequestContext.attempt for the requests of each try"""
+        self.api.access_token = "token"
+        mock_request.return_value = make_response({"code": 0, "data": {"fileName": "a"}})
+        attempts = []
+        self.api.add_hook(CallbackHook(before=lambda ctx: attempts.append(ctx.attempt)))
+
+        self.api.get_file_detail(1)
+        with retry_attempt(3):
+            self.api.get_file_detail(1)
+            with retry_attempt(4):
+                self.api.get_file_detail(1)
+            self.api.get_file_detail(1)
+        self.api.get_file_detail(1)
+        self.assertEqual(attempts, [1, 3, 4, 3, 1])
+
+    @unittest.skipIf(otel_trace is None, "opentelemetry not installed")
+    @patch("api.pan_api.PanAPI.save_access_token")
+    @patch("api.pan_api.requests.request")
+    def test_opentelemetry_spans(self, mock_request, _save):
+        """Test that token refresh spans parent the access_token request span"""
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        api = PanAPI(
+            client_id="id", client_secret="secret", token_file="/nonexistent/access.json",
+            hooks=[OpenTelemetryHook(provider.get_tracer("test"))],
+        )
+        mock_request.side_effect = [
+            make_response(TOKEN_RESPONSE),
+            make_response({"code": 0, "data": {"fileList": [], "lastFileID": -1}}),
+        ]
+        api.get_file_list()
+
+        spans = {span.name: span for span in exporter.get_finished_spans()}
+        self.assertEqual(set(spans), {"pan_api token_refresh", "pan_api access_token", "pan_api file_list"})
+        self.assertEqual(
+            spans["pan_api access_token"].parent.span_id,
+            spans["pan_api token_refresh"].context.span_id,
+        )
+        self.assertEqual(spans["pan_api file_list"].attributes["http.status_code"], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
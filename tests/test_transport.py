@@ -0,0 +1,92 @@
+"""
+Tests for the HTTP/1.1 keep-alive and HTTP/2 transports
+"""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from api import PanAPI, NetworkError
+from api.transport import HTTP1Transport, HTTP2Transport, create_transport, httpx
+from benchmarks.fake_server import FakePanApp, FakePanServer, FakePanState
+from utils.lazy import lazy_import
+
+h2 = lazy_import("h2", optional=True)
+HTTP2_AVAILABLE = httpx is not None and h2 is not None
+if HTTP2_AVAILABLE:
+    from benchmarks.h2_server import FakePanH2Server
+
+
+class TestTransport(unittest.TestCase):
+    """Test cases for transports used by PanAPI"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.state = FakePanState.generate_tree(depth=1, folders_per_folder=2, files_per_folder=30)
+
+    def make_api(self, server, transport):
+        return PanAPI(
+            client_id="id",
+            client_secret="secret",
+            token_file=os.path.join(self.tmp.name, "access.json"),
+            base_url=server.base_url,
+            transport=transport,
+        )
+
+    def test_create_transport(self):
+        self.assertIsNone(create_transport("requests"))
+        transport = create_transport("http1")
+        self.assertIsInstance(transport, HTTP1Transport)
+        transport.close()
+        with self.assertRaises(ValueError):
+            create_transport("spdy")
+
+    def test_http1_keep_alive(self):
+        """Test that PanAPI works over a shared session and closes only transports it created"""
+        with FakePanServer(FakePanApp(self.state)) as server:
+            with self.make_api(server, "http1") as api:
+                self.assertIsInstance(api.transport, HTTP1Transport)
+                files, _ = api.get_file_list(parent_file_id=0, limit=100)
+                self.assertEqual(len(files), 32)
+
+            shared = HTTP1Transport(pool_size=4)
+            api = self.make_api(server, shared)
+            api.close()
+            self.assertIs(api.transport, shared)
+            self.assertEqual(len(api.get_file_list(parent_file_id=0)[0]), 32)
+            shared.close()
+
+    @unittest.skipUnless(HTTP2_AVAILABLE, "httpx[http2] not installed")
+    def test_http2_multiplexes_concurrent_requests(self):
+        """Test that concurrent requests share one HTTP/2 connection"""
+        with FakePanH2Server(FakePanApp(self.state, latency=0.01)) as server:
+            transport = HTTP2Transport(max_connections=1, prior_knowledge=True)
+            with transport, self.make_api(server, transport) as api:
+                folder_ids = [entry["fileId"] for entry in api.get_file_list(0)[0] if entry["type"] == 1]
+                with ThreadPoolExecutor(max_workers=32) as pool:
+                    listings = list(pool.map(lambda i: api.get_file_list(folder_ids[i % 2])[0], range(64)))
+
+            self.assertTrue(all(len(files) == 30 for files in listings))
+            self.assertEqual(server.app.request_counts["file_list"], 65)
+            self.assertEqual(server.connections, 1)
+
+    @unittest.skipUnless(HTTP2_AVAILABLE, "httpx[http2] not installed")
+    def test_http2_error_mapping(self):
+        """Test that httpx timeouts and connection errors become NetworkError"""
+        with FakePanH2Server(FakePanApp(self.state, latency=0.5)) as server:
+            transport = HTTP2Transport(prior_knowledge=True)
+            with transport:
+                api = self.make_api(server, transport)
+                api.access_token = "token"
+                with self.assertRaisesRegex(NetworkError, "请求超时"):
+                    api._request("file_list", "GET", "获取文件列表失败", params={"parentFileId": 0}, timeout=(1, 0.05))
+        with HTTP2Transport(prior_knowledge=True) as transport:
+            api = self.make_api(server, transport)
+            api.access_token = "token"
+            with self.assertRaisesRegex(NetworkError, "网络连接失败"):
+                api.get_file_list(parent_file_id=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Tests for the polling folder watcher
+"""
+
+import unittest
+from unittest.mock import Mock
+from utils.watcher import (
+    FolderWatcher,
+    EVENT_CREATED,
+    EVENT_MODIFIED,
+    EVENT_DELETED,
+    EVENT_MOVED,
+    EVENT_RENAMED,
+    CHECK_UPDATE_AT,
+)
+
+
+def make_file(file_id, name, parent=10, size=1, etag="e"):
+    return {
+        "fileId": file_id,
+        "filename": name,
+        "parentFileId": parent,
+        "size": size,
+        "etag": etag,
+        "trashed": 0,
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFolderWatcher(unittest.TestCase):
+    """Test cases for FolderWatcher"""
+
+    def setUp(self):
+        self.listings = {10: [make_file(1, "a.txt")], 20: []}
+        self.api = Mock()
+        self.api.get_file_list.side_effect = (
+            lambda parent_file_id, limit, last_file_id=None: (list(self.listings[parent_file_id]), -1)
+        )
+        self.clock = FakeClock()
+        self.watcher = FolderWatcher(self.api, [10, 20], min_interval=1, max_interval=8, clock=self.clock)
+
+    def test_first_poll_only_primes(self):
+        """Test that the first poll records a snapshot without events"""
+        self.assertEqual(self.watcher.poll_once(), [])
+
+    def test_created_modified_deleted(self):
+        """Test detection of created, modified and deleted files"""
+        self.listings[10] = [make_file(1, "a.txt"), make_file(2, "b.txt")]
+        self.watcher.poll_once()
+        self.listings[10] = [make_file(1, "a.txt", size=5), make_file(3, "c.txt")]
+        events = {(e.event_type, e.file_id) for e in self.watcher.poll_once(force=True)}
+        self.assertEqual(events, {(EVENT_MODIFIED, 1), (EVENT_DELETED, 2), (EVENT_CREATED, 3)})
+
+    def test_move_between_watched_folders(self):
+        """Test that a file leaving one folder for another is a single move"""
+        self.watcher.poll_once()
+        self.listings[10] = []
+        self.listings[20] = [make_file(1, "a.txt", parent=20)]
+        events = self.watcher.poll_once(force=True)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].event_type, EVENT_MOVED)
+        self.assertEqual(events[0].folder_id, 20)
+        self.assertEqual(events[0].previous["parentFileId"], 10)
+
+    def test_rename_in_place_is_not_a_move(self):
+        """Test that a new name in the same folder is a rename, and a new parent a move"""
+        self.watcher.poll_once()
+        self.listings[10] = [make_file(1, "renamed.txt")]
+        events = self.watcher.poll_once(force=True)
+        self.assertEqual([e.event_type for e in events], [EVENT_RENAMED])
+        self.assertEqual(events[0].previous["filename"], "a.txt")
+
+        self.listings[10] = []
+        self.listings[20] = [make_file(1, "renamed.txt", parent=20)]
+        events = self.watcher.poll_once(force=True)
+        self.assertEqual([e.event_type for e in events], [EVENT_MOVED])
+
+    def test_move_and_rename(self):
+        """Test that a file moved under a new name is reported as both"""
+        self.watcher.poll_once()
+        self.listings[10] = []
+        self.listings[20] = [make_file(1, "b.txt", parent=20)]
+        events = self.watcher.poll_once(force=True)
+        self.assertEqual([e.event_type for e in events], [EVENT_MOVED, EVENT_RENAMED])
+
+    def test_trashed_files_are_deleted(self):
+        """Test that trashed entries count as deleted"""
+        self.watcher.poll_once()
+        trashed = make_file(1, "a.txt")
+        trashed["trashed"] = 1
+        self.listings[10] = [trashed]
+        events = self.watcher.poll_once(force=True)
+        self.assertEqual([e.event_type for e in events], [EVENT_DELETED])
+
+    def test_idle_folder_backs_off_with_one_request(self):
+        """Test adaptive interval and single-request idle polls"""
+        self.watcher.poll_once()
+        calls = self.api.get_file_list.call_count
+        self.clock.now = 100
+        self.watcher.poll_once()
+        self.assertEqual(self.api.get_file_list.call_count, calls + 2)
+        self.assertEqual(self.watcher.get_interval(10), 4)
+        self.clock.now = 200
+        self.watcher.poll_once()
+        self.assertEqual(self.watcher.get_interval(10), 8)
+
+    def test_change_resets_interval(self):
+        """Test that a change resets the polling interval"""
+        self.watcher.poll_once()
+        self.clock.now = 100
+        self.watcher.poll_once()
+        self.listings[10] = []
+        self.clock.now = 200
+        self.watcher.poll_once()
+        self.assertEqual(self.watcher.get_interval(10), 1)
+
+    def test_update_at_mode_skips_listing(self):
+        """Test that an unchanged folder updateAt avoids listing"""
+        self.api.get_file_detail.return_value = {"updateAt": "2026-01-01 00:00:00"}
+        watcher = FolderWatcher(self.api, [10], check_mode=CHECK_UPDATE_AT, clock=self.clock)
+        watcher.poll_once()
+        list_calls = self.api.get_file_list.call_count
+        watcher.poll_once(force=True)
+        self.assertEqual(self.api.get_file_list.call_count, list_calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
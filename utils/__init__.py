@@ -1,7 +1,43 @@
 """
 Utility modules for 123Pan API wrapper
+
+Exports are resolved on first access, so importing one utility module (e.g.
+utils.logger) does not import all the others.
 """
 
-from .pagination import PaginationIterator
+import importlib
+
+_EXPORTS = {
+    "PaginationIterator": ".pagination",
+    "FileListPaginator": ".pagination",
+    "ShareListPaginator": ".pagination",
+    "FileEntry": ".file_entry",
+    "TreeCrawler": ".crawler",
+    "CrawlError": ".crawler",
+    "FolderWatcher": ".watcher",
+    "FileEvent": ".watcher",
+}
+
+__all__ = [
+    "PaginationIterator",
+    "FileListPaginator",
+    "ShareListPaginator",
+    "FileEntry",
+    "TreeCrawler",
+    "CrawlError",
+    "FolderWatcher",
+    "FileEvent",
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["PaginationIterator"]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
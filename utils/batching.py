@@ -0,0 +1,113 @@
+"""
+Helpers for bulk operations: API-sized batches, bounded concurrency and pacing
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from config import MAX_BATCH_SIZE
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int = MAX_BATCH_SIZE) -> Iterator[List[T]]:
+    """
+    Split an iterable into lists of at most size items
+
+    Args:
+        items: Any iterable (consumed lazily)
+        size: Maximum batch size (default: config.MAX_BATCH_SIZE)
+
+    Yields:
+        Lists of consecutive items
+    """
+    if size < 1:
+        raise ValueError("批次大小必须为正整数")
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _outcome(item: Any, future: Future) -> Tuple[Any, Any, Optional[BaseException]]:
+    error = future.exception()
+    return item, None if error else future.result(), error
+
+
+def bounded_map(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    concurrency: int,
+    ordered: bool = False,
+) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Run func over items on a thread pool with at most concurrency calls in flight
+
+    Items are consumed lazily, so arbitrarily long stdin streams are fine.
+
+    Args:
+        func: Called with each item
+        items: Any iterable
+        concurrency: Calls in flight
+        ordered: Yield in input order instead; a slow call then delays the
+            results behind it, and the calls after them until it finishes
+
+    Yields:
+        (item, result, error) in completion order (or input order); error is None on success
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        iterator = iter(items)
+        if ordered:
+            window: deque = deque()
+            for item in iterator:
+                window.append((item, pool.submit(func, item)))
+                if len(window) >= concurrency:
+                    yield _outcome(*window.popleft())
+            while window:
+                yield _outcome(*window.popleft())
+            return
+
+        pending = {}
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(func, item)] = item
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield _outcome(pending.pop(future), future)
+
+
+class RateLimiter:
+    """Token bucket shared by worker threads"""
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.clock = clock
+        self._tokens = 1.0
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(1.0, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
@@ -0,0 +1,126 @@
+"""
+Bulk regex rename: plan new names over a listing, check collisions locally,
+then run the renames through the durable job queue
+
+The rename API takes one file per call, so a large rename is submitted as a
+"rename" job (one task per file): JobWorker runs the calls with bounded
+concurrency, retries failures with backoff, and an interrupted run resumes
+from the journal with ``python main.py jobs run``.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import FILE_TYPE_FOLDER
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RenamePlan:
+    """Planned renames and the collisions found while planning"""
+
+    def __init__(self):
+        self.renames: List[Dict[str, Any]] = []
+        self.collisions: List[Dict[str, Any]] = []
+        self.scanned = 0
+
+    def items(self) -> List[List[Any]]:
+        """[fileId, newName] pairs, as submitted to the job queue"""
+        return [[rename["fileId"], rename["new"]] for rename in self.renames]
+
+
+def plan_renames(
+    entries: Iterable[Any],
+    pattern: str,
+    template: str,
+    include_folders: bool = False,
+) -> RenamePlan:
+    """
+    Apply a regex substitution to every name and check the result for collisions
+
+    A file is renamed when the pattern matches its name and the substitution
+    (re.sub with template, so \\1 or \\g<name> refer to groups) changes it.
+    Every sibling must be in entries (list whole folders), because a new name
+    collides when it is empty, contains "/", equals another new name in the
+    same folder or equals the current name of any other entry there. The last
+    rule is deliberately strict: shifting names (a -> b while b -> c) would
+    depend on call order, so it is reported instead of attempted.
+
+    Args:
+        entries: Listing of the folders to rename in (e.g. a TreeCrawler)
+        pattern: Regular expression searched in each name
+        template: Replacement, as for re.sub
+        include_folders: Also rename folders
+
+    Raises:
+        ValueError: If the pattern or template is invalid
+        utils.crawler.CrawlError: If a folder listing is incomplete; planning
+            on a partial listing would miss collisions, so nothing is returned
+    """
+    try:
+        regex = re.compile(pattern)
+        regex.sub(template, "")
+    except re.error as e:
+        raise ValueError(f"无效的正则表达式或替换模板: {e}")
+
+    result = RenamePlan()
+    # parent -> current names, and parent -> new name -> fileIds taking it
+    current: Dict[int, Set[str]] = {}
+    taken: Dict[int, Dict[str, List[int]]] = {}
+    for entry in entries:
+        name = entry.get("filename") or ""
+        parent_id = entry.get("parentFileId")
+        current.setdefault(parent_id, set()).add(name)
+        if entry.get("type") == FILE_TYPE_FOLDER and not include_folders:
+            continue
+        result.scanned += 1
+        if not regex.search(name):
+            continue
+        new_name = regex.sub(template, name)
+        if new_name == name:
+            continue
+        rename = {"fileId": entry.get("fileId"), "parentFileId": parent_id, "old": name, "new": new_name}
+        result.renames.append(rename)
+        taken.setdefault(parent_id, {}).setdefault(new_name, []).append(rename["fileId"])
+
+    for rename in result.renames:
+        reason = _collision(rename, current, taken)
+        if reason is not None:
+            result.collisions.append({**rename, "error": reason})
+    logger.info("重命名计划: 扫描 %d 个, 重命名 %d 个, 冲突 %d 个",
+                result.scanned, len(result.renames), len(result.collisions))
+    return result
+
+
+def _collision(
+    rename: Dict[str, Any],
+    current: Dict[int, Set[str]],
+    taken: Dict[int, Dict[str, List[int]]],
+) -> Optional[str]:
+    new_name = rename["new"]
+    parent_id = rename["parentFileId"]
+    if not new_name.strip() or "/" in new_name:
+        return f"无效的新名称: {new_name!r}"
+    others = [file_id for file_id in taken[parent_id][new_name] if file_id != rename["fileId"]]
+    if others:
+        return f"与文件 {others[0]} 的新名称相同"
+    if new_name in current.get(parent_id, ()):
+        return "同一文件夹中已有同名文件"
+    return None
+
+
+def submit_renames(queue: Any, rename_plan: RenamePlan) -> Tuple[int, int]:
+    """
+    Submit the planned renames as one "rename" job
+
+    Returns:
+        (job ID, number of renames)
+
+    Raises:
+        ValueError: If the plan has collisions
+    """
+    if rename_plan.collisions:
+        raise ValueError(f"存在 {len(rename_plan.collisions)} 个名称冲突，未提交")
+    items = rename_plan.items()
+    return queue.submit("rename", items), len(items)
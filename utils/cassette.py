@@ -0,0 +1,218 @@
+"""
+Record and replay PanAPI HTTP traffic
+
+A cassette is a JSON Lines file (gzip-compressed when the path ends in .gz):
+a header line followed by one line per request with the endpoint name,
+method, parameters, HTTP status, raw response body and the original latency.
+Headers and access token requests are never written, so cassettes carry no
+credentials.
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+
+from utils.lazy import lazy_import
+from utils.logger import setup_logger
+
+requests = lazy_import("requests")
+
+logger = setup_logger(__name__)
+
+CASSETTE_VERSION = 1
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+# Never recorded: the request body carries the client secret
+_UNRECORDED_ENDPOINTS = ("access_token",)
+
+
+class CassetteError(Exception):
+    """Raised when a replayed request has no recorded counterpart"""
+
+
+class CassetteResponse:
+    """Minimal stand-in for requests.Response used during replay"""
+
+    __slots__ = ("status_code", "content")
+
+    def __init__(self, status_code: int, content: bytes):
+        self.status_code = status_code
+        self.content = content
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def _match_key(endpoint: str, method: str, params: Optional[Dict], body: Optional[Dict]) -> Tuple[str, str, str, str]:
+    # Canonical JSON so that dict ordering does not matter
+    return endpoint, method.upper(), _dumps(params or {}), _dumps(body or {})
+
+
+class Cassette:
+    """
+    HTTP recorder/player plugged into ``PanAPI(cassette=...)``
+
+    In record mode requests go to the network and every exchange is appended
+    to the file as it completes. In replay mode nothing touches the network:
+    each request is answered with the next recorded response for the same
+    endpoint, method and parameters; once those are used up the last one is
+    repeated (e.g., for a watcher polling the same page). Replaying clients
+    skip the access token entirely.
+
+    Usage:
+        with Cassette("session.jsonl.gz", "record") as cassette:
+            api = PanAPI(cassette=cassette)
+            list(TreeCrawler(api))
+
+        with Cassette("session.jsonl.gz", "replay", speed=1.0) as cassette:
+            api = PanAPI(client_id="x", client_secret="y", cassette=cassette)
+            list(TreeCrawler(api))
+    """
+
+    def __init__(self, path: str, mode: str = MODE_REPLAY, speed: Optional[float] = None):
+        """
+        Initialize Cassette
+
+        Args:
+            path: Cassette file (.jsonl, or .jsonl.gz for gzip)
+            mode: "record" (overwrites path) or "replay"
+            speed: Replay only. None answers immediately; 1.0 sleeps for the
+                recorded latency, 2.0 for half of it, and so on
+
+        Raises:
+            ValueError: If mode or speed is invalid
+            CassetteError: If the file is not a cassette or has an unknown version
+        """
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"未知的 cassette 模式: {mode}")
+        if speed is not None and speed <= 0:
+            raise ValueError("回放速度必须为正数")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._file = None
+        self._interactions: Dict[Tuple[str, str, str, str], Deque[Dict[str, Any]]] = {}
+        self._last: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+        self.recorded = 0
+        self.replayed = 0
+
+        if mode == MODE_RECORD:
+            self._file = _open(path, "w")
+            self._file.write(_dumps({"cassette": CASSETTE_VERSION, "recorded_at": time.time()}) + "\n")
+        else:
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == MODE_REPLAY
+
+    def _load(self) -> None:
+        with _open(self.path, "r") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("cassette") != CASSETTE_VERSION:
+                raise CassetteError(f"不支持的 cassette 文件: {self.path}")
+            count = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = _match_key(entry["endpoint"], entry["method"], entry.get("params"), entry.get("body"))
+                self._interactions.setdefault(key, deque()).append(entry)
+                count += 1
+        logger.debug("已加载 cassette %s: %d 条记录", self.path, count)
+
+    def request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        transport: Optional[Any] = None,
+    ) -> Any:
+        """
+        Send (record mode) or answer (replay mode) one request
+
+        Args:
+            endpoint: Endpoint name (key of config.ENDPOINTS), used for matching
+            method, url, headers, params, timeout: As for requests.request
+            body: JSON request body
+            transport: Record mode: api.transport.Transport that sends the
+                request, so recording goes over the client's own connections
+                (None: requests.request)
+
+        Returns:
+            The transport's response when recording, CassetteResponse when replaying
+
+        Raises:
+            CassetteError: Replay mode, and no matching request was recorded
+        """
+        if self.mode == MODE_REPLAY:
+            return self._replay(endpoint, method, params, body)
+
+        started = time.perf_counter()
+        send = transport.request if transport is not None else requests.request
+        response = send(method, url, headers=headers, params=params, json=body, timeout=timeout)
+        elapsed = time.perf_counter() - started
+        if endpoint not in _UNRECORDED_ENDPOINTS:
+            self._record(endpoint, method, params, body, response, elapsed)
+        return response
+
+    def _record(self, endpoint, method, params, body, response, elapsed) -> None:
+        line = _dumps({
+            "endpoint": endpoint,
+            "method": method.upper(),
+            "params": params or None,
+            "body": body or None,
+            "status": response.status_code,
+            "content": response.content.decode("utf-8", errors="replace"),
+            "elapsed": round(elapsed, 6),
+        })
+        with self._lock:
+            if self._file is None:
+                raise CassetteError("cassette 已关闭")
+            self._file.write(line + "\n")
+            self.recorded += 1
+
+    def _replay(self, endpoint, method, params, body) -> CassetteResponse:
+        key = _match_key(endpoint, method, params, body)
+        with self._lock:
+            queue = self._interactions.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                entry = self._last.get(key)
+            if entry is None:
+                raise CassetteError(f"cassette 中没有匹配的请求: {method} {endpoint} params={key[2]} body={key[3]}")
+            self.replayed += 1
+        if self.speed:
+            time.sleep(entry["elapsed"] / self.speed)
+        return CassetteResponse(entry["status"], entry["content"].encode("utf-8"))
+
+    def close(self) -> None:
+        """Flush and close the file (record mode)"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,175 @@
+"""
+Circuit breakers that stop sending requests to a failing endpoint group
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN_REQUESTS,
+    CIRCUIT_RECOVERY_TIMEOUT,
+    ENDPOINT_GROUPS,
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker
+
+    Closed: requests pass; failure_threshold consecutive failures open it.
+    Open: requests are refused until recovery_timeout has passed.
+    Half-open: up to half_open_requests trial requests pass; a success closes
+    the circuit, a failure opens it again for another recovery_timeout.
+
+    Callers check ``allow()`` before a request and then report exactly one of
+    ``record_success()``, ``record_failure()`` or ``release()`` (outcome says
+    nothing about the endpoint's health, e.g., the request never went out).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = CIRCUIT_RECOVERY_TIMEOUT,
+        half_open_requests: int = CIRCUIT_HALF_OPEN_REQUESTS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize CircuitBreaker
+
+        Args:
+            name: Endpoint group name, used in errors and snapshots
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds the circuit stays open
+            half_open_requests: Trial requests allowed at once while half-open
+            clock: Monotonic time source
+        """
+        if failure_threshold < 1 or half_open_requests < 1:
+            raise ValueError("failure_threshold and half_open_requests must be at least 1")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_requests = half_open_requests
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def _current_state(self, now: float) -> str:
+        """State after applying the open -> half-open timeout (caller holds _lock)"""
+        if self._state == STATE_OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = STATE_HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self.clock())
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial request through (0 if not open)"""
+        with self._lock:
+            now = self.clock()
+            if self._current_state(now) != STATE_OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_timeout - now)
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; counts it as a trial when half-open"""
+        with self._lock:
+            state = self._current_state(self.clock())
+            if state == STATE_CLOSED:
+                return True
+            if state == STATE_HALF_OPEN and self._trials < self.half_open_requests:
+                self._trials += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._trials -= 1
+            self._state = STATE_CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = self.clock()
+            if self._state == STATE_HALF_OPEN:
+                self._trip(now)
+                return
+            self._failures += 1
+            if self._state == STATE_CLOSED and self._failures >= self.failure_threshold:
+                self._trip(now)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._state == STATE_HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    def _trip(self, now: float) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = now
+        self._failures = 0
+        self._trials = 0
+        self.times_opened += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view of the breaker"""
+        with self._lock:
+            now = self.clock()
+            state = self._current_state(now)
+            return {
+                "state": state,
+                "failures": self._failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_after": max(0.0, self._opened_at + self.recovery_timeout - now) if state == STATE_OPEN else 0.0,
+            }
+
+
+class CircuitBreakerRegistry:
+    """One CircuitBreaker per endpoint group, created on first use"""
+
+    def __init__(self, groups: Optional[Dict[str, str]] = None, **breaker_options: Any):
+        """
+        Initialize CircuitBreakerRegistry
+
+        Args:
+            groups: Endpoint name -> group name (default: config.ENDPOINT_GROUPS);
+                endpoints not listed get a group of their own
+            **breaker_options: CircuitBreaker keyword arguments for every group
+        """
+        self.groups = ENDPOINT_GROUPS if groups is None else groups
+        self.breaker_options = breaker_options
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_endpoint(self, endpoint: str) -> CircuitBreaker:
+        """Breaker guarding an endpoint"""
+        group = self.groups.get(endpoint, endpoint)
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(group)
+                if breaker is None:
+                    breaker = self._breakers[group] = CircuitBreaker(group, **self.breaker_options)
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """State of every breaker used so far, by group"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
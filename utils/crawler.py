@@ -0,0 +1,116 @@
+"""
+Breadth-first crawler over a folder tree
+"""
+
+from collections import deque
+from typing import Any, Callable, Iterator, Optional
+
+from config import FILE_TYPE_FOLDER, DEFAULT_PAGE_LIMIT
+from utils.pagination import FileListPaginator
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CrawlError(RuntimeError):
+    """A folder listing stopped before its last page, so the crawl is incomplete"""
+
+    def __init__(self, folder_id: int, error: Optional[BaseException] = None):
+        """
+        Initialize CrawlError
+
+        Args:
+            folder_id: Folder whose listing failed
+            error: Exception that ended the listing, if any
+        """
+        self.folder_id = folder_id
+        self.error = error
+        super().__init__(f"文件夹 {folder_id} 的列表未能完整获取: {error}")
+
+
+class TreeCrawler:
+    """
+    Walk a folder tree and yield every entry below a root folder
+
+    Only folder IDs are queued, so memory stays proportional to the number of
+    pending folders rather than the number of files. With ``compact=True``
+    (the default) entries are FileEntry objects; use ``to_dict()`` on them
+    when raw dicts are needed.
+
+    If any folder cannot be listed to its last page, iteration raises
+    CrawlError (chained to the API error) after the entries already
+    yielded, so a truncated crawl is never mistaken for a complete one.
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        root_id: int = 0,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        compact: bool = True,
+        max_depth: Optional[int] = None,
+        include_trashed: bool = False,
+        on_folder: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Initialize TreeCrawler
+
+        Args:
+            api: PanAPI instance
+            root_id: ID of the folder to start from (0 for the root directory)
+            limit: Page size for each listing request
+            compact: Yield FileEntry objects instead of raw dicts
+            max_depth: Do not descend below this depth (root children are depth 1)
+            include_trashed: Also yield entries that are in the trash
+            on_folder: Optional callback invoked with (folder_id, depth) before
+                each folder is listed
+        """
+        self.api = api
+        self.root_id = root_id
+        self.limit = limit
+        self.compact = compact
+        self.max_depth = max_depth
+        self.include_trashed = include_trashed
+        self.on_folder = on_folder
+        self.folders_visited = 0
+        self.total_items = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Yield every entry of the tree, folder by folder
+
+        Raises:
+            CrawlError: If a folder listing stopped early
+        """
+        self.folders_visited = 0
+        self.total_items = 0
+        pending = deque([(self.root_id, 1)])
+
+        while pending:
+            folder_id, depth = pending.popleft()
+            if self.on_folder:
+                self.on_folder(folder_id, depth)
+
+            paginator = FileListPaginator(
+                self.api.get_file_list,
+                parent_file_id=folder_id,
+                limit=self.limit,
+                compact=self.compact,
+            )
+            self.folders_visited += 1
+
+            for entry in paginator:
+                if entry.get("trashed") and not self.include_trashed:
+                    continue
+                self.total_items += 1
+                yield entry
+
+                if entry.get("type") == FILE_TYPE_FOLDER and (
+                    self.max_depth is None or depth < self.max_depth
+                ):
+                    pending.append((entry.get("fileId"), depth + 1))
+
+            if not paginator.is_exhausted:
+                raise CrawlError(folder_id, paginator.error) from paginator.error
+
+        logger.debug("遍历完成: %d 个文件夹, %d 个条目", self.folders_visited, self.total_items)
@@ -0,0 +1,266 @@
+"""
+Streaming export of file listings to CSV, JSON Lines or Parquet
+"""
+
+import csv
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Union
+
+from utils.file_entry import FileEntry, FILE_ENTRY_FIELDS
+from utils.lazy import lazy_import
+from utils.logger import setup_logger
+from utils.pagination import PaginationIterator
+
+# Optional and slow to import; only loaded when a Parquet file is written
+pyarrow = lazy_import("pyarrow", optional=True)
+
+logger = setup_logger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_PARQUET = "parquet"
+
+# Default columns for tabular formats
+EXPORT_FIELDS = tuple(key for key, _ in FILE_ENTRY_FIELDS)
+
+# Rows buffered before each write/flush (one API page by default)
+DEFAULT_FLUSH_ROWS = 100
+
+_EXTENSION_FORMATS = {
+    ".csv": FORMAT_CSV,
+    ".jsonl": FORMAT_JSONL,
+    ".ndjson": FORMAT_JSONL,
+    ".parquet": FORMAT_PARQUET,
+}
+
+
+class ExportIncompleteError(RuntimeError):
+    """A paginator stopped before its last page, so the export file is truncated"""
+
+    def __init__(self, rows_written: int, error: Optional[BaseException] = None):
+        """
+        Initialize ExportIncompleteError
+
+        Args:
+            rows_written: Rows written before the listing stopped
+            error: Exception that ended the listing, if any
+        """
+        self.rows_written = rows_written
+        self.error = error
+        super().__init__(f"列表未能完整获取，仅导出了 {rows_written} 条记录: {error}")
+
+
+def _as_dict(item: Any) -> Dict[str, Any]:
+    """Raw dict view of a FileEntry or dict"""
+    return item.to_dict() if isinstance(item, FileEntry) else item
+
+
+class ExportWriter:
+    """
+    Base class for streaming export writers
+
+    Writers accept pages of entries (FileEntry objects or dicts) through
+    ``write_page`` and flush after each page, so they can be plugged in as a
+    paginator callback and never hold more than one page in memory.
+    """
+
+    def __init__(self, fields: Optional[Sequence[str]] = None):
+        """
+        Initialize ExportWriter
+
+        Args:
+            fields: Keys to export, in column order
+        """
+        self.fields = tuple(fields) if fields else None
+        self.rows_written = 0
+
+    def write_page(self, items: Iterable[Any]) -> None:
+        """Write one page of entries and flush it to the output"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Flush remaining data and release the output"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvExportWriter(ExportWriter):
+    """Write entries as CSV rows with a header line"""
+
+    def __init__(self, fp: TextIO, fields: Optional[Sequence[str]] = None):
+        """
+        Initialize CsvExportWriter
+
+        Args:
+            fp: Text stream opened with newline=""
+            fields: Columns to export (default: all FileEntry fields)
+        """
+        super().__init__(fields or EXPORT_FIELDS)
+        self.fp = fp
+        self._writer = csv.writer(fp)
+        self._writer.writerow(self.fields)
+
+    def write_page(self, items: Iterable[Any]) -> None:
+        fields = self.fields
+        rows = [[item.get(field) for field in fields] for item in items]
+        self._writer.writerows(rows)
+        self.rows_written += len(rows)
+        self.fp.flush()
+
+
+class JsonlExportWriter(ExportWriter):
+    """Write one JSON object per line"""
+
+    def __init__(self, fp: TextIO, fields: Optional[Sequence[str]] = None):
+        """
+        Initialize JsonlExportWriter
+
+        Args:
+            fp: Text stream
+            fields: Keys to export (default: every key the API returned)
+        """
+        super().__init__(fields)
+        self.fp = fp
+
+    def write_page(self, items: Iterable[Any]) -> None:
+        fields = self.fields
+        lines = []
+        for item in items:
+            record = {field: item.get(field) for field in fields} if fields else _as_dict(item)
+            lines.append(json.dumps(record, ensure_ascii=False))
+        if lines:
+            self.fp.write("\n".join(lines) + "\n")
+            self.rows_written += len(lines)
+        self.fp.flush()
+
+
+class ParquetExportWriter(ExportWriter):
+    """Write entries as Parquet row groups (requires pyarrow)"""
+
+    _FIELD_TYPES = {
+        "fileId": "int64",
+        "parentFileId": "int64",
+        "type": "int8",
+        "size": "int64",
+        "status": "int32",
+        "category": "int32",
+        "trashed": "int8",
+    }
+
+    def __init__(self, path: str, fields: Optional[Sequence[str]] = None, row_group_rows: int = 65536):
+        """
+        Initialize ParquetExportWriter
+
+        Args:
+            path: Output file path
+            fields: Columns to export (default: all FileEntry fields)
+            row_group_rows: Rows buffered before a row group is written
+        """
+        if pyarrow is None:
+            raise ImportError("导出 Parquet 格式需要安装 pyarrow")
+        super().__init__(fields or EXPORT_FIELDS)
+        self.row_group_rows = row_group_rows
+        self.schema = pyarrow.schema([
+            (field, getattr(pyarrow, self._FIELD_TYPES.get(field, "string"))())
+            for field in self.fields
+        ])
+        import pyarrow.parquet as pq
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self._columns: List[List[Any]] = [[] for _ in self.fields]
+        self._buffered = 0
+
+    def write_page(self, items: Iterable[Any]) -> None:
+        columns = self._columns
+        for item in items:
+            for column, field in zip(columns, self.fields):
+                column.append(item.get(field))
+            self._buffered += 1
+        if self._buffered >= self.row_group_rows:
+            self._flush_batch()
+
+    def _flush_batch(self) -> None:
+        if not self._buffered:
+            return
+        batch = pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(column, type=field.type) for column, field in zip(self._columns, self.schema)],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+        self.rows_written += self._buffered
+        self._columns = [[] for _ in self.fields]
+        self._buffered = 0
+
+    def close(self) -> None:
+        self._flush_batch()
+        self._writer.close()
+
+
+def detect_format(path: str) -> str:
+    """Guess the export format from a file extension (default: JSON Lines)"""
+    return _EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower(), FORMAT_JSONL)
+
+
+def export_entries(
+    entries: Iterable[Any],
+    output: Union[str, TextIO],
+    fmt: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    flush_rows: int = DEFAULT_FLUSH_ROWS,
+) -> int:
+    """
+    Stream entries from a paginator or crawler into an export file
+
+    Args:
+        entries: Iterable of FileEntry objects or dicts (e.g., a TreeCrawler)
+        output: File path, or an open text stream for CSV/JSON Lines
+        fmt: "csv", "jsonl" or "parquet" (default: guessed from the path)
+        fields: Keys to export
+        flush_rows: Rows buffered between writes
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ExportIncompleteError: ``entries`` is a paginator that stopped on a
+            failed page; the rows fetched so far are still written
+    """
+    is_path = isinstance(output, str)
+    if fmt is None:
+        fmt = detect_format(output) if is_path else FORMAT_JSONL
+
+    if fmt == FORMAT_PARQUET:
+        if not is_path:
+            raise ValueError("Parquet 导出需要文件路径")
+        writer = ParquetExportWriter(output, fields)
+        stream = None
+    elif fmt in (FORMAT_CSV, FORMAT_JSONL):
+        stream = open(output, "w", encoding="utf-8", newline="") if is_path else output
+        writer_cls = CsvExportWriter if fmt == FORMAT_CSV else JsonlExportWriter
+        writer = writer_cls(stream, fields)
+    else:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+
+    try:
+        with writer:
+            page = []
+            for entry in entries:
+                page.append(entry)
+                if len(page) >= flush_rows:
+                    writer.write_page(page)
+                    page = []
+            if page:
+                writer.write_page(page)
+    finally:
+        if is_path and stream is not None:
+            stream.close()
+
+    if isinstance(entries, PaginationIterator) and not entries.is_exhausted:
+        raise ExportIncompleteError(writer.rows_written, entries.error)
+
+    logger.info("导出完成: %d 条记录", writer.rows_written)
+    return writer.rows_written
@@ -0,0 +1,175 @@
+"""
+Compact representation of file list entries
+"""
+
+from typing import Any, Dict, Optional
+
+from config import FILE_TYPE_FOLDER
+
+# (API key, attribute name) for every field stored in a slot
+FILE_ENTRY_FIELDS = (
+    ("fileId", "file_id"),
+    ("parentFileId", "parent_file_id"),
+    ("filename", "filename"),
+    ("type", "type"),
+    ("size", "size"),
+    ("etag", "etag"),
+    ("status", "status"),
+    ("category", "category"),
+    ("trashed", "trashed"),
+    ("createAt", "create_at"),
+    ("updateAt", "update_at"),
+)
+
+_ATTR_BY_KEY = dict(FILE_ENTRY_FIELDS)
+_BIT_BY_KEY = {key: 1 << index for index, (key, _) in enumerate(FILE_ENTRY_FIELDS)}
+
+
+class FileEntry:
+    """
+    Slotted, memory-compact replacement for a file list dict
+
+    Known fields live in slots; keys the API returned that are not known are
+    kept in a small side dict, and a bitmask remembers which known keys were
+    present, so ``FileEntry.from_dict(d).to_dict() == d`` holds for any entry.
+    ``get``/``[]`` accept the API's camelCase keys, so code written against
+    the raw dicts keeps working.
+    """
+
+    __slots__ = tuple(attr for _, attr in FILE_ENTRY_FIELDS) + ("_present", "_extra")
+
+    def __init__(
+        self,
+        file_id: int,
+        filename: Optional[str] = None,
+        parent_file_id: Optional[int] = None,
+        type: Optional[int] = None,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+        status: Optional[int] = None,
+        category: Optional[int] = None,
+        trashed: Optional[int] = None,
+        create_at: Optional[str] = None,
+        update_at: Optional[str] = None,
+    ):
+        """
+        Initialize FileEntry
+
+        Args:
+            file_id: File ID
+            filename: File name
+            parent_file_id: Parent folder ID
+            type: File type (0: file, 1: folder)
+            size: Size in bytes
+            etag: Content hash
+            status: Review status
+            category: File category
+            trashed: 1 if the file is in the trash
+            create_at: Creation time
+            update_at: Last modification time
+        """
+        self.file_id = file_id
+        self.filename = filename
+        self.parent_file_id = parent_file_id
+        self.type = type
+        self.size = size
+        self.etag = etag
+        self.status = status
+        self.category = category
+        self.trashed = trashed
+        self.create_at = create_at
+        self.update_at = update_at
+        self._present = sum(
+            bit for key, bit in _BIT_BY_KEY.items()
+            if getattr(self, _ATTR_BY_KEY[key]) is not None
+        )
+        self._extra = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FileEntry":
+        """
+        Build a FileEntry from a raw API dict
+
+        Args:
+            data: File dict as returned by the file list / file info APIs
+
+        Returns:
+            FileEntry holding the same data
+        """
+        entry = cls.__new__(cls)
+        present = 0
+        extra = None
+        for key, value in data.items():
+            attr = _ATTR_BY_KEY.get(key)
+            if attr is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            else:
+                setattr(entry, attr, value)
+                present |= _BIT_BY_KEY[key]
+        for key, attr in FILE_ENTRY_FIELDS:
+            if not present & _BIT_BY_KEY[key]:
+                setattr(entry, attr, None)
+        entry._present = present
+        entry._extra = extra
+        return entry
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to the raw API dict"""
+        present = self._present
+        data = {
+            key: getattr(self, attr)
+            for key, attr in FILE_ENTRY_FIELDS
+            if present & _BIT_BY_KEY[key]
+        }
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    @property
+    def is_folder(self) -> bool:
+        """True if the entry is a folder"""
+        return self.type == FILE_TYPE_FOLDER
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict-style access by API key"""
+        attr = _ATTR_BY_KEY.get(key)
+        if attr is not None:
+            if self._present & _BIT_BY_KEY[key]:
+                return getattr(self, attr)
+            return default
+        if self._extra:
+            return self._extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, FileEntry):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"FileEntry(file_id={self.file_id!r}, filename={self.filename!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, attr) for attr in self.__slots__)
+
+    def __setstate__(self, state):
+        for attr, value in zip(self.__slots__, state):
+            setattr(self, attr, value)
+
+
+_MISSING = object()
@@ -0,0 +1,550 @@
+"""
+Durable SQLite-backed queue for bulk file operations
+
+A job is one bulk operation (move/trash/delete/recover/share/rename) over any
+number of file IDs, stored as MAX_BATCH_SIZE-sized tasks (one task per file
+for rename, whose items are [fileId, newName] pairs). Workers claim tasks
+under a lease, so a crashed process only delays its in-flight tasks until the
+lease runs out. A running worker keeps renewing the leases of its tasks, and
+each claim gets a fresh lease token: a worker whose lease was taken over
+cannot record an outcome for the task. Failed tasks are retried with
+exponential backoff. Jobs can be paused, resumed and cancelled from another
+process while workers run.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import (
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_QUEUE_PATH,
+    JOB_RETRY_BACKOFF,
+    MAX_BATCH_SIZE,
+)
+from utils.batching import RateLimiter, chunked
+from utils.logger import setup_logger
+from utils.tracing import RequestHook, retry_attempt
+
+logger = setup_logger(__name__)
+
+JOB_ACTIVE = "active"
+JOB_PAUSED = "paused"
+JOB_CANCELLED = "cancelled"
+
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+
+def _share(api: Any, file_ids: List[int], params: Dict[str, Any], seq: int) -> Any:
+    name = params["name"] if seq == 0 else f"{params['name']}_{seq + 1}"
+    return api.create_share_link(file_ids, name, share_expire=params.get("expire", 7), share_pwd=params.get("pwd"))
+
+
+def _rename(api: Any, items: List[List[Any]], params: Dict[str, Any], seq: int) -> Any:
+    # Renaming to the same name again is harmless, so a retried task simply repeats the call
+    for file_id, new_name in items:
+        api.rename_files(file_id, new_name)
+    return True
+
+
+# op name -> callable(api, file_ids, params, seq) returning a JSON-serializable result
+OPERATIONS: Dict[str, Callable[[Any, List[int], Dict[str, Any], int], Any]] = {
+    "move": lambda api, ids, params, seq: api.move_files(ids, params["target"]),
+    "trash": lambda api, ids, params, seq: api.trash_files(ids),
+    # delete_files re-checks the trash state, so a retried chunk finishes
+    # whatever an interrupted attempt left half-trashed
+    "delete": lambda api, ids, params, seq: api.delete_files(ids),
+    "recover": lambda api, ids, params, seq: api.recover_files(ids),
+    "share": _share,
+    "rename": _rename,
+}
+
+# Items per task where it differs from the queue's chunk size; the rename API
+# takes one file per call, so each rename is retried and journaled on its own
+OPERATION_CHUNK_SIZES = {"rename": 1}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL,
+    total_tasks INTEGER NOT NULL DEFAULT 0,
+    total_items INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    seq INTEGER NOT NULL,
+    file_ids TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    lease_token TEXT,
+    last_error TEXT,
+    result TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (state, job_id, seq);
+"""
+
+
+class Task:
+    """A claimed chunk of a job"""
+
+    __slots__ = ("id", "job_id", "seq", "op", "params", "file_ids", "attempts", "lease_token")
+
+    def __init__(self, task_id: int, job_id: int, seq: int, op: str, params: Dict[str, Any],
+                 file_ids: List[int], attempts: int, lease_token: Optional[str] = None):
+        self.id = task_id
+        self.job_id = job_id
+        self.seq = seq
+        self.op = op
+        self.params = params
+        self.file_ids = file_ids
+        self.attempts = attempts
+        self.lease_token = lease_token
+
+    def __repr__(self) -> str:
+        return f"Task({self.id}, job={self.job_id}, op={self.op!r}, files={len(self.file_ids)})"
+
+
+class JobQueue:
+    """
+    Jobs and tasks stored in a SQLite database
+
+    Safe to share between threads, and between processes using the same file
+    (WAL mode; claims run in IMMEDIATE transactions).
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, chunk_size: int = MAX_BATCH_SIZE,
+                 lease_seconds: float = JOB_LEASE_SECONDS, clock: Callable[[], float] = time.time):
+        """
+        Initialize JobQueue
+
+        Args:
+            path: Database file (":memory:" for a throwaway queue)
+            chunk_size: File IDs per task (default: config.MAX_BATCH_SIZE)
+            lease_seconds: How long a claimed task is reserved for its worker
+            clock: Time source (wall clock, as leases must survive restarts)
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Queues created before lease tokens existed
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "lease_token" not in columns:
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN lease_token TEXT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _transaction(self, sql_steps: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run sql_steps inside BEGIN IMMEDIATE ... COMMIT"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = sql_steps(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    # Submitting and managing jobs
+
+    def submit(self, op: str, file_ids: Iterable[int], **params: Any) -> int:
+        """
+        Record a bulk operation as a new job
+
+        Args:
+            op: One of OPERATIONS ("move", "trash", "delete", "recover", "share", "rename")
+            file_ids: File IDs ([fileId, newName] pairs for rename); consumed
+                lazily, so very large streams are fine
+            **params: Operation parameters (move: target; share: name, expire, pwd)
+
+        Returns:
+            The job ID
+
+        Raises:
+            ValueError: If op is unknown or a required parameter is missing
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"未知的操作: {op}")
+        if op == "move" and "target" not in params:
+            raise ValueError("move 操作需要 target 参数")
+        if op == "share" and "name" not in params:
+            raise ValueError("share 操作需要 name 参数")
+
+        chunk_size = OPERATION_CHUNK_SIZES.get(op, self.chunk_size)
+
+        def steps(conn: sqlite3.Connection) -> int:
+            now = self.clock()
+            job_id = conn.execute(
+                "INSERT INTO jobs (op, params, state, created_at) VALUES (?, ?, ?, ?)",
+                (op, json.dumps(params), JOB_ACTIVE, now),
+            ).lastrowid
+            tasks = items = 0
+            for seq, batch in enumerate(chunked(file_ids, chunk_size)):
+                conn.execute(
+                    "INSERT INTO tasks (job_id, seq, file_ids, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, seq, json.dumps(batch), TASK_PENDING, now),
+                )
+                tasks += 1
+                items += len(batch)
+            conn.execute("UPDATE jobs SET total_tasks = ?, total_items = ? WHERE id = ?", (tasks, items, job_id))
+            return job_id
+
+        job_id = self._transaction(steps)
+        logger.info("已提交任务 %s: %s", job_id, op)
+        return job_id
+
+    def _set_job_state(self, job_id: int, state: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ? WHERE id = ? AND state != ?", (state, job_id, JOB_CANCELLED)
+            )
+        return cursor.rowcount > 0
+
+    def pause(self, job_id: int) -> bool:
+        """Stop handing out tasks of a job; tasks already running finish normally"""
+        return self._set_job_state(job_id, JOB_PAUSED)
+
+    def resume(self, job_id: int) -> bool:
+        """Resume a paused job"""
+        return self._set_job_state(job_id, JOB_ACTIVE)
+
+    def cancel(self, job_id: int) -> bool:
+        """Permanently stop a job; its unfinished tasks are never run"""
+        return self._set_job_state(job_id, JOB_CANCELLED)
+
+    def retry_failed(self, job_id: int) -> int:
+        """Put the failed tasks of a job back in the queue with fresh attempts"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET state = ?, attempts = 0, not_before = 0, updated_at = ? "
+                "WHERE job_id = ? AND state = ?",
+                (TASK_PENDING, self.clock(), job_id, TASK_FAILED),
+            )
+        return cursor.rowcount
+
+    # Inspection
+
+    def job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Job summary
+
+        Returns:
+            Dict with id, op, params, state, status, total_tasks, total_items,
+            created_at, task counts per state and the latest error; None if
+            the job does not exist. status is the job state while unfinished
+            work remains, otherwise "done" or "failed".
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT state, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY state", (job_id,)
+            ).fetchall())
+            error = self._conn.execute(
+                "SELECT last_error FROM tasks WHERE job_id = ? AND last_error IS NOT NULL "
+                "ORDER BY updated_at DESC LIMIT 1", (job_id,)
+            ).fetchone()
+        return self._summary(row, counts, error[0] if error else None)
+
+    @staticmethod
+    def _summary(row: sqlite3.Row, counts: Dict[str, int], last_error: Optional[str]) -> Dict[str, Any]:
+        tasks = {state: counts.get(state, 0) for state in (TASK_PENDING, TASK_RUNNING, TASK_DONE, TASK_FAILED)}
+        status = row["state"]
+        if status != JOB_CANCELLED and not tasks[TASK_PENDING] and not tasks[TASK_RUNNING]:
+            status = "failed" if tasks[TASK_FAILED] else "done"
+        return {
+            "id": row["id"],
+            "op": row["op"],
+            "params": json.loads(row["params"]),
+            "state": row["state"],
+            "status": status,
+            "total_tasks": row["total_tasks"],
+            "total_items": row["total_items"],
+            "created_at": row["created_at"],
+            "tasks": tasks,
+            "last_error": last_error,
+        }
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Summaries of all jobs, oldest first"""
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM jobs ORDER BY id")]
+        return [self.job(job_id) for job_id in ids]
+
+    def results(self, job_id: int) -> List[Dict[str, Any]]:
+        """Per-task outcome of a job (file IDs, state, attempts, last error, result)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, file_ids, state, attempts, last_error, result FROM tasks "
+                "WHERE job_id = ? ORDER BY seq", (job_id,)
+            ).fetchall()
+        return [{
+            "seq": row["seq"],
+            "fileIds": json.loads(row["file_ids"]),
+            "state": row["state"],
+            "attempts": row["attempts"],
+            "last_error": row["last_error"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+        } for row in rows]
+
+    # Worker side
+
+    def claim(self) -> Optional[Task]:
+        """
+        Reserve the next runnable task
+
+        Runnable tasks belong to active jobs and are pending (past their retry
+        delay) or running with an expired lease. Oldest jobs go first.
+        """
+        def steps(conn: sqlite3.Connection) -> Optional[Task]:
+            now = self.clock()
+            row = conn.execute(
+                "SELECT tasks.id, tasks.job_id, tasks.seq, tasks.file_ids, tasks.attempts, jobs.op, jobs.params "
+                "FROM tasks JOIN jobs ON jobs.id = tasks.job_id "
+                "WHERE jobs.state = ? AND ("
+                "  (tasks.state = ? AND tasks.not_before <= ?) OR (tasks.state = ? AND tasks.lease_until < ?)"
+                ") ORDER BY tasks.job_id, tasks.seq LIMIT 1",
+                (JOB_ACTIVE, TASK_PENDING, now, TASK_RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE tasks SET state = ?, attempts = attempts + 1, lease_until = ?, lease_token = ?, "
+                "updated_at = ? WHERE id = ?",
+                (TASK_RUNNING, now + self.lease_seconds, token, now, row["id"]),
+            )
+            return Task(row["id"], row["job_id"], row["seq"], row["op"], json.loads(row["params"]),
+                        json.loads(row["file_ids"]), row["attempts"] + 1, token)
+
+        return self._transaction(steps)
+
+    def _update_leased(self, task: Task, assignments: str, values: tuple) -> bool:
+        """Update a task only while task still holds its lease; False if it was taken over"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE id = ? AND state = ? AND lease_token = ?",
+                values + (task.id, TASK_RUNNING, task.lease_token),
+            )
+        return cursor.rowcount > 0
+
+    def renew(self, task: Task) -> bool:
+        """Extend the lease of a running task by lease_seconds; False if the lease was lost"""
+        now = self.clock()
+        return self._update_leased(task, "lease_until = ?, updated_at = ?", (now + self.lease_seconds, now))
+
+    def complete(self, task: Task, result: Any = None) -> bool:
+        """Record a successful try; False (nothing recorded) if the lease was lost"""
+        return self._update_leased(
+            task, "state = ?, result = ?, last_error = NULL, updated_at = ?",
+            (TASK_DONE, json.dumps(result, default=str), self.clock()),
+        )
+
+    def fail(self, task: Task, error: str, retry_in: Optional[float]) -> bool:
+        """
+        Record a failed try; retry after retry_in seconds, or give up if it is None
+
+        Returns:
+            False (nothing recorded) if the lease was lost
+        """
+        now = self.clock()
+        state = TASK_FAILED if retry_in is None else TASK_PENDING
+        return self._update_leased(
+            task, "state = ?, last_error = ?, not_before = ?, updated_at = ?",
+            (state, error, now + (retry_in or 0), now),
+        )
+
+    def has_pending(self) -> bool:
+        """True while any active job has tasks left (including ones waiting for a retry)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM tasks JOIN jobs ON jobs.id = tasks.job_id "
+                "WHERE jobs.state = ? AND tasks.state IN (?, ?) LIMIT 1",
+                (JOB_ACTIVE, TASK_PENDING, TASK_RUNNING),
+            ).fetchone()
+        return row is not None
+
+
+class _RateLimitHook(RequestHook):
+    """Holds every request of a client to a JobWorker's rate limit"""
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+
+    def before_request(self, ctx) -> None:
+        self.limiter.acquire()
+
+
+class JobWorker:
+    """
+    Drain a JobQueue with a pool of threads
+
+    Usage:
+        queue = JobQueue("jobs.db")
+        queue.submit("trash", ids)
+        JobWorker(api, queue, concurrency=4, rate_limit=5).run()
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        queue: JobQueue,
+        concurrency: int = 4,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        backoff: float = JOB_RETRY_BACKOFF,
+        rate_limit: Optional[float] = None,
+        idle_interval: float = 1.0,
+        heartbeat_interval: Optional[float] = None,
+    ):
+        """
+        Initialize JobWorker
+
+        Args:
+            api: PanAPI instance
+            queue: Queue to drain
+            concurrency: Number of tasks run in parallel
+            max_attempts: Tries per task before it is marked failed
+            backoff: Delay before the first retry, doubled for each further one
+            rate_limit: Maximum API requests per second while run() is active,
+                None for no limit. Counted per request (a delete task sends one
+                file_info request per file), via a hook on api, so it also
+                covers other users of the same client
+            idle_interval: Sleep between claims while nothing is runnable
+            heartbeat_interval: Seconds between lease renewals of running tasks
+                (default: a third of the queue's lease)
+        """
+        self.api = api
+        self.queue = queue
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.idle_interval = idle_interval
+        self.heartbeat_interval = heartbeat_interval or queue.lease_seconds / 3
+        self.rate_limit = rate_limit
+        self.completed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        # task ID -> claimed task, renewed by the heartbeat thread
+        self._running: Dict[int, Task] = {}
+
+    def run_task(self, task: Task) -> bool:
+        """Execute one claimed task and record the outcome; True on success"""
+        if task.attempts > self.max_attempts:
+            # Only claims of expired leases get here: the task keeps outliving
+            # its lease (or its workers keep dying), so stop handing it out
+            self.queue.fail(task, "租约多次过期，任务可能已执行但结果未记录", None)
+            logger.warning("任务 %s 的租约已过期 %d 次，放弃", task, task.attempts - 1)
+            with self._lock:
+                self.failed += 1
+            return False
+        with self._lock:
+            self._running[task.id] = task
+        try:
+            try:
+                with retry_attempt(task.attempts):
+                    result = OPERATIONS[task.op](self.api, task.file_ids, task.params, task.seq)
+            except Exception as e:
+                give_up = task.attempts >= self.max_attempts
+                retry_in = None if give_up else self.backoff * 2 ** (task.attempts - 1)
+                if not self.queue.fail(task, str(e), retry_in):
+                    logger.warning("任务 %s 的租约已失效，失败未记录: %s", task, e)
+                    return False
+                logger.warning("任务 %s 第 %d 次执行失败: %s%s", task, task.attempts, e, "，放弃" if give_up else "")
+                with self._lock:
+                    if give_up:
+                        self.failed += 1
+                return False
+            if not self.queue.complete(task, result):
+                logger.warning("任务 %s 的租约已失效，结果未记录", task)
+                return False
+            with self._lock:
+                self.completed += 1
+            return True
+        finally:
+            with self._lock:
+                self._running.pop(task.id, None)
+
+    def _heartbeat(self, stopped: threading.Event) -> None:
+        """Renew the leases of running tasks until stopped is set"""
+        while not stopped.wait(self.heartbeat_interval):
+            with self._lock:
+                tasks = list(self._running.values())
+            for task in tasks:
+                if not self.queue.renew(task):
+                    logger.warning("任务 %s 的租约已被接管", task)
+
+    def _loop(self, stop_event: threading.Event, until_empty: bool) -> None:
+        while not stop_event.is_set():
+            task = self.queue.claim()
+            if task is not None:
+                self.run_task(task)
+                continue
+            if until_empty and not self.queue.has_pending():
+                return
+            stop_event.wait(self.idle_interval)
+
+    def run(self, stop_event: Optional[threading.Event] = None, until_empty: bool = True) -> None:
+        """
+        Process tasks until the queue is drained or stop_event is set
+
+        Args:
+            stop_event: Set it to stop after the tasks currently running (an
+                exception such as KeyboardInterrupt does the same, then propagates)
+            until_empty: Return once no active job has work left; with False,
+                keep waiting for new jobs until stop_event is set
+        """
+        stop_event = stop_event or threading.Event()
+        hook = _RateLimitHook(RateLimiter(self.rate_limit)) if self.rate_limit else None
+        if hook is not None:
+            self.api.add_hook(hook)
+        stopped = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(stopped,), name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = [pool.submit(self._loop, stop_event, until_empty) for _ in range(self.concurrency)]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    # e.g. Ctrl-C: let running tasks finish but claim nothing more,
+                    # otherwise leaving the with block would wait for a full drain
+                    stop_event.set()
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    raise
+        finally:
+            stopped.set()
+            heartbeat.join()
+            if hook is not None:
+                self.api.hooks.remove(hook)
@@ -0,0 +1,76 @@
+"""
+Pluggable JSON decoding with optional fast backends
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - optional dependency
+    ujson = None
+
+DECODER_AUTO = "auto"
+DECODER_ORJSON = "orjson"
+DECODER_UJSON = "ujson"
+DECODER_STDLIB = "json"
+
+Decoder = Callable[[Union[bytes, str]], Any]
+
+
+def _ujson_loads(payload: Union[bytes, str]) -> Any:
+    """ujson.loads with stdlib-compatible errors"""
+    try:
+        return ujson.loads(payload)
+    except ValueError as e:
+        doc = payload.decode("utf-8", "replace") if isinstance(payload, bytes) else payload
+        raise json.JSONDecodeError(str(e), doc, 0)
+
+
+def available_decoders() -> list:
+    """Names of the decoders that can be used in this environment"""
+    names = []
+    if orjson is not None:
+        names.append(DECODER_ORJSON)
+    if ujson is not None:
+        names.append(DECODER_UJSON)
+    names.append(DECODER_STDLIB)
+    return names
+
+
+def get_decoder(name: Optional[str] = None) -> Decoder:
+    """
+    Resolve a JSON decoder by name
+
+    All decoders accept bytes or str and raise json.JSONDecodeError on
+    malformed input, so callers can keep a single error path.
+
+    Args:
+        name: "orjson", "ujson", "json", or None/"auto" for the fastest installed one
+
+    Returns:
+        Callable decoding a payload into Python objects
+
+    Raises:
+        ValueError: If the requested backend is unknown or not installed
+    """
+    if name in (None, DECODER_AUTO):
+        name = available_decoders()[0]
+
+    if name == DECODER_ORJSON:
+        if orjson is None:
+            raise ValueError("orjson 未安装")
+        # orjson.JSONDecodeError already subclasses json.JSONDecodeError
+        return orjson.loads
+    if name == DECODER_UJSON:
+        if ujson is None:
+            raise ValueError("ujson 未安装")
+        return _ujson_loads
+    if name == DECODER_STDLIB:
+        return json.loads
+    raise ValueError(f"未知的 JSON 解码器: {name}")
@@ -0,0 +1,58 @@
+"""
+Deferred imports for heavy or optional dependencies
+"""
+
+import importlib
+import importlib.util
+import types
+from typing import Optional
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in that imports the real module on first attribute access
+
+    Attributes set on the proxy (e.g., by unittest.mock.patch) shadow the
+    real module's attributes for code that goes through this proxy only.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            # import_module holds the import lock, so concurrent first uses are safe
+            module = self.__dict__["_module"] = importlib.import_module(self.__name__)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str, optional: bool = False) -> Optional[types.ModuleType]:
+    """
+    Return a module whose import runs on first attribute access
+
+    Args:
+        name: Dotted module name
+        optional: Return None instead of raising if the module is not installed.
+            Finding a submodule imports its parent package
+
+    Raises:
+        ImportError: If the module is not installed and optional is False
+    """
+    try:
+        found = importlib.util.find_spec(name) is not None
+    except ImportError:
+        found = False
+    if not found:
+        if optional:
+            return None
+        raise ImportError(f"No module named {name!r}")
+    return LazyModule(name)
@@ -2,9 +2,60 @@
 Logging configuration for 123Pan API
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config import LOG_ASYNC
+
+# Formatter for better readability
+_formatter = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# A single console handler is shared by every package logger, so records are
+# written through one stream lock instead of one handler per module
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(_formatter)
+
+_lock = threading.RLock()
+_file_handlers: Dict[str, logging.Handler] = {}
+# logger name -> (logger, log file it writes to)
+_configured_loggers: Dict[str, Tuple[logging.Logger, Optional[str]]] = {}
+# log file (None for console only) -> (queue handler, listener) while async output is on
+_queues: Dict[Optional[str], Tuple[logging.handlers.QueueHandler, logging.handlers.QueueListener]] = {}
+_async_enabled = False
+
+
+def _output_handlers(log_file: Optional[str]) -> List[logging.Handler]:
+    """Handlers that actually write records (console plus optional file)"""
+    handlers = [_console_handler]
+    if log_file:
+        handlers.append(_file_handlers[log_file])
+    return handlers
+
+
+def _attach_handlers(logger: logging.Logger, log_file: Optional[str]) -> None:
+    """Attach either the direct output handlers or the queue handler"""
+    logger.handlers.clear()
+    if not _async_enabled:
+        for handler in _output_handlers(log_file):
+            logger.addHandler(handler)
+        return
+
+    if log_file not in _queues:
+        record_queue: queue.Queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(
+            record_queue, *_output_handlers(log_file), respect_handler_level=True
+        )
+        listener.start()
+        _queues[log_file] = (logging.handlers.QueueHandler(record_queue), listener)
+    logger.addHandler(_queues[log_file][0])
 
 
 def setup_logger(
@@ -25,34 +76,84 @@ def setup_logger(
     """
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    warning = None
 
-    # Remove existing handlers to avoid duplicates
-    logger.handlers.clear()
+    with _lock:
+        if log_file and log_file not in _file_handlers:
+            try:
+                file_handler = logging.FileHandler(log_file, encoding='utf-8')
+                file_handler.setFormatter(_formatter)
+                _file_handlers[log_file] = file_handler
+            except (IOError, OSError) as e:
+                warning = (log_file, e)
+                log_file = None
 
-    # Console handler with formatted output
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
+        # Replacing the handler list avoids duplicates on repeated setup
+        _attach_handlers(logger, log_file)
+        _configured_loggers[name] = (logger, log_file)
 
-    # Formatter for better readability
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    if warning:
+        logger.warning("Could not create log file %s: %s", *warning)
+    return logger
 
-    # File handler if log file is specified
-    if log_file:
-        try:
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
-            file_handler.setLevel(level)
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-        except (IOError, OSError) as e:
-            logger.warning(f"Could not create log file {log_file}: {e}")
 
-    return logger
+def enable_async_logging() -> None:
+    """
+    Route all package log output through background QueueListeners
+
+    Logging calls then only enqueue the record; formatting and terminal/file
+    I/O happen on a listener thread, so hot paths never block on output.
+    """
+    global _async_enabled
+
+    with _lock:
+        if _async_enabled:
+            return
+        _async_enabled = True
+        for logger, log_file in _configured_loggers.values():
+            _attach_handlers(logger, log_file)
+
+
+def disable_async_logging() -> None:
+    """Flush queued records and switch back to synchronous output"""
+    global _async_enabled
+
+    with _lock:
+        if not _async_enabled:
+            return
+        _async_enabled = False
+        for logger, log_file in _configured_loggers.values():
+            _attach_handlers(logger, log_file)
+        # Stop listeners only after loggers no longer feed their queues
+        for _, listener in _queues.values():
+            listener.stop()
+        _queues.clear()
+
+
+def configure_console(stream=None, level: Optional[int] = None) -> None:
+    """
+    Redirect and/or filter the shared console output
+
+    Args:
+        stream: New output stream (e.g., sys.stderr to keep stdout for data)
+        level: Minimum level printed to the console; file output is unaffected
+    """
+    with _lock:
+        if stream is not None:
+            _console_handler.setStream(stream)
+        if level is not None:
+            _console_handler.setLevel(level)
+
+
+def is_async_logging() -> bool:
+    """True while log output goes through QueueListeners"""
+    return _async_enabled
+
+
+atexit.register(disable_async_logging)
 
+if LOG_ASYNC:
+    enable_async_logging()
 
 # Create default logger for the package
 default_logger = setup_logger('123pan_api', logging.INFO)
@@ -0,0 +1,221 @@
+"""
+Per-endpoint request metrics: counters and latency histograms
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (cumulative on export, like Prometheus)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize LatencyHistogram
+
+        Args:
+            buckets: Sorted bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        # One extra slot for observations above the last bound (+Inf)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one latency in seconds"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation inside its bucket
+
+        Args:
+            q: Quantile between 0 and 1 (e.g., 0.99)
+
+        Returns:
+            Estimated latency in seconds, or None if nothing was observed
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.counts):
+            upper = self.buckets[index] if index < len(self.buckets) else lower
+            if bucket_count and seen + bucket_count >= rank:
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+            lower = upper
+        return lower
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view of the histogram"""
+        return {
+            "buckets": dict(zip(self.buckets + (float("inf"),), self.counts)),
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class EndpointMetrics:
+    """Counters for a single endpoint"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.requests = 0
+        self.errors: Dict[str, int] = {}
+        self.status_codes: Dict[int, int] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency = LatencyHistogram(buckets)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "error_count": sum(self.errors.values()),
+            "status_codes": dict(self.status_codes),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "latency": self.latency.snapshot(),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe collection of per-endpoint request metrics
+
+    Pass an instance to ``PanAPI(metrics=...)``; without one the client skips
+    timing and bookkeeping entirely.
+    """
+
+    def __init__(
+        self,
+        endpoints: Optional[Iterable[str]] = None,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        """
+        Initialize MetricsRegistry
+
+        Args:
+            endpoints: Endpoint names to pre-register (e.g., config.ENDPOINTS keys),
+                so they show up with zero counts before their first request
+            buckets: Latency histogram bucket bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointMetrics] = {}
+        for name in endpoints or ():
+            self._endpoints[name] = EndpointMetrics(self.buckets)
+
+    def observe(
+        self,
+        endpoint: str,
+        latency: float,
+        status_code: Optional[int] = None,
+        error_code: Optional[Any] = None,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+    ) -> None:
+        """
+        Record one finished request
+
+        Args:
+            endpoint: Endpoint name (key of config.ENDPOINTS)
+            latency: Wall time of the request in seconds
+            status_code: HTTP status code, if a response was received
+            error_code: APIError/NetworkError code if the request failed
+            bytes_in: Response body size
+            bytes_out: Request body size
+        """
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self._endpoints[endpoint] = EndpointMetrics(self.buckets)
+            metrics.requests += 1
+            metrics.bytes_in += bytes_in
+            metrics.bytes_out += bytes_out
+            metrics.latency.observe(latency)
+            if status_code is not None:
+                metrics.status_codes[status_code] = metrics.status_codes.get(status_code, 0) + 1
+            if error_code is not None:
+                key = str(error_code)
+                metrics.errors[key] = metrics.errors.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Consistent copy of all metrics
+
+        Returns:
+            Dict keyed by endpoint name with requests, errors, status_codes,
+            bytes_in, bytes_out and latency (histogram plus p50/p99 estimates)
+        """
+        with self._lock:
+            return {name: metrics.snapshot() for name, metrics in self._endpoints.items()}
+
+    def reset(self) -> None:
+        """Zero every counter, keeping the registered endpoints"""
+        with self._lock:
+            for name in list(self._endpoints):
+                self._endpoints[name] = EndpointMetrics(self.buckets)
+
+    def to_prometheus(self, prefix: str = "pan_api") -> str:
+        """
+        Render metrics in the Prometheus text exposition format
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Exposition text, ready to be served on a /metrics endpoint
+        """
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        header("requests_total", "counter", "Total API requests")
+        for endpoint, data in snapshot.items():
+            lines.append(f'{prefix}_requests_total{{endpoint="{endpoint}"}} {data["requests"]}')
+
+        header("errors_total", "counter", "Failed API requests by error code")
+        for endpoint, data in snapshot.items():
+            for code, count in sorted(data["errors"].items()):
+                lines.append(f'{prefix}_errors_total{{endpoint="{endpoint}",code="{code}"}} {count}')
+
+        header("responses_total", "counter", "API responses by HTTP status")
+        for endpoint, data in snapshot.items():
+            for status, count in sorted(data["status_codes"].items()):
+                lines.append(f'{prefix}_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+        header("received_bytes_total", "counter", "Response body bytes")
+        for endpoint, data in snapshot.items():
+            lines.append(f'{prefix}_received_bytes_total{{endpoint="{endpoint}"}} {data["bytes_in"]}')
+
+        header("sent_bytes_total", "counter", "Request body bytes")
+        for endpoint, data in snapshot.items():
+            lines.append(f'{prefix}_sent_bytes_total{{endpoint="{endpoint}"}} {data["bytes_out"]}')
+
+        header("request_duration_seconds", "histogram", "API request latency")
+        for endpoint, data in snapshot.items():
+            cumulative = 0
+            for bound, count in data["latency"]["buckets"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'{prefix}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{le}"}} {cumulative}'
+                )
+            lines.append(f'{prefix}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {data["latency"]["sum"]}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{endpoint="{endpoint}"}} {data["latency"]["count"]}')
+
+        return "\n".join(lines) + "\n"
@@ -2,7 +2,9 @@
 Pagination utilities for handling large result sets
 """
 
+import inspect
 from typing import Callable, Any, Optional, List, Dict
+from utils.file_entry import FileEntry
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -29,6 +31,7 @@ class PaginationIterator:
         page_key: str = "lastFileID",
         items_key: str = "fileList",
         callback: Optional[Callable[[List[Any]], None]] = None,
+        item_factory: Optional[Callable[[Any], Any]] = None,
     ):
         """
         Initialize PaginationIterator
@@ -39,16 +42,21 @@ class PaginationIterator:
             page_key: The key in the response that indicates the next page cursor
             items_key: The key in the response that contains the list of items
             callback: Optional callback function to process each page of items
+            item_factory: Optional function applied to every raw item
+                (e.g., FileEntry.from_dict) before it is yielded
         """
         self.api_method = api_method
         self.initial_params = initial_params.copy()
         self.page_key = page_key
         self.items_key = items_key
         self.callback = callback
+        self.item_factory = item_factory
         self.current_page = []
         self.current_index = 0
         self.is_exhausted = False
         self.total_items = 0
+        # Exception that ended the iteration early (None after a complete listing)
+        self.error: Optional[Exception] = None
 
     def __iter__(self):
         """Initialize iterator"""
@@ -56,6 +64,7 @@ class PaginationIterator:
         self.current_index = 0
         self.is_exhausted = False
         self.total_items = 0
+        self.error = None
         return self
 
     def __next__(self) -> Any:
@@ -98,6 +107,9 @@ class PaginationIterator:
                 items = response.get(self.items_key, [])
                 next_cursor = response.get(self.page_key)
 
+            if items and self.item_factory:
+                items = [self.item_factory(item) for item in items]
+
             self.current_page = items if items else []
             self.current_index = 0
 
@@ -117,13 +129,19 @@ class PaginationIterator:
                     self.initial_params[cursor_param_name] = next_cursor
                 else:
                     # Fallback for unmapped pagination keys
-                    logger.warning(f"未知的分页键: {self.page_key}, 使用默认映射")
+                    logger.warning("未知的分页键: %s, 使用默认映射", self.page_key)
                     self.initial_params[self.page_key] = next_cursor
 
+                if not self.current_page:
+                    # An empty page ends the listing even if a cursor came back
+                    self.is_exhausted = True
                 return len(self.current_page) > 0
 
         except Exception as e:
-            logger.error(f"获取分页数据失败: {e}")
+            # Iteration stops here; callers that need the whole listing check
+            # is_exhausted (and error) afterwards
+            logger.error("获取分页数据失败: %s", e)
+            self.error = e
             return False
 
     def get_all(self) -> List[Any]:
@@ -148,6 +166,19 @@ class PaginationIterator:
         return self.total_items
 
 
+def _accepts_keyword(func: Callable, name: str) -> bool:
+    """Whether func can be called with the keyword argument name"""
+    try:
+        params = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        param.kind == param.VAR_KEYWORD
+        or (param.name == name and param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY))
+        for param in params
+    )
+
+
 class FileListPaginator(PaginationIterator):
     """Specialized paginator for file list pagination"""
 
@@ -157,6 +188,7 @@ class FileListPaginator(PaginationIterator):
         parent_file_id: int = 0,
         limit: int = 100,
         callback: Optional[Callable[[List[Dict]], None]] = None,
+        compact: bool = False,
     ):
         """
         Initialize FileListPaginator
@@ -166,17 +198,27 @@ class FileListPaginator(PaginationIterator):
             parent_file_id: Parent folder ID to list files from
             limit: Number of items per page
             callback: Optional callback for processing each page
+            compact: Yield FileEntry objects instead of raw dicts; an API
+                method with a ``compact`` parameter decodes pages straight into
+                entries, any other callable has its raw pages converted here
         """
         initial_params = {
             "parent_file_id": parent_file_id,
             "limit": limit,
         }
+        item_factory = None
+        if compact:
+            if _accepts_keyword(api_method, "compact"):
+                initial_params["compact"] = True
+            else:
+                item_factory = FileEntry.from_dict
         super().__init__(
             api_method=api_method,
             initial_params=initial_params,
             page_key="lastFileID",
             items_key="fileList",
             callback=callback,
+            item_factory=item_factory,
         )
 
     def set_parent_folder(self, parent_file_id: int) -> None:
@@ -192,6 +234,7 @@ class ShareListPaginator(PaginationIterator):
         api_method: Callable,
         limit: int = 100,
         callback: Optional[Callable[[List[Dict]], None]] = None,
+        last_share_id: Optional[int] = None,
     ):
         """
         Initialize ShareListPaginator
@@ -200,10 +243,13 @@ class ShareListPaginator(PaginationIterator):
             api_method: The API method for getting share lists
             limit: Number of items per page
             callback: Optional callback for processing each page
+            last_share_id: Only list shares after this one (shares are listed by ascending ID)
         """
         initial_params = {
             "limit": limit,
         }
+        if last_share_id:
+            initial_params["last_share_id"] = last_share_id
         super().__init__(
             api_method=api_method,
             initial_params=initial_params,
@@ -0,0 +1,233 @@
+"""
+In-memory path trie mapping folder paths to file IDs and back
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import FILE_TYPE_FOLDER, PATH_CACHE_MAX_ENTRIES, ROOT_DIRECTORY_ID
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Cursor the API returns with the last page of a listing
+LAST_PAGE_CURSOR = -1
+
+
+class PathNode:
+    """One file or folder: its name, parent and (for folders) children by name"""
+
+    __slots__ = ("file_id", "name", "parent", "is_folder", "children", "complete", "cursor")
+
+    def __init__(self, file_id: int, name: Optional[str], parent: Optional["PathNode"], is_folder: bool):
+        self.file_id = file_id
+        self.name = name  # None until the node itself has been seen in a listing
+        self.parent = parent
+        self.is_folder = is_folder
+        self.children: Optional[Dict[str, "PathNode"]] = {} if is_folder else None
+        self.complete = False  # every child is known, so a missing name does not exist
+        self.cursor: Optional[int] = None  # where an in-progress listing of this folder stopped
+
+
+def split_path(path: str) -> List[str]:
+    """Path components, ignoring empty parts ("/a//b/" -> ["a", "b"])"""
+    return [part for part in path.split("/") if part]
+
+
+class PathTrie:
+    """
+    name -> fileId trie with parent pointers
+
+    Listing pages are recorded with ``add_page``; a folder whose pages were
+    seen from the first to the last one is marked complete, so a name missing
+    from it is known not to exist. Names are assumed unique within a folder
+    (the last one listed wins). All methods are thread-safe.
+    """
+
+    def __init__(self, max_entries: int = PATH_CACHE_MAX_ENTRIES):
+        """
+        Initialize PathTrie
+
+        Args:
+            max_entries: The trie is cleared when it grows beyond this many nodes
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._reset()
+
+    def clear(self) -> None:
+        """Forget everything except the root folder"""
+        with self._lock:
+            self._reset()
+
+    def _reset(self) -> None:
+        self._root = PathNode(ROOT_DIRECTORY_ID, "", None, True)
+        self._nodes: Dict[int, PathNode] = {ROOT_DIRECTORY_ID: self._root}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _folder(self, file_id: int) -> PathNode:
+        """Node of a folder, created as a placeholder if unknown (caller holds _lock)"""
+        node = self._nodes.get(file_id)
+        if node is None:
+            node = self._nodes[file_id] = PathNode(file_id, None, None, True)
+        elif not node.is_folder:
+            node.is_folder = True
+            node.children = {}
+        return node
+
+    def _detach(self, node: PathNode) -> None:
+        parent = node.parent
+        if parent is not None and parent.children.get(node.name) is node:
+            del parent.children[node.name]
+        node.parent = None
+
+    def _put(self, file_id: int, parent_id: int, name: str, is_folder: bool) -> None:
+        """Insert or update one entry (caller holds _lock)"""
+        parent = self._folder(parent_id)
+        node = self._nodes.get(file_id)
+        if node is None:
+            node = self._nodes[file_id] = PathNode(file_id, name, parent, is_folder)
+        else:
+            if node.parent is not parent or node.name != name:
+                self._detach(node)
+            node.name = name
+            node.parent = parent
+            if is_folder and not node.is_folder:
+                node.children = {}
+            node.is_folder = is_folder
+        parent.children[name] = node
+
+    def add(self, file_id: int, parent_id: int, name: str, is_folder: bool) -> None:
+        """Record one file or folder"""
+        with self._lock:
+            self._put(file_id, parent_id, name, is_folder)
+
+    def add_page(
+        self,
+        parent_id: int,
+        entries: Iterable[Any],
+        cursor: Optional[int],
+        next_cursor: Optional[int],
+    ) -> None:
+        """
+        Record one page of a folder listing
+
+        Args:
+            parent_id: Listed folder
+            entries: File dicts (or FileEntry objects) of the page
+            cursor: lastFileID the page was requested with (None: first page)
+            next_cursor: lastFileID returned with the page (-1: last page)
+        """
+        with self._lock:
+            if len(self._nodes) > self.max_entries:
+                logger.debug("路径缓存超过 %d 项，已清空", self.max_entries)
+                self._reset()
+            folder = self._folder(parent_id)
+            for entry in entries:
+                file_id = entry.get("fileId")
+                if entry.get("trashed"):
+                    self._remove(file_id)
+                    continue
+                self._put(file_id, parent_id, entry.get("filename"), entry.get("type") == FILE_TYPE_FOLDER)
+
+            # Completeness needs every page in order, starting from the first
+            if cursor is None:
+                folder.complete = False
+                folder.cursor = next_cursor
+            elif folder.cursor is not None and folder.cursor == cursor:
+                folder.cursor = next_cursor
+            else:
+                folder.cursor = None
+                return
+            if next_cursor == LAST_PAGE_CURSOR:
+                folder.complete = True
+                folder.cursor = None
+
+    def child(self, parent_id: int, name: str) -> Tuple[Optional[int], bool]:
+        """
+        Look up a name in a folder
+
+        Returns:
+            (file_id, known): file_id is None if the name is not cached; known
+            is True when that absence is authoritative (folder fully listed)
+        """
+        with self._lock:
+            parent = self._nodes.get(parent_id)
+            if parent is None or not parent.is_folder:
+                return None, False
+            node = parent.children.get(name)
+            if node is not None:
+                return node.file_id, True
+            return None, parent.complete
+
+    def is_folder(self, file_id: int) -> Optional[bool]:
+        """Whether a cached entry is a folder (None if unknown)"""
+        with self._lock:
+            node = self._nodes.get(file_id)
+            return None if node is None else node.is_folder
+
+    def path_of(self, file_id: int) -> Optional[str]:
+        """Absolute path of a cached entry, or None if any ancestor is unknown"""
+        with self._lock:
+            node = self._nodes.get(file_id)
+            parts = []
+            while node is not None and node is not self._root:
+                if node.name is None:
+                    return None
+                parts.append(node.name)
+                node = node.parent
+            if node is None:
+                return None
+            return "/" + "/".join(reversed(parts))
+
+    def rename(self, file_id: int, new_name: str) -> None:
+        with self._lock:
+            node = self._nodes.get(file_id)
+            if node is None or node.parent is None:
+                return
+            parent = node.parent
+            self._detach(node)
+            node.name = new_name
+            node.parent = parent
+            parent.children[new_name] = node
+
+    def move(self, file_ids: Iterable[int], target_id: int) -> None:
+        with self._lock:
+            target = self._folder(target_id)
+            for file_id in file_ids:
+                node = self._nodes.get(file_id)
+                if node is None or node.name is None:
+                    # Something unknown arrived, so the target's listing is no longer complete
+                    target.complete = False
+                    continue
+                self._detach(node)
+                node.parent = target
+                target.children[node.name] = node
+
+    def remove(self, file_ids: Iterable[int]) -> None:
+        """Forget trashed or deleted entries (and everything below them)"""
+        with self._lock:
+            for file_id in file_ids:
+                self._remove(file_id)
+
+    def _remove(self, file_id: int) -> None:
+        """Drop an entry and its subtree (caller holds _lock)"""
+        stack = [self._nodes.get(file_id)]
+        while stack:
+            node = stack.pop()
+            if node is None or node is self._root:
+                continue
+            self._detach(node)
+            self._nodes.pop(node.file_id, None)
+            if node.children:
+                stack.extend(node.children.values())
+                node.children = {}
+
+    def invalidate_listings(self) -> None:
+        """Keep cached entries but stop trusting that any folder is fully listed"""
+        with self._lock:
+            for node in self._nodes.values():
+                node.complete = False
+                node.cursor = None
@@ -0,0 +1,158 @@
+"""
+Streaming ranking operators over paginator and crawler output
+
+All operators consume their input lazily. ``top_k`` keeps a bounded heap of
+k entries, ``merge_sorted`` holds one entry per input stream and
+``external_sort`` spills sorted runs of ``run_size`` entries to temporary
+files, so none of them needs the whole listing in memory.
+"""
+
+import heapq
+import itertools
+import pickle
+import tempfile
+from typing import Any, Callable, IO, Iterable, Iterator, List, Union
+
+from config import FILE_TYPE_FOLDER, SORT_RUN_SIZE
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Fields of a file entry that can be ranked by name
+SORT_FIELDS = ("fileId", "filename", "size", "createAt", "updateAt", "parentFileId")
+
+Key = Union[str, Callable[[Any], Any]]
+
+
+def sort_key(key: Key) -> Callable[[Any], Any]:
+    """
+    Key function for a field name (entries lacking the field sort first)
+
+    Dates are "YYYY-MM-DD HH:MM:SS" strings, so they rank correctly as text.
+    Callables are returned unchanged.
+    """
+    if callable(key):
+        return key
+
+    def field_key(entry: Any) -> Any:
+        value = entry.get(key)
+        return (value is not None, value)
+
+    return field_key
+
+
+def _is_folder(entry: Any) -> bool:
+    return entry.get("type") == FILE_TYPE_FOLDER
+
+
+def top_k(
+    entries: Iterable[Any],
+    k: int,
+    key: Key = "size",
+    largest: bool = True,
+    files_only: bool = True,
+) -> List[Any]:
+    """
+    The k largest (or smallest) entries of a stream, in rank order
+
+    Uses a heap of at most k entries, so memory is O(k) however long the
+    stream is. Ties keep stream order.
+
+    Args:
+        entries: Entries from a paginator, crawler or any iterable
+        k: Number of entries to keep
+        key: Field name or key function
+        largest: Rank descending (largest first) instead of ascending
+        files_only: Skip folders (a folder's size is always 0)
+    """
+    if k < 1:
+        raise ValueError("k 必须为正整数")
+    if files_only:
+        entries = (entry for entry in entries if not _is_folder(entry))
+    select = heapq.nlargest if largest else heapq.nsmallest
+    return select(k, entries, key=sort_key(key))
+
+
+def merge_sorted(streams: Iterable[Iterable[Any]], key: Key = "fileId", reverse: bool = False) -> Iterator[Any]:
+    """
+    k-way merge of streams that are each already sorted by key
+
+    Holds one pending entry per stream. Folder listings come back from the
+    API in ascending fileId order, so several FileListPaginator streams can
+    be merged by fileId directly.
+
+    Args:
+        streams: Sorted iterables (consumed lazily)
+        key: Field name or key function the streams are sorted by
+        reverse: The streams are sorted descending
+    """
+    # heapq.merge calls iter() again on the last remaining stream, which would
+    # reset a PaginationIterator mid-page; a generator wrapper is safe to re-iter
+    return heapq.merge(*((entry for entry in stream) for stream in streams), key=sort_key(key), reverse=reverse)
+
+
+def _spill(run: List[Any]) -> IO[bytes]:
+    """Write one sorted run to an anonymous temporary file"""
+    spool = tempfile.TemporaryFile()
+    pickler = pickle.Pickler(spool, protocol=pickle.HIGHEST_PROTOCOL)
+    for entry in run:
+        pickler.dump(entry)
+        # The pickler's memo would otherwise keep every entry alive
+        pickler.clear_memo()
+    spool.seek(0)
+    return spool
+
+
+def _read_run(spool: IO[bytes]) -> Iterator[Any]:
+    unpickler = pickle.Unpickler(spool)
+    try:
+        while True:
+            yield unpickler.load()
+    except EOFError:
+        pass
+    finally:
+        spool.close()
+
+
+def external_sort(
+    entries: Iterable[Any],
+    key: Key = "filename",
+    reverse: bool = False,
+    run_size: int = SORT_RUN_SIZE,
+) -> Iterator[Any]:
+    """
+    Sort a stream of any length with at most run_size entries in memory
+
+    Entries are sorted in runs of run_size; if the stream is longer than one
+    run, each run is spilled to a temporary file and the runs are merged
+    with merge_sorted. The sort is stable.
+
+    Args:
+        entries: Entries to sort (FileEntry objects or dicts)
+        key: Field name or key function
+        reverse: Sort descending
+        run_size: Entries sorted in memory at a time
+    """
+    if run_size < 1:
+        raise ValueError("run_size 必须为正整数")
+    key_func = sort_key(key)
+    iterator = iter(entries)
+    spools: List[IO[bytes]] = []
+    try:
+        while True:
+            run = list(itertools.islice(iterator, run_size))
+            run.sort(key=key_func, reverse=reverse)
+            if len(run) < run_size and not spools:
+                # Everything fits in one run
+                yield from run
+                return
+            if run:
+                spools.append(_spill(run))
+            if len(run) < run_size:
+                break
+        logger.debug("外部排序: %d 个分段", len(spools))
+        # heapq.merge prefers earlier streams on ties, which keeps the sort stable
+        yield from merge_sorted([_read_run(spool) for spool in spools], key_func, reverse)
+    finally:
+        for spool in spools:
+            spool.close()
@@ -0,0 +1,219 @@
+"""
+Rule-based bulk reorganizer: classify crawled files and move them in batches
+
+Rules are evaluated in order and the first match decides a file's target
+folder. Files are grouped by target, so each target costs one folder
+lookup (created when missing) and one move_files call per MAX_BATCH_SIZE
+files, rather than one call per file. ``plan_reorg`` only reads the listing, so
+its output doubles as the dry run.
+
+Rules file (JSON list):
+
+    [
+        {"target": "/Videos", "extensions": ["mp4", "mkv"]},
+        {"target": "/Photos/{year}/{month}", "extensions": ["jpg", "heic"]},
+        {"target": "/Reports", "pattern": "^report_.*\\\\.pdf$"},
+        {"target": "/Archive", "before": "2024-01-01"}
+    ]
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import FILE_TYPE_FOLDER, MAX_BATCH_SIZE
+from utils.batching import bounded_map, chunked
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Date fields a rule can test and take {year}/{month}/{day} from
+DATE_FIELDS = ("updateAt", "createAt")
+
+
+class Rule:
+    """One "matching files go to this folder" rule; all given conditions must hold"""
+
+    def __init__(
+        self,
+        target: str,
+        extensions: Optional[Iterable[str]] = None,
+        pattern: Optional[str] = None,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        date_field: str = "updateAt",
+    ):
+        """
+        Initialize Rule
+
+        Args:
+            target: Target folder path; may use {year}, {month}, {day} (from
+                date_field) and {ext} placeholders
+            extensions: File extensions without the dot (case-insensitive)
+            pattern: Regular expression searched in the file name
+            before: Match files whose date_field is earlier than this ("YYYY-MM-DD[ HH:MM:SS]")
+            after: Match files whose date_field is this or later
+            date_field: "updateAt" or "createAt"
+
+        Raises:
+            ValueError: If the pattern, date field or target template is invalid
+        """
+        if date_field not in DATE_FIELDS:
+            raise ValueError(f"date_field 必须是 {DATE_FIELDS} 之一: {date_field}")
+        self.target = target
+        self.extensions = {ext.lower().lstrip(".") for ext in extensions} if extensions else None
+        try:
+            self.pattern = re.compile(pattern) if pattern else None
+        except re.error as e:
+            raise ValueError(f"无效的正则表达式 {pattern!r}: {e}")
+        self.before = before
+        self.after = after
+        self.date_field = date_field
+        try:
+            target.format(year="", month="", day="", ext="")
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"无效的目标路径模板 {target!r}: {e}")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rule":
+        if not isinstance(data, dict) or not data.get("target"):
+            raise ValueError(f"规则缺少 target: {data!r}")
+        return cls(
+            data["target"],
+            extensions=data.get("extensions"),
+            pattern=data.get("pattern"),
+            before=data.get("before"),
+            after=data.get("after"),
+            date_field=data.get("dateField", "updateAt"),
+        )
+
+    def target_for(self, entry: Any) -> Optional[str]:
+        """Target path for a file, or None if the rule does not match it"""
+        name = entry.get("filename") or ""
+        ext = os.path.splitext(name)[1].lower().lstrip(".")
+        if self.extensions is not None and ext not in self.extensions:
+            return None
+        if self.pattern is not None and not self.pattern.search(name):
+            return None
+        date = entry.get(self.date_field) or ""
+        if self.before is not None and not (date and date < self.before):
+            return None
+        if self.after is not None and not (date and date >= self.after):
+            return None
+        return self.target.format(year=date[0:4], month=date[5:7], day=date[8:10], ext=ext)
+
+    def __repr__(self) -> str:
+        return f"Rule({self.target!r})"
+
+
+def load_rules(path: str) -> List[Rule]:
+    """Read rules from a JSON file holding a list of rule objects"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("规则文件必须是 JSON 数组")
+    return [Rule.from_dict(item) for item in data]
+
+
+def normalize_path(path: str) -> str:
+    return "/" + "/".join(part for part in path.split("/") if part)
+
+
+class ReorgPlan:
+    """Files grouped by target folder path: target -> [(fileId, parentFileId)]"""
+
+    def __init__(self):
+        self.targets: Dict[str, List[Tuple[int, int]]] = {}
+        self.scanned = 0
+        self.unmatched = 0
+
+    def add(self, target: str, file_id: int, parent_id: int) -> None:
+        self.targets.setdefault(normalize_path(target), []).append((file_id, parent_id))
+
+    @property
+    def matched(self) -> int:
+        return sum(len(files) for files in self.targets.values())
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """One dry-run record per target folder"""
+        for target in sorted(self.targets):
+            file_ids = [file_id for file_id, _ in self.targets[target]]
+            yield {
+                "target": target,
+                "files": len(file_ids),
+                "moveCalls": -(-len(file_ids) // MAX_BATCH_SIZE),
+                "fileIds": file_ids,
+            }
+
+
+def plan_reorg(entries: Iterable[Any], rules: List[Rule]) -> ReorgPlan:
+    """
+    Evaluate rules over a listing (e.g. a TreeCrawler); folders are never moved
+
+    Only (fileId, parentFileId) pairs of matched files are kept, so the
+    listing itself can be streamed.
+    """
+    result = ReorgPlan()
+    for entry in entries:
+        if entry.get("type") == FILE_TYPE_FOLDER:
+            continue
+        result.scanned += 1
+        for rule in rules:
+            target = rule.target_for(entry)
+            if target is not None:
+                result.add(target, entry.get("fileId"), entry.get("parentFileId"))
+                break
+        else:
+            result.unmatched += 1
+    logger.info("整理计划: 扫描 %d 个文件, %d 个匹配, %d 个目标文件夹",
+                result.scanned, result.matched, len(result.targets))
+    return result
+
+
+def apply_reorg(api: Any, reorg: ReorgPlan, concurrency: int = 4) -> Iterator[Dict[str, Any]]:
+    """
+    Carry out a plan: create missing target folders, then move files in batches
+
+    Target folders are resolved (and created) one at a time, since several
+    targets may share parents; the move batches then run concurrently.
+    Files already in their target folder are skipped.
+
+    Args:
+        api: PanAPI instance (needs make_folders and move_files)
+        reorg: Plan from plan_reorg()
+        concurrency: Move calls in flight
+
+    Yields:
+        {"target", "targetId", "fileIds", "ok"} per move call, or
+        {"target", ["fileIds"], "error"[, "code"]} for failed folders and calls
+    """
+    batches = []
+    for target in sorted(reorg.targets):
+        try:
+            target_id = api.make_folders(target)
+        except Exception as e:
+            yield _error({"target": target}, e)
+            continue
+        file_ids = [file_id for file_id, parent_id in reorg.targets[target] if parent_id != target_id]
+        batches.extend((target, target_id, batch) for batch in chunked(file_ids))
+
+    def move(item: Tuple[str, int, List[int]]) -> None:
+        _, target_id, batch = item
+        api.move_files(batch, target_id)
+
+    for (target, target_id, batch), _, error in bounded_map(move, batches, concurrency):
+        record = {"target": target, "targetId": target_id, "fileIds": batch}
+        if error is not None:
+            yield _error(record, error)
+        else:
+            record["ok"] = True
+            yield record
+
+
+def _error(record: Dict[str, Any], error: BaseException) -> Dict[str, Any]:
+    record["error"] = str(error)
+    code = getattr(error, "code", None)
+    if code is not None:
+        record["code"] = code
+    return record
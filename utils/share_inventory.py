@@ -0,0 +1,233 @@
+"""
+Cached share inventory with a reverse index from file IDs to shares
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from config import SHARE_INVENTORY_MAX_AGE, SHARE_TIME_FORMAT
+from utils.batching import chunked
+from utils.logger import setup_logger
+from utils.pagination import ShareListPaginator
+
+logger = setup_logger(__name__)
+
+WEEK_SECONDS = 7 * 24 * 3600
+
+
+def parse_expiration(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of a share's "expiration" field (None if missing or malformed)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, SHARE_TIME_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def share_file_ids(share: Dict[str, Any]) -> List[int]:
+    """File IDs of a share list entry ("fileIdList" is a comma separated string)"""
+    value = share.get("fileIdList") or ""
+    if isinstance(value, (list, tuple)):
+        return [int(file_id) for file_id in value]
+    return [int(token) for token in str(value).split(",") if token.strip()]
+
+
+class ShareInventory:
+    """
+    In-memory copy of every share, indexed by share ID and by shared file ID
+
+    ``refresh`` lists only the shares created since the last refresh (the
+    share list is ordered by ascending share ID) and re-lists everything once
+    the inventory is older than ``max_age``, which also picks up deleted
+    shares and changes made elsewhere. Updates made through ``update`` are
+    applied to the cached entries directly, so they need no re-listing.
+    All methods are thread-safe.
+
+    Usage:
+        inventory = ShareInventory(api)
+        inventory.refresh()
+        if not inventory.is_shared(file_id): ...
+        soon = inventory.expiring()                 # shares expiring within a week
+        inventory.update([s["shareId"] for s in soon], traffic_switch=1)
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        limit: int = 100,
+        max_age: float = SHARE_INVENTORY_MAX_AGE,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize ShareInventory
+
+        Args:
+            api: PanAPI instance
+            limit: Shares per list request
+            max_age: Seconds after which refresh re-lists every share
+            clock: Wall-clock time source (share expirations are wall-clock times)
+        """
+        self.api = api
+        self.limit = limit
+        self.max_age = max_age
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._shares: Dict[int, Dict[str, Any]] = {}
+        self._by_file: Dict[int, Set[int]] = {}
+        self._expires: Dict[int, Optional[float]] = {}  # parsed "expiration" per share
+        self._last_share_id: Optional[int] = None
+        self._listed_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._shares)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether a full listing has completed"""
+        return self._listed_at is not None
+
+    def _add(self, share: Dict[str, Any]) -> None:
+        """Insert or replace one share (caller holds _lock)"""
+        share_id = share["shareId"]
+        self._discard(share_id)
+        self._shares[share_id] = share
+        self._expires[share_id] = parse_expiration(share.get("expiration"))
+        for file_id in share_file_ids(share):
+            self._by_file.setdefault(file_id, set()).add(share_id)
+
+    def _discard(self, share_id: int) -> None:
+        old = self._shares.pop(share_id, None)
+        if old is None:
+            return
+        del self._expires[share_id]
+        for file_id in share_file_ids(old):
+            ids = self._by_file.get(file_id)
+            if ids is not None:
+                ids.discard(share_id)
+                if not ids:
+                    del self._by_file[file_id]
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Bring the inventory up to date
+
+        Args:
+            full: Re-list every share even if the inventory is not yet max_age old
+
+        Returns:
+            Number of shares listed
+        """
+        now = self.clock()
+        if not full and (self._listed_at is None or now - self._listed_at >= self.max_age):
+            full = True
+        start = None if full else self._last_share_id
+
+        paginator = ShareListPaginator(self.api.get_share_list, limit=self.limit, last_share_id=start)
+        shares = list(paginator)
+        if not paginator.is_exhausted:
+            # The paginator logs and stops on errors; keep the old inventory rather than a partial one
+            logger.warning("分享列表未能完整获取，保留现有分享缓存")
+            return 0
+
+        with self._lock:
+            if full:
+                self._shares = {}
+                self._by_file = {}
+                self._expires = {}
+                self._listed_at = now
+            for share in shares:
+                self._add(share)
+            if self._shares:
+                self._last_share_id = max(self._shares)
+        logger.debug("分享缓存刷新: %d 个分享 (%s)", len(shares), "全量" if full else "增量")
+        return len(shares)
+
+    def _ensure_loaded(self) -> None:
+        if self._listed_at is None:
+            self.refresh()
+
+    def get(self, share_id: int) -> Optional[Dict[str, Any]]:
+        """Cached share list entry of one share"""
+        self._ensure_loaded()
+        with self._lock:
+            return self._shares.get(share_id)
+
+    def shares(self) -> List[Dict[str, Any]]:
+        """Every cached share, by ascending share ID"""
+        self._ensure_loaded()
+        with self._lock:
+            return [self._shares[share_id] for share_id in sorted(self._shares)]
+
+    def _active(self, share: Dict[str, Any], now: float) -> bool:
+        """Whether a share has not expired (caller holds _lock)"""
+        if share.get("expired"):
+            return False
+        expires = self._expires.get(share["shareId"])
+        return expires is None or expires > now
+
+    def shares_for(self, file_id: int, include_expired: bool = False) -> List[Dict[str, Any]]:
+        """Shares that directly contain a file (not shares of a folder above it)"""
+        self._ensure_loaded()
+        now = self.clock()
+        with self._lock:
+            shares = [self._shares[share_id] for share_id in sorted(self._by_file.get(file_id, ()))]
+            if not include_expired:
+                shares = [share for share in shares if self._active(share, now)]
+        return shares
+
+    def is_shared(self, file_id: int) -> bool:
+        """Whether a file is in at least one share that has not expired"""
+        return bool(self.shares_for(file_id))
+
+    def expiring(self, within: float = WEEK_SECONDS) -> List[Dict[str, Any]]:
+        """Active shares that expire in the next ``within`` seconds, soonest first"""
+        self._ensure_loaded()
+        now = self.clock()
+        found = []
+        with self._lock:
+            for share_id, expires in self._expires.items():
+                share = self._shares[share_id]
+                if not share.get("expired") and expires is not None and now < expires <= now + within:
+                    found.append((expires, share_id, share))
+        return [share for _, _, share in sorted(found)]
+
+    def select(self, predicate: Callable[[Dict[str, Any]], bool]) -> List[int]:
+        """IDs of the cached shares a predicate accepts"""
+        return [share["shareId"] for share in self.shares() if predicate(share)]
+
+    def update(
+        self,
+        share_ids: Iterable[int],
+        traffic_switch: int,
+        traffic_limit_switch: Optional[int] = None,
+        traffic_limit: Optional[int] = None,
+    ) -> int:
+        """
+        Call update_share_info in batches and apply the change to the cached entries
+
+        Args:
+            share_ids: Shares to update
+            traffic_switch, traffic_limit_switch, traffic_limit: As for PanAPI.update_share_info
+
+        Returns:
+            Number of shares updated
+        """
+        changes: Dict[str, Any] = {"trafficSwitch": traffic_switch}
+        if traffic_switch == 2 and traffic_limit_switch is not None:
+            changes["trafficLimitSwitch"] = traffic_limit_switch
+            if traffic_limit_switch == 2 and traffic_limit is not None:
+                changes["trafficLimit"] = traffic_limit
+
+        updated = 0
+        for batch in chunked(share_ids):
+            self.api.update_share_info(batch, traffic_switch, traffic_limit_switch, traffic_limit)
+            with self._lock:
+                for share_id in batch:
+                    share = self._shares.get(share_id)
+                    if share is not None:
+                        self._shares[share_id] = {**share, **changes}
+            updated += len(batch)
+        return updated
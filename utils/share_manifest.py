@@ -0,0 +1,165 @@
+"""
+Bulk share creation from a CSV or JSON Lines manifest
+
+A manifest has one share per row:
+
+    name,path,fileIds,expire,pwd,trafficSwitch,trafficLimitSwitch,trafficLimit
+    release-1.0,/releases/1.0,,7,ab12,,,
+    assets,,101 102 103,30,,2,2,1073741824
+
+``path`` (resolved with PanAPI.resolve_path) or ``fileIds`` (separated by
+spaces, commas or semicolons) selects the files; the other columns map to the
+arguments of PanAPI.create_share_link and may be left empty. JSON Lines
+manifests use the same keys, with fileIds as a list or a string.
+"""
+
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from config import DEFAULT_SHARE_EXPIRE_DAYS
+from utils.batching import RateLimiter, bounded_map
+from utils.export import FORMAT_CSV, FORMAT_JSONL
+
+# Share lifetimes the API accepts, in days (0: permanent)
+SHARE_EXPIRE_CHOICES = (0, 1, 7, 30)
+
+
+def _int_or_none(row: Dict[str, Any], key: str) -> Optional[int]:
+    value = row.get(key)
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} 不是整数: {value!r}")
+
+
+def _file_ids(value: Any) -> List[int]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, tuple)):
+        tokens = value
+    else:
+        tokens = str(value).replace(",", " ").replace(";", " ").split()
+    try:
+        return [int(token) for token in tokens]
+    except (TypeError, ValueError):
+        raise ValueError(f"fileIds 无效: {value!r}")
+
+
+def parse_row(row: Dict[str, Any], line: int) -> Dict[str, Any]:
+    """
+    Validate one manifest row
+
+    Returns:
+        Share spec with keys line, name, path, fileIds, expire, pwd,
+        trafficSwitch, trafficLimitSwitch and trafficLimit
+
+    Raises:
+        ValueError: If the row is not a valid share
+    """
+    name = (row.get("name") or "").strip()
+    if not name:
+        raise ValueError("缺少分享名称 (name)")
+    path = (row.get("path") or "").strip() or None
+    file_ids = _file_ids(row.get("fileIds"))
+    if bool(path) == bool(file_ids):
+        raise ValueError("path 和 fileIds 必须且只能提供一个")
+    expire = _int_or_none(row, "expire")
+    if expire is None:
+        expire = DEFAULT_SHARE_EXPIRE_DAYS
+    if expire not in SHARE_EXPIRE_CHOICES:
+        raise ValueError(f"expire 必须是 {SHARE_EXPIRE_CHOICES} 之一: {expire}")
+    return {
+        "line": line,
+        "name": name,
+        "path": path,
+        "fileIds": file_ids,
+        "expire": expire,
+        "pwd": (row.get("pwd") or "").strip() or None,
+        "trafficSwitch": _int_or_none(row, "trafficSwitch") or 1,
+        "trafficLimitSwitch": _int_or_none(row, "trafficLimitSwitch") or 1,
+        "trafficLimit": _int_or_none(row, "trafficLimit"),
+    }
+
+
+def read_manifest(stream: TextIO, fmt: str = FORMAT_CSV) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read share specs from a manifest stream
+
+    Invalid rows are yielded as {"line": n, "error": message} so one typo
+    does not stop a release; the caller decides what to do with them.
+
+    Args:
+        stream: Open text stream
+        fmt: FORMAT_CSV or FORMAT_JSONL
+    """
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(stream)
+        # DictReader.line_num is the physical line of the row just read
+        rows = ((reader.line_num, row) for row in reader)
+    elif fmt == FORMAT_JSONL:
+        rows = ((line, text) for line, text in enumerate(stream, 1) if text.strip())
+    else:
+        raise ValueError(f"不支持的清单格式: {fmt}")
+
+    for line, row in rows:
+        try:
+            if fmt == FORMAT_JSONL:
+                row = json.loads(row)
+                if not isinstance(row, dict):
+                    raise ValueError("每行必须是 JSON 对象")
+            yield parse_row(row, line)
+        except ValueError as e:
+            yield {"line": line, "error": str(e)}
+
+
+def create_shares(
+    api: Any,
+    specs: Iterable[Dict[str, Any]],
+    concurrency: int = 8,
+    rate_limit: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Create one share per spec, concurrently, yielding results as they complete
+
+    Args:
+        api: PanAPI instance
+        specs: Share specs from read_manifest (consumed lazily)
+        concurrency: Maximum share requests in flight
+        rate_limit: Maximum share requests started per second (None: no limit)
+
+    Yields:
+        {"line", "name", "shareID", "shareKey", "shareUrl", ...} for created
+        shares and {"line", "name", "error"[, "code"]} for failed rows, in
+        completion order
+    """
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+
+    def create(spec: Dict[str, Any]) -> Dict[str, Any]:
+        if "error" in spec:
+            raise ValueError(spec["error"])
+        file_ids = spec["fileIds"] or [api.resolve_path(spec["path"])]
+        if limiter is not None:
+            limiter.acquire()
+        return api.create_share_link(
+            file_ids,
+            spec["name"],
+            share_expire=spec["expire"],
+            share_pwd=spec["pwd"],
+            traffic_switch=spec["trafficSwitch"],
+            traffic_limit_switch=spec["trafficLimitSwitch"],
+            traffic_limit=spec["trafficLimit"],
+        )
+
+    for spec, share, error in bounded_map(create, specs, concurrency):
+        record = {"line": spec["line"], "name": spec.get("name")}
+        if error is not None:
+            record["error"] = str(error)
+            code = getattr(error, "code", None)
+            if code is not None:
+                record["code"] = code
+        else:
+            record.update(share or {})
+        yield record
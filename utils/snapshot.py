@@ -0,0 +1,213 @@
+"""
+Tree snapshots sorted by fileId and a streaming diff between two of them
+
+A snapshot is a JSON Lines file (gzip-compressed when the name ends in
+".gz"): one header object followed by one file entry per line, in strictly
+ascending fileId order. Because both sides of a diff are sorted the same
+way, ``diff_snapshots`` walks them in a single linear merge, holding one
+entry per side in memory regardless of how many files the account has.
+"""
+
+import gzip
+import json
+import os
+import time
+from typing import Any, Dict, IO, Iterable, Iterator, Optional
+
+from config import SORT_RUN_SIZE
+from utils.crawler import TreeCrawler
+from utils.file_entry import FileEntry
+from utils.json_codec import get_decoder
+from utils.logger import setup_logger
+from utils.ranking import external_sort
+
+logger = setup_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_RENAMED = "renamed"
+CHANGE_MOVED = "moved"
+CHANGE_MODIFIED = "modified"
+
+# Fields that make up the content signature of an entry
+CONTENT_FIELDS = ("size", "etag", "updateAt")
+
+
+def _as_dict(entry: Any) -> Dict[str, Any]:
+    return entry.to_dict() if isinstance(entry, FileEntry) else dict(entry)
+
+
+class SnapshotChange:
+    """One difference between two snapshots"""
+
+    __slots__ = ("change", "file_id", "old", "new")
+
+    def __init__(self, change: str, file_id: int, old: Optional[Any], new: Optional[Any]):
+        """
+        Initialize SnapshotChange
+
+        Args:
+            change: One of added/removed/renamed/moved/modified
+            file_id: ID of the file that changed
+            old: Entry in the older snapshot (None for added files)
+            new: Entry in the newer snapshot (None for removed files)
+        """
+        self.change = change
+        self.file_id = file_id
+        self.old = old
+        self.new = new
+
+    def to_dict(self) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"change": self.change, "fileId": self.file_id}
+        if self.old is not None:
+            record["old"] = _as_dict(self.old)
+        if self.new is not None:
+            record["new"] = _as_dict(self.new)
+        return record
+
+    def __repr__(self) -> str:
+        return f"SnapshotChange({self.change!r}, file_id={self.file_id})"
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_snapshot(
+    entries: Iterable[Any],
+    path: str,
+    root_id: int = 0,
+    run_size: int = SORT_RUN_SIZE,
+) -> int:
+    """
+    Write entries as a snapshot, sorted by fileId
+
+    The entries may come in any order (e.g. from TreeCrawler); they are
+    sorted with utils.ranking.external_sort, so memory stays bounded by
+    run_size entries.
+
+    Args:
+        entries: FileEntry objects or file dicts
+        path: Snapshot file (".gz" suffix for gzip)
+        root_id: Folder the entries were crawled from, recorded in the header
+        run_size: Entries sorted in memory at a time
+
+    Returns:
+        Number of entries written
+
+    Raises:
+        Whatever iterating entries raises (e.g. utils.crawler.CrawlError);
+        the partly written file is removed first, so an incomplete listing
+        never passes for a snapshot
+    """
+    header = {"snapshot": SNAPSHOT_VERSION, "root": root_id, "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")}
+    count = 0
+    try:
+        with _open(path, "w") as f:
+            f.write(json.dumps(header) + "\n")
+            for entry in external_sort(entries, key="fileId", run_size=run_size):
+                f.write(json.dumps(_as_dict(entry), ensure_ascii=False, separators=(",", ":")) + "\n")
+                count += 1
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        logger.error("快照未完成，已删除: %s", path)
+        raise
+    logger.info("快照已保存: %s (%d 个条目)", path, count)
+    return count
+
+
+def take_snapshot(api: Any, path: str, root_id: int = 0, **crawler_options: Any) -> int:
+    """Crawl a folder tree and write it as a snapshot (see write_snapshot)"""
+    return write_snapshot(TreeCrawler(api, root_id=root_id, **crawler_options), path, root_id=root_id)
+
+
+def read_snapshot_header(path: str) -> Dict[str, Any]:
+    """Header object of a snapshot file"""
+    with _open(path, "r") as f:
+        return _parse_header(f.readline(), path)
+
+
+def _parse_header(line: str, path: str) -> Dict[str, Any]:
+    try:
+        header = json.loads(line)
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or "snapshot" not in header:
+        raise ValueError(f"不是快照文件: {path}")
+    if header["snapshot"] > SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的快照版本: {header['snapshot']}")
+    return header
+
+
+def read_snapshot(path: str) -> Iterator[FileEntry]:
+    """Lazily yield the entries of a snapshot file, in fileId order"""
+    decode = get_decoder()
+    with _open(path, "r") as f:
+        _parse_header(f.readline(), path)
+        for line in f:
+            if line.strip():
+                yield FileEntry.from_dict(decode(line))
+
+
+def _ascending(entries: Iterable[Any], label: str) -> Iterator[Any]:
+    """Pass entries through, failing fast if fileIds are not strictly ascending"""
+    previous = None
+    for entry in entries:
+        file_id = entry.get("fileId")
+        if previous is not None and file_id <= previous:
+            raise ValueError(f"{label} 未按 fileId 升序排列: {previous} 之后是 {file_id}")
+        previous = file_id
+        yield entry
+
+
+def _compare(old: Any, new: Any) -> Iterator[SnapshotChange]:
+    file_id = new.get("fileId")
+    if old.get("parentFileId") != new.get("parentFileId"):
+        yield SnapshotChange(CHANGE_MOVED, file_id, old, new)
+    if old.get("filename") != new.get("filename"):
+        yield SnapshotChange(CHANGE_RENAMED, file_id, old, new)
+    if any(old.get(field) != new.get(field) for field in CONTENT_FIELDS):
+        yield SnapshotChange(CHANGE_MODIFIED, file_id, old, new)
+
+
+def diff_snapshots(old: Iterable[Any], new: Iterable[Any]) -> Iterator[SnapshotChange]:
+    """
+    Stream the differences between two fileId-sorted entry streams
+
+    A file that was both moved and renamed (or also modified) yields one
+    change per kind. Changes come out in fileId order.
+
+    Args:
+        old: Older entries (e.g. read_snapshot(monday_path))
+        new: Newer entries (e.g. read_snapshot(today_path))
+
+    Raises:
+        ValueError: If either side is not sorted by fileId
+    """
+    old_iter = _ascending(old, "旧快照")
+    new_iter = _ascending(new, "新快照")
+    a = next(old_iter, None)
+    b = next(new_iter, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a.get("fileId") < b.get("fileId")):
+            yield SnapshotChange(CHANGE_REMOVED, a.get("fileId"), a, None)
+            a = next(old_iter, None)
+        elif a is None or b.get("fileId") < a.get("fileId"):
+            yield SnapshotChange(CHANGE_ADDED, b.get("fileId"), None, b)
+            b = next(new_iter, None)
+        else:
+            yield from _compare(a, b)
+            a = next(old_iter, None)
+            b = next(new_iter, None)
+
+
+def diff_snapshot_files(old_path: str, new_path: str) -> Iterator[SnapshotChange]:
+    """diff_snapshots over two snapshot files"""
+    return diff_snapshots(read_snapshot(old_path), read_snapshot(new_path))
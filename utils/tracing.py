@@ -0,0 +1,225 @@
+"""
+Tracing hooks around PanAPI requests
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from utils.lazy import lazy_import
+from utils.logger import setup_logger
+
+# Optional; loaded when the first OpenTelemetryHook is created
+otel_context = lazy_import("opentelemetry.context", optional=True)
+otel_trace = lazy_import("opentelemetry.trace", optional=True)
+
+logger = setup_logger(__name__)
+
+KIND_REQUEST = "request"
+KIND_TOKEN_REFRESH = "token_refresh"
+
+# Try number of the call running on each thread (see retry_attempt)
+_attempts = threading.local()
+
+
+class RequestContext:
+    """
+    Data passed to hooks for one request or token refresh
+
+    ``status_code``, ``error``, ``error_code`` and ``elapsed`` are filled in
+    before the ``after_*`` hook runs. Hooks may keep their own state (e.g., a
+    span) in ``extra``.
+    """
+
+    __slots__ = (
+        "kind", "endpoint", "method", "params_size", "attempt",
+        "status_code", "error", "error_code", "elapsed", "extra",
+    )
+
+    def __init__(
+        self,
+        endpoint: str,
+        method: str,
+        params_size: int = 0,
+        attempt: int = 1,
+        kind: str = KIND_REQUEST,
+    ):
+        """
+        Initialize RequestContext
+
+        Args:
+            endpoint: Endpoint name (key of config.ENDPOINTS)
+            method: HTTP method
+            params_size: Number of parameter values (list items counted individually)
+            attempt: 1 for the first try; retrying callers set it with retry_attempt
+            kind: "request" or "token_refresh"
+        """
+        self.kind = kind
+        self.endpoint = endpoint
+        self.method = method
+        self.params_size = params_size
+        self.attempt = attempt
+        self.status_code: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.error_code: Optional[Any] = None
+        self.elapsed = 0.0
+        self.extra: Dict[str, Any] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"RequestContext({self.kind}, endpoint={self.endpoint!r}, "
+            f"status={self.status_code}, elapsed={self.elapsed:.3f})"
+        )
+
+
+class RequestHook:
+    """
+    Base class for request hooks; override any subset of the methods
+
+    Hooks are called synchronously on the requesting thread. Exceptions raised
+    by a hook are logged and never affect the request itself.
+    """
+
+    def before_request(self, ctx: RequestContext) -> None:
+        """Called right before an HTTP request is sent"""
+
+    def after_request(self, ctx: RequestContext) -> None:
+        """Called after a request finished, successfully or not"""
+
+    def before_token_refresh(self, ctx: RequestContext) -> None:
+        """Called before a new access token is requested"""
+
+    def after_token_refresh(self, ctx: RequestContext) -> None:
+        """Called after the token refresh (request and token file write) finished"""
+
+
+class CallbackHook(RequestHook):
+    """Adapt plain functions to the RequestHook interface"""
+
+    def __init__(
+        self,
+        before: Optional[Callable[[RequestContext], None]] = None,
+        after: Optional[Callable[[RequestContext], None]] = None,
+    ):
+        """
+        Initialize CallbackHook
+
+        Args:
+            before: Called before every request and token refresh
+            after: Called after every request and token refresh
+        """
+        self.before = before
+        self.after = after
+
+    def before_request(self, ctx: RequestContext) -> None:
+        if self.before:
+            self.before(ctx)
+
+    def after_request(self, ctx: RequestContext) -> None:
+        if self.after:
+            self.after(ctx)
+
+    before_token_refresh = before_request
+    after_token_refresh = after_request
+
+
+class OpenTelemetryHook(RequestHook):
+    """
+    Emit an OpenTelemetry span per request and per token refresh
+
+    Token refresh spans are made current while the refresh runs, so the
+    ``access_token`` request shows up as their child.
+    """
+
+    def __init__(self, tracer: Any = None):
+        """
+        Initialize OpenTelemetryHook
+
+        Args:
+            tracer: OpenTelemetry tracer (default: tracer named "123pan_api")
+
+        Raises:
+            ImportError: If opentelemetry-api is not installed
+        """
+        if otel_trace is None:
+            raise ImportError("OpenTelemetryHook 需要安装 opentelemetry-api")
+        self.tracer = tracer or otel_trace.get_tracer("123pan_api")
+
+    def _start(self, ctx: RequestContext, name: str, make_current: bool) -> None:
+        span = self.tracer.start_span(name, attributes={
+            "pan_api.endpoint": ctx.endpoint,
+            "http.method": ctx.method,
+            "pan_api.params_size": ctx.params_size,
+            "pan_api.attempt": ctx.attempt,
+        })
+        ctx.extra["otel_span"] = span
+        if make_current:
+            ctx.extra["otel_token"] = otel_context.attach(otel_trace.set_span_in_context(span))
+
+    def _finish(self, ctx: RequestContext) -> None:
+        span = ctx.extra.pop("otel_span", None)
+        token = ctx.extra.pop("otel_token", None)
+        if token is not None:
+            otel_context.detach(token)
+        if span is None:
+            return
+        if ctx.status_code is not None:
+            span.set_attribute("http.status_code", ctx.status_code)
+        if ctx.error is not None:
+            span.set_attribute("pan_api.error_code", str(ctx.error_code))
+            span.record_exception(ctx.error)
+            span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, str(ctx.error)))
+        span.end()
+
+    def before_request(self, ctx: RequestContext) -> None:
+        self._start(ctx, f"pan_api {ctx.endpoint}", make_current=False)
+
+    def after_request(self, ctx: RequestContext) -> None:
+        self._finish(ctx)
+
+    def before_token_refresh(self, ctx: RequestContext) -> None:
+        self._start(ctx, "pan_api token_refresh", make_current=True)
+
+    def after_token_refresh(self, ctx: RequestContext) -> None:
+        self._finish(ctx)
+
+
+@contextmanager
+def retry_attempt(attempt: int) -> Iterator[None]:
+    """
+    Report the requests this thread sends inside the block as try number ``attempt``
+
+    Retrying callers (ClientPool.call, JobWorker) wrap each try in it, so
+    hooks see RequestContext.attempt. Requests a call hands to other threads
+    (e.g. the workers of PanAPI.map) still report 1.
+    """
+    previous = current_attempt()
+    _attempts.value = attempt
+    try:
+        yield
+    finally:
+        _attempts.value = previous
+
+
+def current_attempt() -> int:
+    """Try number set by the innermost retry_attempt block on this thread (1 outside any)"""
+    return getattr(_attempts, "value", 1)
+
+
+def params_size(params: Optional[Dict[str, Any]], body: Optional[Dict[str, Any]]) -> int:
+    """Number of parameter values, counting list items (e.g., fileIDs) individually"""
+    size = 0
+    for values in (params, body):
+        if values:
+            for value in values.values():
+                size += len(value) if isinstance(value, (list, tuple)) else 1
+    return size
+
+
+def run_hooks(hooks: Sequence[RequestHook], method: str, ctx: RequestContext) -> None:
+    """Call one hook method on every hook, isolating hook failures"""
+    for hook in hooks:
+        try:
+            getattr(hook, method)(ctx)
+        except Exception as e:
+            logger.warning("请求钩子 %s.%s 执行失败: %s", type(hook).__name__, method, e)
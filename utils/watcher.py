@@ -0,0 +1,336 @@
+"""
+Polling watcher that detects remote changes in a set of folders
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+EVENT_CREATED = "created"
+EVENT_MODIFIED = "modified"
+EVENT_DELETED = "deleted"
+EVENT_MOVED = "moved"
+EVENT_RENAMED = "renamed"
+
+# Early-exit strategies for deciding whether a folder changed since last poll
+CHECK_FIRST_PAGE = "first_page"
+CHECK_UPDATE_AT = "update_at"
+CHECK_FULL = "full"
+
+# Fields that make up the content signature of an entry
+_CONTENT_FIELDS = ("size", "etag", "updateAt")
+
+
+class FileEvent:
+    """A single change detected by FolderWatcher"""
+
+    def __init__(
+        self,
+        event_type: str,
+        file_id: int,
+        folder_id: int,
+        entry: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize FileEvent
+
+        Args:
+            event_type: One of created/modified/deleted/moved/renamed
+            file_id: ID of the file the event refers to
+            folder_id: Watched folder the event was observed in
+            entry: Current file data (None for deleted files)
+            previous: File data from the previous snapshot (None for created files)
+        """
+        self.event_type = event_type
+        self.file_id = file_id
+        self.folder_id = folder_id
+        self.entry = entry
+        self.previous = previous
+
+    def __repr__(self) -> str:
+        return f"FileEvent({self.event_type!r}, file_id={self.file_id}, folder_id={self.folder_id})"
+
+
+class _FolderState:
+    """Per-folder polling state"""
+
+    def __init__(self, folder_id: int, interval: float):
+        self.folder_id = folder_id
+        self.snapshot: Optional[Dict[int, Dict[str, Any]]] = None
+        self.probe: Optional[str] = None
+        self.interval = interval
+        self.next_due = 0.0
+        self.polls_since_full = 0
+
+
+class FolderWatcher:
+    """
+    Poll a set of folders and emit created/modified/deleted/moved/renamed events
+
+    Each folder keeps its own snapshot and polling interval. A folder that
+    stays idle backs off towards ``max_interval``; any change resets it to
+    ``min_interval``. Before listing a folder in full, a cheap probe is made
+    (the first page, or the folder's own ``updateAt``) so an idle folder costs
+    a single request per poll.
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        folder_ids: List[int],
+        min_interval: float = 5.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+        check_mode: str = CHECK_FIRST_PAGE,
+        full_scan_every: int = 10,
+        page_limit: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize FolderWatcher
+
+        Args:
+            api: PanAPI instance (needs get_file_list, and get_file_detail for update_at mode)
+            folder_ids: IDs of the folders to watch
+            min_interval: Polling interval in seconds right after a change
+            max_interval: Upper bound for the polling interval of idle folders
+            backoff: Factor applied to the interval after each idle poll
+            check_mode: Early-exit strategy: "first_page", "update_at" or "full"
+            full_scan_every: Force a full listing after this many skipped polls,
+                so changes beyond the first page are never missed for long
+                (0 disables forced rescans)
+            page_limit: Page size used when listing folders
+            clock: Monotonic time source (injectable for tests)
+        """
+        if check_mode not in (CHECK_FIRST_PAGE, CHECK_UPDATE_AT, CHECK_FULL):
+            raise ValueError(f"未知的检查模式: {check_mode}")
+
+        self.api = api
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.check_mode = check_mode
+        self.full_scan_every = full_scan_every
+        self.page_limit = page_limit
+        self.clock = clock
+        self.request_count = 0
+        self._folders: Dict[int, _FolderState] = {
+            folder_id: _FolderState(folder_id, min_interval) for folder_id in folder_ids
+        }
+
+    def add_folder(self, folder_id: int) -> None:
+        """Start watching another folder"""
+        if folder_id not in self._folders:
+            self._folders[folder_id] = _FolderState(folder_id, self.min_interval)
+
+    def remove_folder(self, folder_id: int) -> None:
+        """Stop watching a folder"""
+        self._folders.pop(folder_id, None)
+
+    def get_interval(self, folder_id: int) -> float:
+        """Current polling interval of a folder, in seconds"""
+        return self._folders[folder_id].interval
+
+    def next_poll_in(self) -> float:
+        """Seconds until the next folder is due (0 if one is already due)"""
+        if not self._folders:
+            return self.max_interval
+        now = self.clock()
+        return max(0.0, min(state.next_due for state in self._folders.values()) - now)
+
+    def poll_once(self, force: bool = False) -> List[FileEvent]:
+        """
+        Poll every folder that is due and return the detected events
+
+        The first poll of a folder only records its snapshot. Files that leave
+        one watched folder and show up in another during the same poll are
+        reported as a single "moved" event.
+
+        Args:
+            force: Poll all folders regardless of their schedule
+
+        Returns:
+            List of FileEvent objects
+        """
+        now = self.clock()
+        added: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+        removed: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+        events: List[FileEvent] = []
+
+        for state in list(self._folders.values()):
+            if not force and state.next_due > now:
+                continue
+
+            try:
+                changed = self._poll_folder(state, added, removed, events)
+            except Exception as e:
+                logger.warning("轮询文件夹 %s 失败: %s", state.folder_id, e)
+                changed = False
+
+            if changed:
+                state.interval = self.min_interval
+            else:
+                state.interval = min(state.interval * self.backoff, self.max_interval)
+            state.next_due = self.clock() + state.interval
+
+        # Pair up removals and additions of the same file across folders
+        for file_id, (folder_id, entry) in added.items():
+            if file_id in removed:
+                _, previous = removed.pop(file_id)
+                events.append(FileEvent(EVENT_MOVED, file_id, folder_id, entry, previous))
+                if previous.get("filename") != entry.get("filename"):
+                    events.append(FileEvent(EVENT_RENAMED, file_id, folder_id, entry, previous))
+            else:
+                events.append(FileEvent(EVENT_CREATED, file_id, folder_id, entry))
+        for file_id, (folder_id, previous) in removed.items():
+            events.append(FileEvent(EVENT_DELETED, file_id, folder_id, None, previous))
+
+        return events
+
+    def watch(self, stop_event: Optional[threading.Event] = None) -> Iterator[FileEvent]:
+        """
+        Yield events forever (or until stop_event is set)
+
+        Args:
+            stop_event: Optional event used to stop watching from another thread
+
+        Yields:
+            FileEvent objects as they are detected
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            for event in self.poll_once():
+                yield event
+            stop_event.wait(self.next_poll_in())
+
+    def run(self, callback: Callable[[FileEvent], None], stop_event: Optional[threading.Event] = None) -> None:
+        """
+        Call callback for every event until stop_event is set
+
+        Args:
+            callback: Function invoked with each FileEvent
+            stop_event: Optional event used to stop watching from another thread
+        """
+        for event in self.watch(stop_event):
+            callback(event)
+
+    def _poll_folder(
+        self,
+        state: _FolderState,
+        added: Dict[int, Tuple[int, Dict[str, Any]]],
+        removed: Dict[int, Tuple[int, Dict[str, Any]]],
+        events: List[FileEvent],
+    ) -> bool:
+        """Poll one folder, record changes and return whether anything changed"""
+        first_page = None
+        first_cursor = None
+        probe = None
+        primed = state.snapshot is not None
+        rescan_due = (
+            self.full_scan_every > 0 and state.polls_since_full + 1 >= self.full_scan_every
+        )
+
+        if self.check_mode == CHECK_UPDATE_AT:
+            detail = self.api.get_file_detail(state.folder_id)
+            self.request_count += 1
+            probe = str(detail.get("updateAt")) if detail else None
+        elif self.check_mode == CHECK_FIRST_PAGE:
+            first_page, first_cursor = self.api.get_file_list(
+                parent_file_id=state.folder_id, limit=self.page_limit
+            )
+            self.request_count += 1
+            probe = self._page_digest(first_page, first_cursor)
+
+        single_page = first_cursor is None or first_cursor == -1
+        if primed and probe is not None and probe == state.probe:
+            # A single-page folder is fully described by its probe
+            if single_page and self.check_mode == CHECK_FIRST_PAGE:
+                state.polls_since_full = 0
+                return False
+            if not rescan_due:
+                state.polls_since_full += 1
+                return False
+
+        snapshot = self._list_folder(state.folder_id, first_page, first_cursor)
+        state.probe = probe
+        state.polls_since_full = 0
+
+        if not primed:
+            state.snapshot = snapshot
+            return False
+
+        previous = state.snapshot
+        state.snapshot = snapshot
+        changed = False
+
+        for file_id, entry in snapshot.items():
+            old = previous.get(file_id)
+            if old is None:
+                added[file_id] = (state.folder_id, entry)
+                changed = True
+                continue
+            # Same folder, so the parent is unchanged: a new name is a rename, not a move
+            if old.get("filename") != entry.get("filename"):
+                events.append(FileEvent(EVENT_RENAMED, file_id, state.folder_id, entry, old))
+                changed = True
+            if any(old.get(field) != entry.get(field) for field in _CONTENT_FIELDS):
+                events.append(FileEvent(EVENT_MODIFIED, file_id, state.folder_id, entry, old))
+                changed = True
+
+        for file_id, old in previous.items():
+            if file_id not in snapshot:
+                removed[file_id] = (state.folder_id, old)
+                changed = True
+
+        return changed
+
+    def _list_folder(
+        self,
+        folder_id: int,
+        first_page: Optional[List[Dict[str, Any]]],
+        cursor: Optional[int],
+    ) -> Dict[int, Dict[str, Any]]:
+        """List a folder in full, reusing an already fetched first page"""
+        if first_page is None:
+            first_page, cursor = self.api.get_file_list(parent_file_id=folder_id, limit=self.page_limit)
+            self.request_count += 1
+
+        snapshot: Dict[int, Dict[str, Any]] = {}
+        page = first_page
+        while True:
+            for entry in page or []:
+                if entry.get("trashed"):
+                    continue
+                snapshot[entry.get("fileId")] = entry
+            if cursor is None or cursor == -1 or not page:
+                break
+            page, cursor = self.api.get_file_list(
+                parent_file_id=folder_id, limit=self.page_limit, last_file_id=cursor
+            )
+            self.request_count += 1
+
+        return snapshot
+
+    @staticmethod
+    def _page_digest(page: Optional[List[Dict[str, Any]]], cursor: Optional[int]) -> str:
+        """Compact digest of a listing page, used as a change probe"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(cursor).encode())
+        for entry in page or []:
+            digest.update(
+                repr((
+                    entry.get("fileId"),
+                    entry.get("filename"),
+                    entry.get("trashed"),
+                    entry.get("size"),
+                    entry.get("etag"),
+                    entry.get("updateAt"),
+                )).encode()
+            )
+        return digest.hexdigest()